@@ -1,13 +1,29 @@
 import streamlit as st
 import json
 import base64
-import requests
-import urllib.parse
+import os
 import re
 import time
+import uuid
 from datetime import datetime
-from openai import OpenAI
 import streamlit.components.v1 as components
+from sis_analytics import community_colors, node_sizes, top_k_nodes
+from sis_bibliography import BIBLIO_CACHE_TTL, get_biblio_cache
+from sis_cache import normalize_key
+from sis_clients import get_client_registry
+from sis_dag import critical_path
+from sis_endpoints import CEREBRAS_MODEL_CANDIDATES, cerebras_policy
+from sis_graph import GRAPH_MARKER
+from sis_history import get_run_history
+from sis_index import get_ontology_index
+from sis_jobs import JobRejected, get_job_manager
+from sis_ingest import LARGE_FILE_BYTES
+from sis_ontology import (IMA_PROMPT_ENCODING, MA_PROMPT_ENCODING, EXPLORER_MARKDOWN,
+                          SCIENCE_FIELD_OPTIONS, PARADIGM_OPTIONS, STRUCTURAL_MODEL_OPTIONS)
+from sis_pipeline import CEREBRAS_BASE_URL, GROQ_BASE_URL, PhaseFailure, PipelineRequest, PipelineResult, phase1_fingerprint
+from sis_ratelimit import ProviderOverloaded
+from sis_telemetry import get_metrics_registry, observe_stage
+from sis_prompt import estimate_tokens, fit_section, DEFAULT_BUDGETS
 
 # =============================================================================
 # 0. GLOBAL CONFIGURATION & AUTOMATED DATE
@@ -28,7 +44,7 @@ st.set_page_config(
 # --- NUCLEAR CSS OVERRIDE: OBLITERATING SIDEBAR ARTIFACTS & FIXING VISIBILITY ---
 # Targets the 'keyboard_double_arrow_right' artifact and forced navy-black contrast.
 # This section ensures the Knowledge Explorer is perfectly visible.
-st.markdown("""
+APP_CSS = """
 <style>
     /* 1. OBLITERATE ARROW ARTIFACTS & SIDEBAR ICONS */
     /* Hides the specific Streamlit containers where "keyboard_double_arrow_right" appears as text */
@@ -182,10 +198,19 @@ st.markdown("""
         transition: all 0.3s ease;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_data(show_spinner=False)
+def minify_css(css):
+    """Strips comments and indentation once per process; every rerun re-sends the stylesheet."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    return re.sub(r"\s*\n\s*", "\n", css).strip()
+
+st.markdown(minify_css(APP_CSS), unsafe_allow_html=True)
 
+@st.cache_data(show_spinner=False)
 def get_svg_base64(svg_str):
-    """Encodes SVG for reliable display in Streamlit sidebar."""
+    """Encodes SVG for reliable display in Streamlit sidebar (cached across reruns)."""
     return base64.b64encode(svg_str.encode('utf-8')).decode('utf-8')
 
 # --- LOGOTIP: ORIGINAL 3D RELIEF (PYRAMID & TREE RESTORED EXACTLY) ---
@@ -221,472 +246,126 @@ SVG_3D_RELIEF = """
 # 1. CORE RENDERING ENGINES & DATA FETCHING
 # =============================================================================
 
-def render_cytoscape_network(elements, container_id="cy_synergy_final_pipeline"):
-    """Interactive Cytoscape.js engine for high-density 18D graphs."""
-    cyto_html = f"""
-    <div style="position: relative; width: 100%;">
-        <button id="save_btn" style="position: absolute; top: 15px; right: 15px; z-index: 1000; padding: 12px 18px; background: #2a9d8f; color: white; border: none; border-radius: 8px; cursor: pointer; font-family: sans-serif; font-size: 13px; font-weight: 800; box-shadow: 0 4px 10px rgba(0,0,0,0.2);">💾 EXPORT GRAPH PNG</button>
-        <div id="{container_id}" style="width: 100%; height: 750px; background: #ffffff; border-radius: 20px; border: 1px solid #e0e0e0; box-shadow: 0 8px 30px rgba(0,0,0,0.06);"></div>
-    </div>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/cytoscape/3.26.0/cytoscape.min.js"></script>
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {{
-            var cy = cytoscape({{
-                container: document.getElementById('{container_id}'),
-                elements: {json.dumps(elements)},
-                style: [
-                    {{
-                        selector: 'node',
-                        style: {{
-                            'label': 'data(label)', 'text-valign': 'center', 'color': '#212529',
-                            'background-color': 'data(color)', 'width': 'data(size)', 'height': 'data(size)',
-                            'shape': 'data(shape)', 'font-size': '14px', 'font-weight': '700',
-                            'text-outline-width': 2, 'text-outline-color': '#ffffff', 'cursor': 'pointer',
-                            'z-index': 'data(z_index)', 'box-shadow': '0 4px 6px rgba(0,0,0,0.1)'
-                        }}
-                    }},
-                    {{
-                        selector: 'edge',
-                        style: {{
-                            'width': 5, 'line-color': '#adb5bd', 'label': 'data(rel_type)',
-                            'font-size': '11px', 'font-weight': 'bold', 'color': '#2a9d8f',
-                            'target-arrow-color': '#adb5bd', 'target-arrow-shape': 'triangle',
-                            'curve-style': 'bezier', 'text-rotation': 'autorotate',
-                            'text-background-opacity': 1, 'text-background-color': '#ffffff',
-                            'text-background-padding': '4px', 'text-background-shape': 'roundrectangle'
-                        }}
-                    }},
-                    {{ selector: 'node.highlighted', style: {{ 'border-width': 6, 'border-color': '#e76f51', 'transform': 'scale(1.45)', 'z-index': 10000 }} }},
-                    {{ selector: '.dimmed', style: {{ 'opacity': 0.1, 'text-opacity': 0 }} }}
-                ],
-                layout: {{ name: 'cose', padding: 60, animate: true, nodeRepulsion: 50000, idealEdgeLength: 220 }}
-            }});
-
-            cy.on('mouseover', 'node', function(e){{
-                var sel = e.target;
-                cy.elements().addClass('dimmed');
-                sel.neighborhood().add(sel).removeClass('dimmed').addClass('highlighted');
-            }});
-            
-            cy.on('mouseout', 'node', function(e){{
-                cy.elements().removeClass('dimmed highlighted');
-            }});
-            
-            cy.on('tap', 'node', function(evt){{
-                var elementId = evt.target.id();
-                var target = window.parent.document.getElementById(elementId);
-                if (target) {{
-                    target.scrollIntoView({{behavior: "smooth", block: "center"}});
-                    target.style.backgroundColor = "#fff9db";
-                    setTimeout(function(){{ target.style.backgroundColor = "transparent"; }}, 3000);
-                }}
-            }});
-
-            document.getElementById('save_btn').addEventListener('click', function() {{
-                var png64 = cy.png({{full: true, bg: 'white', scale: 2.5}});
-                var link = document.createElement('a');
-                link.href = png64;
-                link.download = 'sis_synergy_graph.png';
-                document.body.appendChild(link);
-                link.click();
-                document.body.removeChild(link);
-            }});
-        }});
-    </script>
-    """
-    components.html(cyto_html, height=850)
-
-def fetch_author_bibliographies(author_input):
-    """Retrieves high-fidelity bibliographic data from ORCID and Semantic Scholar with years."""
-    if not author_input: return ""
-    author_list = [a.strip() for a in author_input.split(",")]
-    comprehensive_biblio = ""
-    headers = {"Accept": "application/json"}
-    
-    for auth in author_list:
-        orcid_id = None
-        try:
-            s_res = requests.get(f"https://pub.orcid.org/v3.0/search/?q={auth}", headers=headers, timeout=6).json()
-            if s_res.get('result'):
-                orcid_id = s_res['result'][0]['orcid-identifier']['path']
-        except: pass
-
-        if orcid_id:
-            try:
-                r_res = requests.get(f"https://pub.orcid.org/v3.0/{orcid_id}/record", headers=headers, timeout=6).json()
-                works = r_res.get('activities-summary', {}).get('works', {}).get('group', [])
-                comprehensive_biblio += f"\n--- ORCID REPOSITORY: {auth.upper()} ({orcid_id}) ---\n"
-                if works:
-                    for work in works[:15]:
-                        summary = work.get('work-summary', [{}])[0]
-                        title = summary.get('title', {}).get('title', {}).get('value', 'Unknown Title')
-                        year = work.get('publication-date', {}).get('year', {}).get('value', 'n.d.')
-                        comprehensive_biblio += f"• ({year}) {title}\n"
-                else: comprehensive_biblio += "- No metadata found in ORCID.\n"
-            except: pass
-        else:
-            try:
-                ss_url = f"https://api.semanticscholar.org/graph/v1/paper/search?query=author:\"{auth}\"&limit=10&fields=title,year"
-                ss_res = requests.get(ss_url, timeout=6).json()
-                papers = ss_res.get("data", [])
-                if papers:
-                    comprehensive_biblio += f"\n--- SCHOLAR DATA: {auth.upper()} ---\n"
-                    for p in papers:
-                        comprehensive_biblio += f"• ({p.get('year','n.d.')}) {p['title']}\n"
-                else: comprehensive_biblio += f"- No record found for {auth}.\n"
-            except: pass
-    return comprehensive_biblio
+# Cytoscape.js as a custom component: served from the app once vendored (components/vendor_cytoscape.py) and kept loaded in one
+# iframe across reruns, so the library is fetched and parsed once per page load, not on every render.
+CYTOSCAPE_COMPONENT = components.declare_component(
+    "sis_cytoscape", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "cytoscape")
+)
 
-# =============================================================================
-# 2. ARCHITECTURAL ONTOLOGIES (IMA & MA) - EXHAUSTIVE EXPANSION
-# =============================================================================
+def render_cytoscape_network(graph, container_id="cy_synergy_final_pipeline", positions=None, sizes=None, colors=None):
+    """Interactive Cytoscape.js engine for high-density 18D graphs (takes a parsed SemanticGraph).
 
-HUMAN_THINKING_METAMODEL = {
-    "nodes": {
-        "Human mental concentration": {
-            "color": "#ADB5BD", "shape": "rectangle", 
-            "desc": "The foundational state of cognitive focus required for interdisciplinary synthesis and logical rigor."
-        },
-        "Identity": {
-            "color": "#C6EFCE", "shape": "rectangle", 
-            "desc": "The subjective core of the researcher or agent, containing professional ethical parameters and specialized lenses."
-        },
-        "Autobiographical memory": {
-            "color": "#C6EFCE", "shape": "rectangle", 
-            "desc": "The historical database of past cycles influencing current logic."
-        },
-        "Mission": {
-            "color": "#92D050", "shape": "rectangle", 
-            "desc": "The high-level existential imperative driving the direction of inquiry and synthesis."
-        },
-        "Vision": {
-            "color": "#FFFF00", "shape": "rectangle", 
-            "desc": "Mental simulation of a desired future outcome acting as a magnetic pull for goal-setting."
-        },
-        "Goal": {
-            "color": "#00B0F0", "shape": "rectangle", 
-            "desc": "Quantifiable milestones materialize the mission within reality."
-        },
-        "Problem": {
-            "color": "#F2DCDB", "shape": "rectangle", 
-            "desc": "Obstruction preventing goal realization; gap between current and target state."
-        },
-        "Ethics/moral": {
-            "color": "#FFC000", "shape": "rectangle", 
-            "desc": "Value system filtering solution validity."
-        },
-        "Hierarchy of interests": {
-            "color": "#F8CBAD", "shape": "rectangle", 
-            "desc": "Ordering of needs dictating resource allocation."
-        },
-        "Rule": {
-            "color": "#F2F2F2", "shape": "rectangle", 
-            "desc": "Structural, logical, and legal constraints governing node interactions."
-        },
-        "Decision-making": {
-            "color": "#FFFF99", "shape": "rectangle", 
-            "desc": "Choosing efficient selection pathways toward goal achievement."
-        },
-        "Problem solving": {
-            "color": "#D9D9D9", "shape": "rectangle", 
-            "desc": "Algorithmic process removing obstructions."
-        },
-        "Conflict situation": {
-            "color": "#00FF00", "shape": "rectangle", 
-            "desc": "State where multiple goals or rules clash."
-        },
-        "Knowledge": {
-            "color": "#DDEBF7", "shape": "rectangle", 
-            "desc": "Internalized facts and theoretical models."
-        },
-        "Tool": {
-            "color": "#00B050", "shape": "rectangle", 
-            "desc": "External instruments leveraged to interact with the domain."
-        },
-        "Experience": {
-            "color": "#00B050", "shape": "rectangle", 
-            "desc": " Wisdom gained through direct application of knowledge."
-        },
-        "Classification": {
-            "color": "#CCC0DA", "shape": "rectangle", 
-            "desc": "Taxonomic act reducing cognitive load."
-        },
-        "Psychological aspect": {
-            "color": "#F8CBAD", "shape": "rectangle", 
-            "desc": "Internal outcomes on individual mental states."
-        },
-        "Sociological aspect": {
-            "color": "#00FFFF", "shape": "rectangle", 
-            "desc": "External collective impact and social changes."
-        }
-    },
-    "relations": [
-        ("Human mental concentration", "Identity", "has"), ("Identity", "Autobiographical memory", "possesses"),
-        ("Mission", "Vision", "defines"), ("Vision", "Goal", "leads to"), ("Problem", "Identity", "challenges"),
-        ("Rule", "Decision-making", "constrains"), ("Knowledge", "Classification", "organizes"),
-        ("Experience", "Psychological aspect", "forms"), ("Conflict situation", "Sociological aspect", "triggers")
-    ]
-}
-
-MENTAL_APPROACHES_ONTOLOGY = {
-    "nodes": {
-        "Perspective shifting": {
-            "color": "#00FF00", "shape": "diamond", 
-            "desc": "Rotating problem space through disparate stakeholders."
-        },
-        "Similarity and difference": {
-            "color": "#FFFF00", "shape": "diamond", 
-            "desc": "Pattern recognition act identifying anomalies."
-        },
-        "Core": {
-            "color": "#FFC000", "shape": "diamond", 
-            "desc": "Distillation of a problem into fundamental essence."
-        },
-        "Attraction": {
-            "color": "#F2A6A2", "shape": "diamond", 
-            "desc": "Force drawing disparate concepts into synthesis."
-        },
-        "Repulsion": {
-            "color": "#D9D9D9", "shape": "diamond", 
-            "desc": "Isolation of incompatible solutions or noise."
-        },
-        "Condensation": {
-            "color": "#CCC0DA", "shape": "diamond", 
-            "desc": "Reduction of vast complexity into strategic insight."
-        },
-        "Framework and foundation": {
-            "color": "#F8CBAD", "shape": "diamond", 
-            "desc": "Establishing boundaries for innovation logic."
-        },
-        "Bipolarity and dialectics": {
-            "color": "#DDEBF7", "shape": "diamond", 
-            "desc": "Synthesis through opposing tension tension."
-        },
-        "Constant": {
-            "color": "#E1C1D1", "shape": "diamond", 
-            "desc": "Identifying stable system invariants."
-        },
-        "Associativity": {
-            "color": "#E1C1D1", "shape": "diamond", 
-            "desc": "Non-linear, lateral knowledge linking."
-        },
-        "Induction": {
-            "color": "#B4C6E7", "shape": "diamond", 
-            "desc": "Building broad theory from field observations."
-        },
-        "Whole and part": {
-            "color": "#00FF00", "shape": "diamond", 
-            "desc": "Holistic vs Granular logic navigation."
-        },
-        "Mini-max": {
-            "color": "#00FF00", "shape": "diamond", 
-            "desc": "Maximum utility with minimum friction search."
-        },
-        "Addition and composition": {
-            "color": "#FF00FF", "shape": "diamond", 
-            "desc": "Building complexity through layering building blocks."
-        },
-        "Hierarchy": {
-            "color": "#C6EFCE", "shape": "diamond", 
-            "desc": "Vertical taxonomic ranking by systemic priority."
-        },
-        "Balance": {
-            "color": "#00B0F0", "shape": "diamond", 
-            "desc": "Search for dynamic equilibrium between variables."
-        },
-        "Deduction": {
-            "color": "#92D050", "shape": "diamond", 
-            "desc": "Applying broad laws to solve specifics."
-        },
-        "Abstraction and elimination": {
-            "color": "#00B0F0", "shape": "diamond", 
-            "desc": "Removing noise to reach a generic model."
-        },
-        "Pleasure and displeasure": {
-            "color": "#00FF00", "shape": "diamond", 
-            "desc": "Evaluative feedback on solution elegance."
-        },
-        "Openness and closedness": {
-            "color": "#FFC000", "shape": "diamond", 
-            "desc": "Systemic boundary state governing external data nodes."
-        }
+    With server-side `positions` the browser uses a static `preset` layout instead of animating `cose`;
+    `sizes` / `colors` ({node_id: value}) come from the graph analytics.
+    """
+    elements = graph.to_elements(positions, sizes, colors)
+    if positions:
+        layout = {"name": "preset", "fit": True, "padding": 60, "animate": False}
+    else:
+        layout = {"name": "cose", "padding": 60, "animate": True, "nodeRepulsion": 50000, "idealEdgeLength": 220}
+    CYTOSCAPE_COMPONENT(elements=elements, layout=layout, height=850, key=container_id, default=None)
+
+def stage_timeline_chart(timeline):
+    """Vega-Lite Gantt of a stage timeline; running stages extend to the latest event, the critical path is highlighted."""
+    latest = max([e["start"] for e in timeline] + [e["end"] for e in timeline if e["end"] is not None], default=0)
+    path = set(critical_path(timeline))
+    rows = [{"stage": e["stage"], "start": e["start"], "end": latest if e["end"] is None else e["end"],
+             "seconds": None if e["end"] is None else round(e["end"] - e["start"], 3), "after": ", ".join(e["deps"]) or "—",
+             "status": "running" if e["end"] is None else ("critical path" if e["stage"] in path else "done")} for e in timeline]
+    return {
+        "data": {"values": rows},
+        "mark": {"type": "bar", "cornerRadius": 3},
+        "encoding": {
+            "y": {"field": "stage", "type": "nominal", "sort": None, "title": None},
+            "x": {"field": "start", "type": "quantitative", "title": "seconds since start"},
+            "x2": {"field": "end"},
+            "color": {"field": "status", "type": "nominal", "title": None,
+                      "scale": {"domain": ["critical path", "done", "running"], "range": ["#2a9d8f", "#adb5bd", "#f4a261"]}},
+            "tooltip": [{"field": "stage"}, {"field": "seconds"}, {"field": "after"}],
+        },
+        "height": 24 * len(rows) + 20,
     }
-}
+
+def render_pipeline_result(result, show_cache=True):
+    """Renders a PipelineResult (fresh or reopened from history); returns the markdown + graph render time."""
+    phase_metrics = result.phase_metrics
+    graph = result.graph
+    st.subheader("📊 INTEGRATED PIPELINE RESULTS")
+    st.caption(" | ".join(
+        f"{phase}: cache {m['cache'].upper()} · TTFT {m['ttft']}s · {m['seconds']}s total · {m['tokens_per_sec'] or 'n/a'} tok/s"
+        + (f" · queued {m['queue_wait']}s, {m['retries']} retries" if m.get("queue_wait") or m.get("retries") else "")
+        + (f" · endpoint {m['endpoint']}" + (" (hedged)" if m.get("hedged") else "") if m.get("endpoint") else "")
+        for phase, m in phase_metrics.items()
+    ))
+    cache_hits = sum(m["cache"] == "hit" for m in phase_metrics.values())
+    cache_misses = sum(m["cache"] == "miss" for m in phase_metrics.values())
+    for failed in phase_metrics.get("Phase 2 (Cerebras)", {}).get("fallbacks", []):
+        st.caption(f"↪️ Cerebras fallback: {failed}")
+    if show_cache: st.caption(f"♻️ LLM cache: {cache_hits} hit(s), {cache_misses} miss(es)")
+    if result.digest_stats:
+        st.caption(f"🗜️ File digest: {result.digest_stats['chunks']} chunks ({result.digest_stats['cache_hits']} cached), "
+                   f"{result.digest_stats.get('reduce_rounds', 0)} reduce round(s) | "
+                   f"{result.digest_stats['raw_chars']:,} → {result.digest_stats['digest_chars']:,} chars")
+    fanout = phase_metrics.get("Phase 1 (Groq)", {}).get("fanout")
+    if fanout:
+        slowest = max(fanout, key=lambda f: fanout[f]["seconds"] or 0)
+        st.caption(f"🔀 Phase 1 fan-out: {len(fanout)} field-group requests in parallel (slowest {slowest}, {fanout[slowest]['seconds']}s) "
+                   f"+ merge {phase_metrics['Phase 1 (Groq)']['merge']['seconds']}s")
+    if result.ontology_context:
+        st.caption("🎯 Ontology context: " + " | ".join(
+            f"{phase} {c['mode']}: {c['tokens']:,}/{c['full_tokens']:,} tokens ({c['tokens'] / max(c['full_tokens'], 1) - 1:+.0%})"
+            for phase, c in result.ontology_context.items()
+        ))
+    if result.prompt_reports:
+        prompt_totals = " | ".join(f"{phase}: {report[-1]['final_tokens']:,}" for phase, report in result.prompt_reports.items())
+        with st.expander(f"🧮 PROMPT TOKEN BUDGET ({prompt_totals} system tokens)"):
+            for tb_col, report in zip(st.columns(len(result.prompt_reports)), result.prompt_reports.values()):
+                with tb_col: st.dataframe(report, use_container_width=True, hide_index=True)
+    if result.timeline:
+        with st.expander(f"⏱️ STAGE TIMELINE (critical path: {' → '.join(critical_path(result.timeline))})"):
+            st.vega_lite_chart(stage_timeline_chart(result.timeline), use_container_width=True)
+    t_render = time.perf_counter()
+    st.markdown(result.main_markdown, unsafe_allow_html=True)
+
+    # Interactive Graph Visualization
+    if graph:
+        st.subheader("🕸️ INTEGRATED SEQUENTIAL SEMANTIC NETWORK")
+        st.caption(f"Visual Mapping by Cerebras on {SYSTEM_DATE} based on Groq Research synthesis.")
+        if graph.repairs:
+            st.caption(f"🩹 Graph JSON repaired: {'; '.join(graph.repairs)}")
+        sizes = colors = None
+        analytics = result.analytics
+        if analytics:
+            g_col1, g_col2 = st.columns(2)
+            color_mode = g_col1.radio("Node colour", ["Community", "Ontology"], horizontal=True, key="graph_color_mode")
+            top_k = g_col2.number_input("Show top-k nodes by PageRank (0 = all)", 0, len(graph.nodes), 0, step=10, key="graph_top_k")
+            if top_k:
+                graph = graph.subgraph(top_k_nodes(analytics, top_k))
+            sizes = node_sizes(graph, analytics)
+            colors = community_colors(analytics) if color_mode == "Community" else None
+            leaders = sorted(analytics["pagerank"], key=analytics["pagerank"].get, reverse=True)[:5]
+            labels = {n.id: n.label for n in result.graph.nodes}
+            st.caption(f"📐 {analytics['communities']} communities · showing {len(graph.nodes)}/{len(result.graph.nodes)} nodes"
+                       f" · most central: {', '.join(labels.get(i, i) for i in leaders)}")
+        render_cytoscape_network(graph, "viz_synergy_final_950", positions=result.positions, sizes=sizes, colors=colors)
+    elif result.graph_block_present:
+        st.warning("⚠️ Error: Semantic Graph JSON could not be rendered.")
+    render_seconds = round(time.perf_counter() - t_render, 3)
+
+    if result.biblio:
+        with st.expander("📚 EXTENDED BIBLIOGRAPHIC METADATA"):
+            st.text(result.biblio)
+            if result.biblio_timings:
+                st.caption("⏱️ Per-author lookup timings (concurrent pool)")
+                st.dataframe(result.biblio_timings, use_container_width=True, hide_index=True)
+    return render_seconds
 
 # =============================================================================
-# 3. KNOWLEDGE BASE (EXHAUSTIVE 18D SCIENCE FIELDS & ONTOLOGIES)
+# 2-3. ARCHITECTURAL ONTOLOGIES (IMA & MA) & KNOWLEDGE BASE
 # =============================================================================
 
-KNOWLEDGE_BASE = {
-    "User profiles": {
-        "Adventurers": {"description": "Explorers of hidden interdisciplinary patterns and high-risk hypotheses."},
-        "Applicators": {"description": "Focused on practical efficiency, rapid deployment, and tangible execution."},
-        "Know-it-alls": {"description": "Seekers of systemic absolute clarity, comprehensive taxonomy, and complete data."},
-        "Observers": {"description": "Passive monitors of systemic dynamics and trend watchers without intervention."}
-    },
-    "Scientific paradigms": {
-        "Empiricism": "Focus on sensory experience, experimental evidence, and observation-driven data.",
-        "Rationalism": "Reliance on deductive logic, a priori reasoning, and mathematical certainty.",
-        "Constructivism": "Knowledge as a social and cognitive build, dependent on perception.",
-        "Positivism": "Strict adherence to verifiable facts and rejection of speculation.",
-        "Pragmatism": "Evaluation based on utility and real-world application."
-    },
-    "Structural models": {
-        "Causal Connections": "Chains of cause and effect mapping systemic causality.",
-        "Principles & Relations": "Fundamental laws and the inter-relations between entities.",
-        "Episodes & Sequences": "Temporal flow, historical timelines, and event ordering.",
-        "Facts & Characteristics": "Raw data properties, attributes, and static descriptions.",
-        "Generalizations": "Broad frameworks and high-level theoretical models.",
-        "Glossary": "Precise definitions and terminological clarity.",
-        "Concepts": "Abstract constructs and conceptual building blocks."
-    },
-    "Science fields": {
-        "Mathematics": {
-            "cat": "Formal", 
-            "methods": ["Axiomatization", "Formal Proof", "Stochastic Modeling", "Topology"], 
-            "tools": ["MATLAB", "LaTeX", "WolframAlpha"], 
-            "facets": ["Algebra", "Analysis", "Number Theory", "Calculus"]
-        },
-        "Physics": {
-            "cat": "Natural", 
-            "methods": ["Quantum Modeling", "Particle Tracking", "Interferometry", "Simulation"], 
-            "tools": ["Accelerator", "Spectrometer", "Oscilloscopes", "Cryostats"], 
-            "facets": ["Relativity", "Quantum Mechanics", "Thermodynamics", "Optics"]
-        },
-        "Chemistry": {
-            "cat": "Natural", 
-            "methods": ["Organic Synthesis", "Chromatography", "NMR Spectroscopy", "Titration"], 
-            "tools": ["NMR", "Mass Spec", "Incubators", "Burettes"], 
-            "facets": ["Biochemistry", "Physical Chemistry", "Analytical", "Inorganic"]
-        },
-        "Biology": {
-            "cat": "Natural", 
-            "methods": ["Gene Sequencing", "CRISPR", "Cell Culture", "In-vivo observation"], 
-            "tools": ["Electron Microscope", "PCR Machine", "Centrifuge", "Incubators"], 
-            "facets": ["Genetics", "Microbiology", "Ecology", "Cell Biology"]
-        },
-        "Neuroscience": {
-            "cat": "Natural", 
-            "methods": ["Neuroimaging", "Optogenetics", "Behavioral Mapping", "Electrophysiology"], 
-            "tools": ["fMRI", "EEG", "Electrodes", "Patch Clamp"], 
-            "facets": ["Cognitive Neuroscience", "Neural Plasticity", "Synaptic Physiology"]
-        },
-        "Psychology": {
-            "cat": "Social", 
-            "methods": ["Double-Blind Trials", "Psychometrics", "Longitudinal Studies", "CBT"], 
-            "tools": ["Standardized Tests", "Surveys", "Biofeedback", "Eye-tracking"], 
-            "facets": ["Behavioral", "Clinical", "Developmental", "Cognitive Psychology"]
-        },
-        "Sociology": {
-            "cat": "Social", 
-            "methods": ["Ethnography", "Network Analysis", "Survey Design", "Grounded Theory"], 
-            "tools": ["NVivo", "SPSS", "Census Data", "Social Graphs"], 
-            "facets": ["Demography", "Stratification", "Dynamics", "Urban Sociology"]
-        },
-        "Computer Science": {
-            "cat": "Formal", 
-            "methods": ["Algorithm Design", "Verification", "Complexity Analysis", "Parallelism"], 
-            "tools": ["GPU Clusters", "Docker", "Compilers", "IDEs", "Kubernetes"], 
-            "facets": ["AI", "Cybersecurity", "Blockchain", "Cloud Computing"]
-        },
-        "Medicine": {
-            "cat": "Applied", 
-            "methods": ["Clinical Trials", "Epidemiology", "Radiology", "Pathology"], 
-            "tools": ["MRI", "CT Scanner", "Biomarker Assays", "Ultrasound"], 
-            "facets": ["Genomics", "Immunology", "Oncology", "Internal Medicine"]
-        },
-        "Psychiatry": {
-            "cat": "Applied/Medical", 
-            "methods": ["Clinical Trials", "Diagnostic Interviewing", "Case Formulation", "Psychopharmacological Modeling", "Neuroimaging Analysis"], 
-            "tools": ["DSM-5-TR", "ICD-11", "EEG", "fMRI", "Standardized Rating Scales (PHQ-9, HAM-D)"], 
-            "facets": ["Clinical Psychiatry", "Neuropsychiatry", "Forensic Psychiatry", "Child & Adolescent Psychiatry", "Geriatric Psychiatry"]
-        },
-        "Engineering": {
-            "cat": "Applied", 
-            "methods": ["FEA Analysis", "Prototyping", "Stress Testing", "Systems Integration"], 
-            "tools": ["CAD", "3D Printers", "CNC Machines", "Simulation SW"], 
-            "facets": ["Robotics", "Nanotechnology", "Civil Eng", "Electrical Eng"]
-        },
-        "Economics": {
-            "cat": "Social", 
-            "methods": ["Econometrics", "Game Theory", "Macro Equilibrium Modeling", "Forecasting"], 
-            "tools": ["Bloomberg", "Stata", "R", "Python Pandas"], 
-            "facets": ["Finance", "Behavioral Econ", "Macroeconomics", "Microeconomics"]
-        },
-        "Philosophy": {
-            "cat": "Humanities", 
-            "methods": ["Socratic Method", "Dialectics", "Phenomenology", "Conceptual Analysis"], 
-            "tools": ["Logic Mapping", "Primary Texts", "Semantic Analysis"], 
-            "facets": ["Epistemology", "Ethics", "Metaphysics", "Aesthetics"]
-        },
-        "Linguistics": {
-            "cat": "Humanities", 
-            "methods": ["Corpus Analysis", "Syntactic Parsing", "Historical Phonetics", "Transcription"], 
-            "tools": ["Praat", "NLTK", "WordNet", "ELAN"], 
-            "facets": ["Semantics", "Phonology", "Sociolinguistics", "CompLing"]
-        },
-        "Ecology": {
-            "cat": "Natural", 
-            "methods": ["Remote Sensing", "Trophic Modeling", "Field Sampling", "Biogeochemistry"], 
-            "tools": ["GIS", "Biosensors", "Drones", "Satellite Imagery"], 
-            "facets": ["Biodiversity", "Conservation Biology", "Restoration Ecology"]
-        },
-        "History": {
-            "cat": "Humanities", 
-            "methods": ["Archival Research", "Historiography", "Oral History", "Prosopography"], 
-            "tools": ["Radiocarbon Dating", "Microfilm", "Digital Archives"], 
-            "facets": ["Military History", "Diplomacy", "Ancient Civilizations", "Social History"]
-        },
-        "Architecture": {
-            "cat": "Applied", 
-            "methods": ["Parametric Design", "Environmental Analysis", "BIM", "Urbanism"], 
-            "tools": ["Revit", "Rhino 3D", "AutoCAD", "Photogrammetry"], 
-            "facets": ["Urban Design", "Sustainability", "Landscape Arch", "Heritage"]
-        },
-        "Geology": {
-            "cat": "Natural", 
-            "methods": ["Stratigraphy", "Mineralogy", "Seismology", "Petrology"], 
-            "tools": ["Seismograph", "GIS", "Magnetometers", "Thin-sectioning"], 
-            "facets": ["Tectonics", "Petrology", "Paleontology", "Geophysics"]
-        },
-        "Geography": {
-            "cat": "Natural/Social", 
-            "methods": ["Spatial Analysis", "Geospatial Modeling", "Remote Sensing", "Field Observation", "Regional Synthesis"], 
-            "tools": ["ArcGIS/QGIS", "GPS Systems", "Satellite Imagery", "Lidar Scan", "Cartographic Software"], 
-            "facets": ["Physical Geography", "Human Geography", "Geomorphology", "Urban Geography", "Biogeography"]
-        },
-        "Climatology": {
-            "cat": "Natural", 
-            "methods": ["Climate Modeling", "Paleoclimatic Reconstruction", "Statistical Time-Series Analysis", "Numerical Simulation", "Isotope Analysis"], 
-            "tools": ["Supercomputers (HPC)", "Weather Station Arrays", "Satellite Radiometers", "Ice Core Analysis", "Radiosondes"], 
-            "facets": ["Meteorology", "Paleoclimatology", "Dynamic Climatology", "Synoptic Climatology", "Applied Climatology"]
-        },
-        "Library Science": {
-            "cat": "Applied", 
-            "methods": ["Taxonomy", "Archival Appraisal", "Retrieval Logic", "Metadata"], 
-            "tools": ["OPAC", "Metadata Systems", "Thesauri", "Digital Archives"], 
-            "facets": ["Knowledge Organization", "Information Retrieval", "Digital Curation"]
-        },
-        "Criminology": {
-            "cat": "Social", 
-            "methods": ["Profiling", "Longitudinal Studies", "Victimology Analysis", "Ethnography"], 
-            "tools": ["Crime Mapping", "AFIS", "CODIS", "SPSS"], 
-            "facets": ["Penology", "Forensic Psychology", "Police Science", "Criminal Justice"]
-        },
-        "Forensic sciences": {
-            "cat": "Applied/Natural", 
-            "methods": ["DNA Profiling", "Ballistics", "Toxicology", "Trace Analysis", "Bloodstain Pattern Analysis", "Fingerprint Identification"], 
-            "tools": ["Mass Spectrometer", "Luminol", "Comparison Microscope", "AFIS (Automated Fingerprint Identification System)", "Gas Chromatography"], 
-            "facets": ["Forensic Biology", "Forensic Chemistry", "Forensic Pathology", "Digital Forensics", "Forensic Odontology"]
-        },
-        "Legal science": {
-            "cat": "Social", 
-            "methods": ["Legal Hermeneutics", "Comparative Law", "Dogmatic Method", "Empirical Legal Research"], 
-            "tools": ["Legislative Databases", "Case Law Archives", "Constitutional Records", "Westlaw", "LexisNexis"], 
-            "facets": ["Jurisprudence", "Constitutional Law", "Criminal Law", "Civil Law", "International Law"]
-        }
-    }
-}
+# Defined in sis_ontology.py (importable without Streamlit by the batch runner and benchmarks):
+# HUMAN_THINKING_METAMODEL, MENTAL_APPROACHES_ONTOLOGY, KNOWLEDGE_BASE and their compact prompt encodings.
 
 # =============================================================================
 # 4. INTERFACE CONSTRUCTION (SIDEBAR & MAIN)
@@ -709,9 +388,19 @@ with st.sidebar:
     st.subheader("🔑 Dual-Engine API Access")
     groq_api_key = st.text_input("Groq Key (Phase 1 Synthesis):", type="password", help="Provides structural dissertation base.")
     cerebras_api_key = st.text_input("Cerebras Key (Phase 2 Ideas):", type="password", help="Provides innovations and graph JSON.")
+    # Open pooled connections (and refresh the Cerebras model catalog) while the user is still typing the inquiry
+    if groq_api_key: get_client_registry().warm(GROQ_BASE_URL, groq_api_key)
+    if cerebras_api_key: get_client_registry().warm(CEREBRAS_BASE_URL, cerebras_api_key, probe=cerebras_policy.refresh_catalog)
     
-    # Model Identifier Override for Cerebras (Solves 404)
-    cerebras_id = st.selectbox("Cerebras Model Endpoint:", ["llama-3.1-70b", "llama3.1-70b", "llama3.1-8b"], index=0)
+    # Preferred Cerebras model; invalid IDs are probed and skipped, 404/5xx fall back automatically
+    cerebras_id = st.selectbox("Cerebras Model Endpoint (preferred):", CEREBRAS_MODEL_CANDIDATES, index=0)
+    hedge_phase2 = st.toggle("🛡️ Hedge Phase 2 latency", value=False, help="Fire a second request at an alternate Cerebras model if the first is slow; keep the fastest.")
+    hedge_after = st.number_input("Hedge after (seconds):", min_value=1.0, max_value=120.0, value=8.0, step=1.0) if hedge_phase2 else None
+    use_llm_cache = st.toggle("♻️ Reuse cached LLM responses", value=True, help="Serve identical prompts from cache. Disable for fresh sampling.")
+    stream_tokens = st.toggle("⚡ Live token streaming", value=True, help="Render both phases as tokens arrive instead of waiting for the full response.")
+    ontology_retrieval = st.toggle("🎯 Query-relevant ontology (top-k)", value=False, help="Send only the IMA/MA nodes and science-field details most relevant to the inquiry (BM25) instead of the full ontologies.")
+    ontology_top_k = st.slider("Ontology entries per phase:", min_value=3, max_value=20, value=8) if ontology_retrieval else None
+    phase1_fanout = st.toggle("🔀 Per-field Phase 1 fan-out", value=False, help="Groq requests per group of selected science fields (with their methods, tools and facets) in parallel, as many as the Groq rate limit allows, then a short merge. Faster and deeper when many fields are selected.")
     
     st.divider()
     col_res, col_gui = st.columns(2)
@@ -730,22 +419,60 @@ with st.sidebar:
     st.link_button("📂 GitHub Repository", "https://github.com/", use_container_width=True)
     st.link_button("🆔 ORCID Registry", "https://orcid.org/", use_container_width=True)
     st.link_button("🎓 Google Scholar", "https://scholar.google.com/", use_container_width=True)
+
+    # BIBLIOGRAPHY CACHE MAINTENANCE
+    with st.expander("🗄️ Bibliography Cache", expanded=False):
+        biblio_cache_stats = get_biblio_cache().stats()
+        st.caption(f"{biblio_cache_stats['entries']} responses | {biblio_cache_stats['bytes'] / 1024:.1f} KiB | TTL {BIBLIO_CACHE_TTL // 3600} h")
+        purge_author = st.text_input("Invalidate author (blank = all):", key="biblio_purge_author")
+        if st.button("🧹 PURGE CACHE"):
+            if purge_author.strip():
+                purge_key = normalize_key(purge_author)
+                cached_search = get_biblio_cache().get_json("orcid_search", purge_key) or {}
+                removed = 0
+                if cached_search.get('result'):
+                    removed += get_biblio_cache().invalidate("orcid_record", cached_search['result'][0]['orcid-identifier']['path'])
+                removed += sum(get_biblio_cache().invalidate(ns, purge_key) for ns in ("orcid_search", "s2_search"))
+            else:
+                removed = get_biblio_cache().invalidate()
+            st.success(f"Removed {removed} cached responses.")
+
+    # PROVIDER CONNECTIONS (pooled clients shared across reruns and sessions)
+    with st.expander("🔌 Provider Connections", expanded=False):
+        client_stats = get_client_registry().stats()
+        if client_stats:
+            st.dataframe([{"endpoint": c["endpoint"].split("//")[-1].split("/")[0], "requests": c["requests"],
+                           "new conns": c["connections"], "TLS": c["tls_handshakes"], "reuse": c["reuse_ratio"]}
+                          for c in client_stats], use_container_width=True, hide_index=True)
+        else:
+            st.caption("No provider clients yet. Enter an API key to open a pooled connection.")
+
+    # RUN HISTORY (reopen past runs without provider calls)
+    with st.expander("🕘 Run History", expanded=False):
+        run_history = get_run_history()
+        history_stats = run_history.stats()
+        st.caption(f"{history_stats['runs']} runs | {history_stats['stored_bytes'] / 1024:.1f} KiB stored "
+                   f"({history_stats['raw_bytes'] / 1024:.1f} KiB raw)")
+        for past_run in run_history.list_runs(limit=15):
+            past_label = f"{datetime.fromtimestamp(past_run['created']).strftime('%m-%d %H:%M')} · {past_run['label'][:40] or '(empty)'}"
+            if st.button(past_label, key=f"history_{past_run['run_id']}", use_container_width=True):
+                st.session_state["active_run"] = past_run["run_id"]
+                st.rerun()
+        # Retention is process-wide, so it is configured by environment, not per session
+        st.caption(f"Keeps the newest {run_history.max_runs} runs within {run_history.max_age_days:g} days "
+                   f"(SIS_HISTORY_MAX_RUNS / SIS_HISTORY_MAX_DAYS).")
     
     # KNOWLEDGE EXPLORER (FORCED HIGH CONTRAST)
     st.divider()
     st.subheader("📚 KNOWLEDGE EXPLORER")
-    with st.expander("👤 User Profile Ontologies", expanded=False):
-        for p, d in KNOWLEDGE_BASE["User profiles"].items(): st.markdown(f"**{p}**: {d['description']}")
-    with st.expander("🧠 Mental Approach (MA) Map", expanded=False):
-        for m, d in MENTAL_APPROACHES_ONTOLOGY["nodes"].items(): st.markdown(f"• **{m}**: {d['desc']}")
-    with st.expander("🏛️ Metamodel (IMA) Structures", expanded=False):
-        for n, d in HUMAN_THINKING_METAMODEL["nodes"].items(): st.markdown(f"• **{n}**: {d['desc']}")
-    with st.expander("🌍 Scientific Paradigms", expanded=False):
-        for p, d in KNOWLEDGE_BASE["Scientific paradigms"].items(): st.markdown(f"**{p}**: {d}")
-    with st.expander("🔬 Science Taxonomy", expanded=False):
-        for s in sorted(KNOWLEDGE_BASE["Science fields"].keys()): st.markdown(f"• **{s}**")
-    with st.expander("🏗️ Structural Model Context", expanded=False):
-        for m, d in KNOWLEDGE_BASE["Structural models"].items(): st.markdown(f"**{m}**: {d}")
+    explorer_query = st.text_input("🔎 Search ontologies:", placeholder="e.g. dialectic, fMRI, causal", key="explorer_query")
+    if explorer_query.strip():
+        explorer_hits = get_ontology_index().search(explorer_query)
+        st.caption(f"{len(explorer_hits)} matching entr{'y' if len(explorer_hits) == 1 else 'ies'}")
+        if explorer_hits: st.markdown("\n\n".join(entry.markdown() for entry in explorer_hits))
+    else:
+        for section_title, section_md in EXPLORER_MARKDOWN.items():
+            with st.expander(section_title, expanded=False): st.markdown(section_md)
 
 # --- MAIN PAGE CONTENT ---
 st.markdown('<h1 class="main-header-gradient">🧱 SIS Universal Knowledge Synthesizer</h1>', unsafe_allow_html=True)
@@ -772,12 +499,12 @@ st.markdown("### 🛠️ CONFIGURE SYNERGY PIPELINE")
 # Entry Rows
 r1c1, r1c2, r1c3 = st.columns([1.5, 2, 1])
 with r1c1: target_authors = st.text_input("👤 Authors for ORCID Analysis:", placeholder="Karl Petrič, Samo Kralj, Teodor Petrič")
-with r1c2: sel_sciences = st.multiselect("2. Select Science Fields:", sorted(list(KNOWLEDGE_BASE["Science fields"].keys())), default=["Physics", "Psychology", "Sociology"])
+with r1c2: sel_sciences = st.multiselect("2. Select Science Fields:", SCIENCE_FIELD_OPTIONS, default=["Physics", "Psychology", "Sociology"])
 with r1c3: expertise = st.select_slider("3. Expertise Level:", ["Novice", "Intermediate", "Expert"], value="Expert")
 
 r2c1, r2c2, r2c3 = st.columns(3)
-with r2c1: sel_paradigms = st.multiselect("4. Scientific Paradigms:", list(KNOWLEDGE_BASE["Scientific paradigms"].keys()), default=["Rationalism"])
-with r2c2: sel_models = st.multiselect("5. Structural Models:", list(KNOWLEDGE_BASE["Structural models"].keys()), default=["Concepts"])
+with r2c1: sel_paradigms = st.multiselect("4. Scientific Paradigms:", PARADIGM_OPTIONS, default=["Rationalism"])
+with r2c2: sel_models = st.multiselect("5. Structural Models:", STRUCTURAL_MODEL_OPTIONS, default=["Concepts"])
 with r2c3: goal_context = st.selectbox("6. Strategic Project Goal:", ["Scientific Research", "Problem Solving", "Educational", "Policy Making"])
 
 st.divider()
@@ -791,128 +518,201 @@ with col_inq2:
 with col_inq3:
     uploaded_file = st.file_uploader("📂 ATTACH DATA (.txt only):", type=['txt'], help="Context for both AI engines.")
     file_content = ""
+    large_file_mode = False
     if uploaded_file: 
-        file_content = uploaded_file.read().decode("utf-8")
-        st.success(f"Context from {uploaded_file.name} integrated.")
+        large_file_mode = st.toggle("🗜️ Large-file digest mode", value=uploaded_file.size > LARGE_FILE_BYTES,
+                                    help="Stream the file in chunks and condense it (map-reduce) before it enters the prompts.")
+        if large_file_mode:
+            st.info(f"{uploaded_file.name} ({uploaded_file.size / 1024:.0f} KiB) will be digested at execution.")
+        else:
+            file_content = uploaded_file.read().decode("utf-8")
+            st.success(f"Context from {uploaded_file.name} integrated.")
+
+@st.cache_data(show_spinner=False)
+def static_prompt_tokens():
+    """Token counts of the fixed ontology encodings, computed once per process."""
+    return estimate_tokens(IMA_PROMPT_ENCODING), estimate_tokens(MA_PROMPT_ENCODING)
+
+# Pre-submission prompt size estimate (bibliography and Phase 1 output are added at run time)
+ima_tokens, ma_tokens = static_prompt_tokens()
+est_file_tokens = estimate_tokens(fit_section("file_context", file_content, DEFAULT_BUDGETS["file_context"]))
+est_phase1 = ima_tokens + est_file_tokens + estimate_tokens(user_query) + 150
+est_phase2 = ma_tokens + estimate_tokens(idea_query) + 250
+st.caption(f"🧮 Estimated prompt size: Phase 1 ≈ {est_phase1:,} tokens (+ bibliography) | Phase 2 ≈ {est_phase2:,} tokens (+ Phase 1 output)")
 
 # =============================================================================
 # 5. SYNERGY EXECUTION ENGINE (GROQ -> CEREBRAS PIPELINE)
 # =============================================================================
 
-if st.button("🚀 EXECUTE MULTI-DIMENSIONAL SEQUENTIAL SYNERGY PIPELINE", use_container_width=True):
+execute_clicked = st.button("🚀 EXECUTE MULTI-DIMENSIONAL SEQUENTIAL SYNERGY PIPELINE", use_container_width=True)
+if execute_clicked:
     if not groq_api_key or not cerebras_api_key:
         st.error("❌ Dual-Model synergy requires both Groq and Cerebras keys.")
     elif not user_query:
         st.warning("⚠️ Phase 1 Research Inquiry is required to establish foundation.")
     else:
+        # Long-lived pooled clients: back-to-back runs reuse warm connections
+        groq_client = get_client_registry().get(GROQ_BASE_URL, groq_api_key)
+        cerebras_client = get_client_registry().get(CEREBRAS_BASE_URL, cerebras_api_key)
+
+        pipeline_request = PipelineRequest(
+            user_query=user_query, idea_query=idea_query, authors=target_authors,
+            sciences=sel_sciences, paradigms=sel_paradigms, models=sel_models,
+            goal=goal_context, expertise=expertise, file_content=file_content,
+            cerebras_model=cerebras_id, hedge_after=hedge_after, ontology_top_k=ontology_top_k,
+            use_cache=use_llm_cache, stream=stream_tokens, phase1_fanout=phase1_fanout
+        )
+        if large_file_mode and uploaded_file: uploaded_file.seek(0)
+
+        # Reuse a Phase 1 foundation preserved from an earlier Phase 2 failure with the same inputs
+        p1_key = phase1_fingerprint(pipeline_request) + (f":{uploaded_file.name}:{uploaded_file.size}" if large_file_mode and uploaded_file else "")
+        p1_checkpoint = st.session_state.get("phase1_checkpoint")
+        phase1_text = p1_checkpoint["text"] if p1_checkpoint and p1_checkpoint["key"] == p1_key else None
+
+        # The run happens in a background job: this page (and any reload of it) polls and reattaches.
+        # An identical run already in flight (e.g. from another session) is joined instead of repeated.
+        subscriber = uuid.uuid4().hex[:8]
         try:
-            # Init Clients
-            groq_client = OpenAI(api_key=groq_api_key, base_url="https://api.groq.com/openai/v1")
-            cerebras_client = OpenAI(api_key=cerebras_api_key, base_url="https://api.cerebras.ai/v1")
-            
-            # Fetch Metadata
-            biblio = fetch_author_bibliographies(target_authors) if target_authors else ""
-
-            # --- PHASE 1: GROQ ---
-            with st.spinner('PHASE 1: Groq synthesizing structural foundation (IMA Logic)...'):
-                groq_sys_prompt = f"""
-                You are the SIS Research Synthesizer (Phase 1).
-                STRICT IMA ARCHITECTURE FOCUS: {json.dumps(HUMAN_THINKING_METAMODEL)}
-                
-                CONTEXT:
-                Date: {SYSTEM_DATE}
-                Sciences: {sel_sciences}. Paradigms: {sel_paradigms}. Models: {sel_models}.
-                Authors: {biblio}. Data Context: {file_content}
-                
-                Task: Provide a factual, structural interdisciplinary foundation (approx 1500 words).
-                Do not generate innovations or graphs yet. Only the research base.
-                """
-                
-                groq_response = groq_client.chat.completions.create(
-                    model="llama-3.3-70b-versatile",
-                    messages=[{"role": "system", "content": groq_sys_prompt}, {"role": "user", "content": user_query}],
-                    temperature=0.4
-                )
-                groq_synthesis = groq_response.choices[0].message.content
-
-            # --- PHASE 2: CEREBRAS ---
-            with st.spinner('PHASE 2: Cerebras producing innovative ideas and semantic mapping (MA Logic)...'):
-                cerebras_sys_prompt = f"""
-                You are the SIS Innovation Engine (Phase 2). 
-                STRICT MENTAL APPROACHES (MA) FOCUS: {json.dumps(MENTAL_APPROACHES_ONTOLOGY)}
-                
-                TASK:
-                1. Review the RESEARCH FOUNDATION generated by your partner (Groq).
-                2. Apply MA logic (Dialectics, Perspective Shifting, Core) to generate radical 'Useful Innovative Ideas'.
-                3. End your response with '### SEMANTIC_GRAPH_JSON' followed by a valid JSON network (45-65 nodes).
-                
-                Visual Rules: 
-                - IMA nodes (rectangles) for structural/factual concepts.
-                - MA nodes (diamonds) for cognitive filters and generative steps.
-                - Use colors provided in the ontology dictionaries.
-                
-                JSON schema: {{"nodes": [{{"id": "n1", "label": "Text", "type": "Root|Branch", "color": "#hex", "shape": "rectangle|diamond"}}], "edges": [{{"source": "n1", "target": "n2", "rel_type": "AS|BT|outcome_of"}}]}}
-                """
-                
-                cerebras_prompt = f"GROQ RESEARCH FOUNDATION (FOUNDATION):\n{groq_synthesis}\n\nUSER INNOVATION REQUEST (GOAL):\n{idea_query}"
-                
-                # USING DYNAMIC MODEL ENDPOINT
-                cerebras_response = cerebras_client.chat.completions.create(
-                    model=cerebras_id, 
-                    messages=[{"role": "system", "content": cerebras_sys_prompt}, {"role": "user", "content": cerebras_prompt}],
-                    temperature=0.85
-                )
-                cerebras_innovation = cerebras_response.choices[0].message.content
-
-            # --- COMBINING AND RENDERING ---
-            combined_content = f"## 📚 Phase 1: Research Foundation (Groq)\n{groq_synthesis}\n\n---\n## 💡 Phase 2: Useful Innovative Ideas (Cerebras)\n{cerebras_innovation}"
-            
-            parts = combined_content.split("### SEMANTIC_GRAPH_JSON")
-            main_markdown = parts[0]
-            
-            # Semantic Processing (Google Links + Anchor linking)
-            if len(parts) > 1:
-                try:
-                    g_json = json.loads(re.search(r'\{.*\}', parts[1], re.DOTALL).group())
-                    for n in g_json.get("nodes", []):
-                        lbl, nid = n["label"], n["id"]
-                        g_url = urllib.parse.quote(lbl)
-                        pattern = re.compile(re.escape(lbl), re.IGNORECASE)
-                        replacement = f'<span id="{nid}"><a href="https://www.google.com/search?q={g_url}" target="_blank" class="semantic-node-highlight">{lbl}<i class="google-icon">↗</i></a></span>'
-                        main_markdown = pattern.sub(replacement, main_markdown, count=1)
-                except: pass
-
-            st.subheader("📊 INTEGRATED PIPELINE RESULTS")
-            st.markdown(main_markdown, unsafe_allow_html=True)
-
-            # Interactive Graph Visualization
-            if len(parts) > 1:
-                try:
-                    g_json = json.loads(re.search(r'\{.*\}', parts[1], re.DOTALL).group())
-                    st.subheader("🕸️ INTEGRATED SEQUENTIAL SEMANTIC NETWORK")
-                    st.caption(f"Visual Mapping by Cerebras on {SYSTEM_DATE} based on Groq Research synthesis.")
-                    
-                    elements = []
-                    for n in g_json.get("nodes", []):
-                        level = n.get("type", "Branch")
-                        size = 110 if level == "Root" else 90
-                        elements.append({"data": {
-                            "id": n["id"], "label": n["label"], "color": n.get("color", "#2a9d8f"),
-                            "size": size, "shape": n.get("shape", "rectangle"), "z_index": 1
-                        }})
-                    for e in g_json.get("edges", []):
-                        elements.append({"data": {
-                            "source": e["source"], "target": e["target"], "rel_type": e.get("rel_type", "AS")
-                        }})
-                    render_cytoscape_network(elements, "viz_synergy_final_950")
-                except: st.warning("⚠️ Error: Semantic Graph JSON could not be rendered.")
-
-            if biblio:
-                with st.expander("📚 EXTENDED BIBLIOGRAPHIC METADATA"):
-                    st.text(biblio)
-
-        except Exception as e:
-            st.error(f"❌ Sequential Synergy Failure: {e}")
+            job = get_job_manager().submit_pipeline(
+                pipeline_request, groq_client, cerebras_client, phase1_text=phase1_text,
+                file_stream=uploaded_file if large_file_mode and uploaded_file and phase1_text is None else None,
+                meta={"p1_key": p1_key, "ab_key": normalize_key(f"{user_query}\n{idea_query}"),
+                      "conn_before": get_client_registry().totals()},
+                subscriber=subscriber, version=VERSION_CODE,
+            )
+        except JobRejected as e:
+            st.warning(f"🚦 Server busy, run not queued: {e}")
+        else:
+            st.session_state["active_job"] = {"id": job.job_id, "sub": subscriber}
+            st.session_state.pop("active_run", None)
+            st.query_params.update(job=job.job_id, sub=subscriber)
+
+# A reloaded page that still carries ?job=<id>&sub=<subscriber> reattaches to the run in progress
+if "active_job" not in st.session_state and st.query_params.get("job"):
+    st.session_state["active_job"] = {"id": st.query_params["job"], "sub": st.query_params.get("sub")}
+
+def detach_job():
+    st.session_state.pop("active_job", None)
+    st.query_params.pop("job", None)
+    st.query_params.pop("sub", None)
+
+@st.fragment(run_every=1.0)
+def job_monitor(job_id, subscriber):
+    """Polls a background job once a second; a full rerun picks up the outcome once it has finished."""
+    job = get_job_manager().get(job_id)
+    if job is None or not job.active():
+        st.rerun()
+    if len(job.subscribers) > 1:
+        st.caption(f"👥 Shared run: {len(job.subscribers)} sessions submitted this same inquiry; the providers are called once.")
+    if job.status == "queued":
+        st.info(f"⏳ Queued for a worker ({time.time() - job.created:.0f}s)...")
+    else:
+        st.info(f"⏳ {'Cancelling...' if job.cancel_event.is_set() else job.message or 'Starting pipeline...'} ({time.time() - job.started:.0f}s)")
+    if job.timeline:
+        st.vega_lite_chart(stage_timeline_chart(job.timeline), use_container_width=True)
+    if job.meta["request"].stream:
+        if job.live.get("groq"):
+            st.markdown("#### 📚 Phase 1 (Groq) — live")
+            st.markdown(job.live["groq"] + " ▌")
+        if job.live.get("cerebras"):
+            st.markdown("#### 💡 Phase 2 (Cerebras) — live")
+            st.markdown(job.live["cerebras"].split(GRAPH_MARKER)[0] + " ▌")
+    if st.button("⏹️ CANCEL RUN", disabled=job.cancel_event.is_set(), key=f"cancel_{job_id}"):
+        if not get_job_manager().cancel(job_id, subscriber):
+            # Other sessions still wait for this run: only this page leaves it
+            detach_job()
+            st.rerun()
+
+finished_job = None
+if st.session_state.get("active_job"):
+    job = get_job_manager().get(st.session_state["active_job"]["id"])
+    if job is not None and job.active():
+        job_monitor(job.job_id, st.session_state["active_job"]["sub"])
+    else:
+        # Finished (or expired from the job registry): show the outcome once, then drop the job
+        finished_job = job
+        detach_job()
+
+if finished_job is not None and finished_job.status == "done":
+    result = finished_job.result
+    pipeline_request = finished_job.meta["request"]
+    st.session_state.pop("phase1_checkpoint", None)
+    # The job has already stored the run in the history and recorded its telemetry
+    st.session_state["active_run"] = finished_job.run_id
+    phase_metrics = result.phase_metrics
+    graph = result.graph
+    render_seconds = render_pipeline_result(result, show_cache=pipeline_request.use_cache)
+    # Rendering happens after the job recorded the run, so it is logged as its own stage
+    observe_stage("rendering", render_seconds, VERSION_CODE, run_id=finished_job.run_id)
+
+    # Full-dump vs top-k comparison for the same inquiry (one slot per ontology mode)
+    ab_runs = st.session_state.setdefault("ontology_ab", {}).setdefault(finished_job.meta["ab_key"], {})
+    ab_runs["full" if pipeline_request.ontology_top_k is None else "top-k"] = {
+        "mode": result.ontology_context["Phase 1 (Groq)"]["mode"],
+        "ontology tokens": sum(c["tokens"] for c in result.ontology_context.values()),
+        "system tokens": sum(r[-1]["final_tokens"] for r in result.prompt_reports.values()),
+        "Phase 1 s": phase_metrics["Phase 1 (Groq)"]["seconds"],
+        "Phase 2 s": phase_metrics["Phase 2 (Cerebras)"]["seconds"],
+        "graph nodes": len(graph.nodes) if graph else 0,
+        "Phase 2 words": len(result.cerebras_innovation.split(GRAPH_MARKER)[0].split()),
+        "innovation": result.cerebras_innovation.split(GRAPH_MARKER)[0],
+    }
+    if len(ab_runs) == 2:
+        with st.expander("⚖️ FULL ONTOLOGY vs TOP-K RETRIEVAL (same inquiry)"):
+            st.dataframe([{k: v for k, v in run.items() if k != "innovation"} for run in ab_runs.values()], use_container_width=True, hide_index=True)
+            for ab_col, run in zip(st.columns(2), ab_runs.values()):
+                with ab_col:
+                    st.markdown(f"**{run['mode']}**")
+                    st.markdown(run["innovation"])
+    else:
+        st.caption("⚖️ Run the same inquiry with the other ontology mode to compare tokens and output side by side.")
+
+    telemetry = dict(finished_job.meta["telemetry"])
+    telemetry["stages"] = dict(telemetry["stages"], rendering=render_seconds)
+    conn_before, conn_after = finished_job.meta["conn_before"], finished_job.meta["conn_after"]
+    with st.expander(f"📈 RUN TELEMETRY ({telemetry['total_seconds']}s wall)"):
+        st.caption(f"🔌 {conn_after['requests'] - conn_before['requests']} provider HTTP requests · {conn_after['connections'] - conn_before['connections']} new connections · "
+                   f"{conn_after['tls_handshakes'] - conn_before['tls_handshakes']} TLS handshakes · 🖥️ rendered in {render_seconds}s")
+        tm_col1, tm_col2 = st.columns(2)
+        with tm_col1: st.dataframe([{"stage": k, "seconds": v} for k, v in telemetry["stages"].items()], use_container_width=True, hide_index=True)
+        with tm_col2: st.dataframe([{"provider": k, **v} for k, v in telemetry["providers"].items()], use_container_width=True, hide_index=True)
+        dl_col1, dl_col2 = st.columns(2)
+        with dl_col1: st.download_button("⬇️ Run record (JSONL)", json.dumps(telemetry) + "\n", file_name="sis_telemetry.jsonl", mime="application/jsonl")
+        with dl_col2: st.download_button("⬇️ Prometheus metrics", get_metrics_registry().render(), file_name="sis_metrics.prom", mime="text/plain")
+
+elif finished_job is not None:
+    e = finished_job.error
+    if isinstance(e, PhaseFailure) and e.result.groq_synthesis:
+        st.session_state["phase1_checkpoint"] = {"key": finished_job.meta["p1_key"], "text": e.result.groq_synthesis}
+        if finished_job.status == "cancelled":
+            st.warning(f"⏹️ Run cancelled during {e.phase}.")
+        else:
+            st.error(f"❌ Sequential Synergy Failure in {e.phase}: {e.cause}")
+        st.info("💾 Phase 1 foundation preserved. Execute again with the same inputs to retry Phase 2 only.")
+        with st.expander("📚 PRESERVED PHASE 1: RESEARCH FOUNDATION (GROQ)", expanded=True):
+            st.markdown(e.result.groq_synthesis)
+    elif finished_job.status == "cancelled":
+        st.warning("⏹️ Run cancelled.")
+    elif isinstance(e, ProviderOverloaded):
+        st.warning(f"🚦 Provider busy, request not queued: {e}")
+    else:
+        st.error(f"❌ Sequential Synergy Failure: {e}")
+
+# Reopen the active run from history on any other rerun (no provider calls)
+if finished_job is None and not st.session_state.get("active_job") and st.session_state.get("active_run"):
+    stored_run = get_run_history().load(st.session_state["active_run"])
+    if stored_run is None:
+        st.session_state.pop("active_run")
+    else:
+        reopen_col, close_col = st.columns([5, 1])
+        with reopen_col:
+            st.info(f"📂 Showing stored run from {datetime.fromtimestamp(stored_run['created']).strftime('%Y-%m-%d %H:%M')} "
+                    f"({stored_run.get('version') or 'unknown version'}): “{stored_run['request']['user_query'][:120]}” — reopened without provider calls.")
+        with close_col:
+            if st.button("✖️ CLOSE RUN", use_container_width=True):
+                st.session_state.pop("active_run")
+                st.rerun()
+        render_pipeline_result(PipelineResult.from_record(stored_run["result"]), show_cache=False)
 
 # =============================================================================
 # 6. FOOTER & METRICS
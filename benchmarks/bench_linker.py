@@ -0,0 +1,74 @@
+"""
+Micro-benchmark: single-pass semantic node linker vs. the legacy per-node regex loop.
+
+Run from the repository root:
+    python benchmarks/bench_linker.py [--words 3000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sis_graph import GraphNode, link_semantic_nodes  # noqa: E402
+
+VOCAB = ("system entropy cognition network dialectic paradigm structure signal feedback emergence "
+         "identity mission problem vision goal ethics hierarchy knowledge rule decision").split()
+
+
+def legacy_link(markdown, nodes):
+    """The original loop: one compiled regex and one full-text substitution per node."""
+    for n in nodes:
+        lbl, nid = n.label, n.id
+        g_url = urllib.parse.quote(lbl)
+        pattern = re.compile(re.escape(lbl), re.IGNORECASE)
+        replacement = f'<span id="{nid}"><a href="https://www.google.com/search?q={g_url}" target="_blank" class="semantic-node-highlight">{lbl}<i class="google-icon">↗</i></a></span>'
+        markdown = pattern.sub(replacement, markdown, count=1)
+    return markdown
+
+
+def make_case(n_labels, n_words, seed=7):
+    rng = random.Random(seed)
+    labels = []
+    seen = set()
+    while len(labels) < n_labels:
+        lbl = " ".join(rng.choice(VOCAB) for _ in range(rng.randint(1, 3))) + f" {len(labels)}"
+        if lbl not in seen:
+            seen.add(lbl)
+            labels.append(lbl)
+    nodes = [GraphNode(id=f"n{i}", label=lbl) for i, lbl in enumerate(labels)]
+    words = [rng.choice(VOCAB) for _ in range(n_words)]
+    for lbl in rng.sample(labels, min(len(labels), n_words // 20)):
+        words.insert(rng.randrange(len(words)), lbl)
+    return " ".join(words), nodes
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--words", type=int, default=3000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'labels':>8} {'legacy ms':>12} {'single-pass ms':>15} {'speedup':>9}")
+    for n_labels in (50, 500, 5000):
+        text, nodes = make_case(n_labels, args.words)
+        legacy = best_of(lambda: legacy_link(text, nodes), args.repeat)
+        single = best_of(lambda: link_semantic_nodes(text, nodes), args.repeat)
+        print(f"{n_labels:>8} {legacy * 1000:>12.2f} {single * 1000:>15.2f} {legacy / single:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
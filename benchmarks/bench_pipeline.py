@@ -0,0 +1,243 @@
+"""
+End-to-end pipeline benchmark against local stub servers (no network, no API keys).
+
+Starts stand-ins for Groq/Cerebras (OpenAI-compatible) and ORCID/Semantic Scholar,
+then runs each scenario as N concurrent simulated sessions through `run_pipeline`
+and reports end-to-end and per-stage latency, throughput and peak RSS. Results can
+be saved as a baseline and later runs compared against it.
+
+Run from the repository root:
+    python benchmarks/bench_pipeline.py [--sessions 4] [--scenarios baseline,large_graph]
+    python benchmarks/bench_pipeline.py --save-baseline      # record benchmarks/baseline_pipeline.json
+    python benchmarks/bench_pipeline.py --compare            # exit 1 on a regression
+    python benchmarks/bench_pipeline.py --compare --stage-floor bibliography=0.2   # per-stage noise floor
+    python benchmarks/bench_pipeline.py --repeat 5           # median of 5 repetitions per scenario
+    python benchmarks/bench_pipeline.py --default-limits     # keep the shipped provider rate limits
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Isolated caches and effectively unlimited provider quotas (unless --default-limits);
+# must be set before the sis_* imports.
+os.environ["SIS_CACHE_DIR"] = tempfile.mkdtemp(prefix="sis_bench_")
+for provider in () if "--default-limits" in sys.argv else ("GROQ", "CEREBRAS"):
+    os.environ.setdefault(f"SIS_{provider}_RPM", "1000000")
+    os.environ.setdefault(f"SIS_{provider}_TPM", "1000000000")
+    os.environ.setdefault(f"SIS_{provider}_MAX_QUEUE", "1024")
+    os.environ.setdefault(f"SIS_{provider}_MAX_CONCURRENCY", "1024")
+
+from stubs import BiblioStub, LLMStub  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_pipeline.json")
+
+SCENARIOS = {
+    "baseline": {"authors": 2, "upload_kib": 0, "graph_nodes": 55},
+    "large_upload": {"authors": 0, "upload_kib": 1024, "graph_nodes": 55},
+    "many_authors": {"authors": 40, "upload_kib": 0, "graph_nodes": 55},
+    # Graph JSON dominates this reply, so the stub streams it faster to keep the run about post-processing
+    "large_graph": {"authors": 0, "upload_kib": 0, "graph_nodes": 1500, "tps": 20000.0},
+    # Eight selected fields as one Phase 1 request vs. fanned out per field plus a merge, at a 70B-class token rate
+    "many_fields": {"authors": 0, "upload_kib": 0, "graph_nodes": 55, "sciences": 8, "tps": 250.0},
+    "many_fields_fanout": {"authors": 0, "upload_kib": 0, "graph_nodes": 55, "sciences": 8, "fanout": True, "tps": 250.0},
+}
+SCIENCES = ["Physics", "Psychology", "Sociology", "Biology", "Mathematics", "Economics", "Philosophy", "Linguistics"]
+
+
+def make_upload(kib, seed):
+    rng = random.Random(seed)
+    words = "theory method evidence entropy network structure cognition model".split()
+    lines = []
+    size = 0
+    while size < kib * 1024:
+        line = f"{seed}: " + " ".join(rng.choice(words) for _ in range(14)) + "\n"
+        lines.append(line)
+        size += len(line)
+    return "".join(lines).encode("utf-8")
+
+
+def run_session(sid, scenario, spec, clients, stream):
+    from sis_pipeline import PipelineRequest, run_pipeline
+    authors = ", ".join(f"{'Scholar' if k % 3 == 0 else 'Author'} {scenario} {sid}-{k}" for k in range(spec["authors"]))
+    request = PipelineRequest(user_query=f"{scenario} inquiry {sid}", idea_query=f"{scenario} ideas {sid}",
+                              authors=authors, use_cache=False, stream=stream,
+                              sciences=SCIENCES[:spec.get("sciences", 3)], phase1_fanout=spec.get("fanout", False))
+    upload = io.BytesIO(make_upload(spec["upload_kib"], f"{scenario}-{sid}")) if spec["upload_kib"] else None
+    t0 = time.perf_counter()
+    result = run_pipeline(request, *clients, file_stream=upload,
+                          on_groq_text=(lambda t: None) if stream else None,
+                          on_cerebras_text=(lambda t: None) if stream else None)
+    wall = time.perf_counter() - t0
+    tokens = sum(m.get("completion_tokens") or 0 for m in result.phase_metrics.values())
+    return wall, result.timings, tokens
+
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run_scenario(name, spec, sessions, llm, clients, stream, default_tps, rep=0):
+    """One run of `sessions` concurrent sessions; `rep` gives repetitions distinct inputs, so none hits a cache."""
+    llm.graph_nodes = spec["graph_nodes"]
+    llm.tokens_per_sec = spec.get("tps", default_tps)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        runs = list(pool.map(lambda sid: run_session(sid, name, spec, clients, stream), range(rep * sessions, (rep + 1) * sessions)))
+    elapsed = time.perf_counter() - t0
+    walls = [w for w, _, _ in runs]
+    stages = sorted({s for _, timings, _ in runs for s in timings})
+    return {
+        "sessions": sessions,
+        "e2e_p50": round(statistics.median(walls), 3),
+        "e2e_p95": round(percentile(walls, 0.95), 3),
+        "sessions_per_min": round(60 * sessions / elapsed, 2),
+        "tokens_per_sec": round(sum(t for _, _, t in runs) / elapsed, 1),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {s: round(statistics.mean(t.get(s, 0.0) for _, t, _ in runs), 3) for s in stages},
+    }
+
+
+def combine_repeats(reps):
+    """Median of each metric over repeated runs of one scenario, plus the run-to-run range (max - min).
+
+    The stubs are deterministic, so sessions within one run barely differ; the range between
+    whole repetitions is what captures machine noise.
+    """
+    def spread(values):
+        return round(max(values) - min(values), 3)
+
+    stages = sorted({s for r in reps for s in r["stages"]})
+    combined = {k: round(statistics.median(r[k] for r in reps), 3)
+                for k in ("e2e_p50", "e2e_p95", "sessions_per_min", "tokens_per_sec", "peak_rss_mb")}
+    return {
+        "sessions": reps[0]["sessions"],
+        "repeats": len(reps),
+        **combined,
+        "stages": {s: round(statistics.median(r["stages"].get(s, 0.0) for r in reps), 3) for s in stages},
+        "e2e_range": spread([r["e2e_p50"] for r in reps]),
+        "stage_range": {s: spread([r["stages"].get(s, 0.0) for r in reps]) for s in stages},
+    }
+
+
+def compare(current, baseline, tolerance, floor=0.1, stage_floors=None):
+    """Prints latency deltas vs. the baseline; returns the list of regressions.
+
+    Both sides are medians over repetitions. A slowdown is flagged when it exceeds
+    `tolerance` and an absolute noise margin: the stage's floor (`stage_floors`, else
+    `floor`) or the larger run-to-run range of the two, whichever is bigger.
+    """
+    stage_floors = stage_floors or {}
+    regressions = []
+    print(f"\n{'scenario':<18} {'metric':<22} {'baseline':>10} {'current':>10} {'delta':>8} {'margin':>8}")
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        e2e_spread = max(base.get("e2e_range", 0.0), cur["e2e_range"])
+        pairs = [("e2e_p50", base["e2e_p50"], cur["e2e_p50"], floor, e2e_spread),
+                 ("e2e_p95", base["e2e_p95"], cur["e2e_p95"], floor, e2e_spread)]
+        pairs += [(f"stage:{s}", base["stages"][s], v, stage_floors.get(s, floor),
+                   max(base.get("stage_range", {}).get(s, 0.0), cur["stage_range"][s]))
+                  for s, v in cur["stages"].items() if s in base["stages"]]
+        for metric, b, c, metric_floor, spread in pairs:
+            delta = (c - b) / b if b else 0.0
+            margin = max(metric_floor, spread)
+            flag = ""
+            if c > b * (1 + tolerance) and c - b > margin:
+                flag = "  REGRESSION"
+                regressions.append((name, metric))
+            print(f"{name:<18} {metric:<22} {b:>10.3f} {c:>10.3f} {delta:>+7.0%} {margin:>8.3f}{flag}")
+    return regressions
+
+
+def parse_stage_floors(items):
+    """["bibliography=0.2", ...] -> {"bibliography": 0.2}."""
+    floors = {}
+    for item in items:
+        stage, _, seconds = item.partition("=")
+        floors[stage.strip()] = float(seconds)
+    return floors
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sessions", type=int, default=4, help="concurrent simulated sessions per scenario")
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    ap.add_argument("--ttft", type=float, default=0.2, help="stub time to first token (s)")
+    ap.add_argument("--tps", type=float, default=800.0, help="stub generation rate (tokens/s per stream)")
+    ap.add_argument("--biblio-latency", type=float, default=0.05, help="stub ORCID/S2 latency per request (s)")
+    ap.add_argument("--no-stream", action="store_true", help="use blocking completions like the batch runner")
+    ap.add_argument("--default-limits", action="store_true", help="run under the default provider rate limits instead of unlimited quotas")
+    ap.add_argument("--baseline", default=DEFAULT_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown before flagging")
+    ap.add_argument("--floor", type=float, default=0.1, help="smallest absolute slowdown (s) flagged for any metric")
+    ap.add_argument("--stage-floor", action="append", default=[], metavar="STAGE=SECONDS",
+                    help="per-stage absolute floor, overriding --floor (repeatable)")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per scenario; medians are reported and their range sets the noise margin")
+    args = ap.parse_args()
+
+    with LLMStub(ttft=args.ttft, tokens_per_sec=args.tps) as llm, BiblioStub(latency=args.biblio_latency) as biblio:
+        os.environ["SIS_ORCID_BASE_URL"] = f"{biblio.url}/orcid/v3.0"
+        os.environ["SIS_S2_BASE_URL"] = f"{biblio.url}/s2/graph/v1"
+        from sis_clients import get_client_registry
+        registry = get_client_registry()
+        clients = (registry.get(f"{llm.url}/groq/v1", "stub"), registry.get(f"{llm.url}/cerebras/v1", "stub"))
+
+        names = args.scenarios.split(",")
+        reps = {name: [] for name in names}
+        # Repetitions are interleaved so slow drift of the machine spreads over every scenario
+        for rep in range(max(1, args.repeat)):
+            for name in names:
+                reps[name].append(run_scenario(name, SCENARIOS[name], args.sessions, llm, clients, not args.no_stream,
+                                               args.tps, rep=rep))
+        results = {name: combine_repeats(reps[name]) for name in names}
+        print(f"{'scenario':<18} {'p50 s':>8} {'p95 s':>8} {'sess/min':>9} {'tok/s':>9} {'rss MB':>8}  stages (median s)")
+        for name, r in results.items():
+            stages = ", ".join(f"{s}={v}" for s, v in r["stages"].items())
+            print(f"{name:<18} {r['e2e_p50']:>8.3f} {r['e2e_p95']:>8.3f} {r['sessions_per_min']:>9.2f} "
+                  f"{r['tokens_per_sec']:>9.1f} {r['peak_rss_mb']:>8.1f}  {stages}")
+        print(f"stub requests: llm={llm.requests} bibliography={biblio.requests}")
+        conns = registry.totals()
+        print(f"provider HTTP: {conns['requests']} requests over {conns['connections']} connections")
+
+    config = {"sessions": args.sessions, "ttft": args.ttft, "tps": args.tps,
+              "biblio_latency": args.biblio_latency, "stream": not args.no_stream, "default_limits": args.default_limits,
+              "repeat": max(1, args.repeat)}
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump({"config": config, "python": platform.python_version(), "scenarios": results}, fh, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    if args.compare:
+        with open(args.baseline, encoding="utf-8") as fh:
+            saved = json.load(fh)
+        if saved["config"] != config:
+            print(f"warning: baseline was recorded with {saved['config']}")
+        regressions = compare(results, saved["scenarios"], args.tolerance, floor=args.floor,
+                              stage_floors=parse_stage_floors(args.stage_floor))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Streamlit rerun latency: how long one full script rerun takes after a widget interaction.
+
+Loads the app headless with streamlit.testing.AppTest, performs one cold run, then
+times repeated warm reruns triggered by editing the research inquiry (no API calls).
+Exits 1 when the warm median exceeds the budget.
+
+Run from the repository root:
+    python benchmarks/bench_rerun.py [--reruns 30] [--budget-ms 150]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SIS_CACHE_DIR", tempfile.mkdtemp(prefix="sis_bench_"))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP = os.path.join(ROOT, "SIS_ApplicationUKSCeregroq.py")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--reruns", type=int, default=30)
+    ap.add_argument("--budget-ms", type=float, default=150.0, help="warm-rerun median budget")
+    args = ap.parse_args()
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    t0 = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - t0
+    if at.exception:
+        raise SystemExit(f"app raised: {at.exception}")
+
+    samples = []
+    for i in range(args.reruns):
+        at.text_area[0].input(f"rerun probe {i}")
+        t0 = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - t0)
+
+    median_ms = statistics.median(samples) * 1000
+    p95_ms = sorted(samples)[int(0.95 * (len(samples) - 1))] * 1000
+    print(f"cold run      {cold * 1000:8.1f} ms")
+    print(f"warm median   {median_ms:8.1f} ms   (budget {args.budget_ms:.0f} ms)")
+    print(f"warm p95      {p95_ms:8.1f} ms   over {len(samples)} reruns, {len(at.markdown)} markdown elements")
+    return 0 if median_ms <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
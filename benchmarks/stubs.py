@@ -0,0 +1,201 @@
+"""
+Local stand-ins for the services the pipeline calls, for offline benchmarking.
+
+`LLMStub` speaks the OpenAI-compatible subset used by sis_llm (`GET /v1/models`,
+`POST /v1/chat/completions`, blocking and SSE streaming with a final usage chunk)
+with configurable time-to-first-token and token rate. The reply is chosen from
+the system prompt: chunk digests, the Phase 1 foundation, or Phase 2 ideas
+ending in a semantic graph of `graph_nodes` nodes (seeded by the prompt, so
+distinct sessions get distinct graphs and never share a layout cache entry).
+
+`BiblioStub` answers the ORCID search/record and Semantic Scholar paper-search
+routes used by sis_bibliography with configurable latency. Authors whose name
+contains "scholar" have no ORCID match, so they exercise the S2 fallback.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from sis_graph import GRAPH_MARKER
+
+WORDS = ("structure synthesis entropy cognition network dialectic paradigm signal feedback emergence "
+         "hierarchy knowledge decision method evidence model theory system").split()
+
+
+def _words(n, seed):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def stub_graph(n_nodes, seed=0):
+    rng = random.Random(seed)
+    nodes = [{"id": f"n{i}", "label": f"{rng.choice(WORDS).title()} {i}", "type": "Root" if i == 0 else "Branch",
+              "color": "#2a9d8f", "shape": "diamond" if i % 3 else "rectangle"} for i in range(n_nodes)]
+    edges = [{"source": f"n{i}", "target": f"n{rng.randrange(i)}", "rel_type": "AS"} for i in range(1, n_nodes)]
+    return {"nodes": nodes, "edges": edges}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 256
+
+
+class _StubBase:
+    handler = None
+
+    def __init__(self):
+        self.requests = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(self.handler):
+            protocol_version = "HTTP/1.1"
+            owner = stub
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    def send_json(self, obj, status=200):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _LLMHandler(_JSONHandler):
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self.send_json({"object": "list", "data": [{"id": m, "object": "model"} for m in self.owner.models]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        self.owner.count()
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        text = self.owner.reply(req["messages"])
+        prompt_tokens = sum(len(m["content"]) for m in req["messages"]) // 4
+        pieces = [text[i:i + 16] for i in range(0, len(text), 16)]
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(pieces),
+                 "total_tokens": prompt_tokens + len(pieces)}
+        base = {"id": "chatcmpl-stub", "created": int(time.time()), "model": req["model"]}
+        time.sleep(self.owner.ttft)
+        if not req.get("stream"):
+            time.sleep(len(pieces) / self.owner.tokens_per_sec)
+            self.send_json(dict(base, object="chat.completion", usage=usage, choices=[
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}]))
+            return
+        # Chunked keep-alive stream like the real providers, so clients can reuse the connection
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunk = dict(base, object="chat.completion.chunk")
+        start = time.perf_counter()
+        try:
+            for i, piece in enumerate(pieces):
+                event = dict(chunk, choices=[{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+                self.write_chunk(f"data: {json.dumps(event)}\n\n")
+                # Pace against the target rate instead of sleeping per token (sub-ms sleeps overshoot)
+                ahead = (i + 1) / self.owner.tokens_per_sec - (time.perf_counter() - start)
+                if ahead > 0.005:
+                    time.sleep(ahead)
+            self.write_chunk(f"data: {json.dumps(dict(chunk, choices=[], usage=usage))}\n\n")
+            self.write_chunk("data: [DONE]\n\n", last=True)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def write_chunk(self, text, last=False):
+        # The terminating chunk goes out with the last event, as real servers flush them together
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n" + (b"0\r\n\r\n" if last else b""))
+
+
+class LLMStub(_StubBase):
+    """OpenAI-compatible chat completions with simulated latency and token rate."""
+    handler = _LLMHandler
+
+    def __init__(self, ttft=0.2, tokens_per_sec=800.0, foundation_words=1200, field_words=320, merge_words=240, graph_nodes=55,
+                 models=("llama-3.3-70b-versatile", "llama-3.1-8b-instant", "llama-3.1-70b", "llama3.1-70b", "llama3.1-8b")):
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.foundation_words = foundation_words
+        self.field_words = field_words
+        self.merge_words = merge_words
+        self.graph_nodes = graph_nodes
+        self.models = list(models)
+        super().__init__()
+
+    def reply(self, messages):
+        system = messages[0]["content"] if messages else ""
+        if "condense excerpts" in system:
+            return "- " + _words(60, len(messages[-1]["content"]))
+        if "Phase 2" in system:
+            graph = stub_graph(self.graph_nodes, seed=zlib.crc32(messages[-1]["content"].encode("utf-8")))
+            labels = " ".join(n["label"] for n in graph["nodes"][: min(60, self.graph_nodes)])
+            return f"## Ideas\n{_words(400, 2)} {labels}\n{GRAPH_MARKER}\n{json.dumps(graph)}"
+        if "Phase 1, fields: " in system:
+            group = system.split("Phase 1, fields: ", 1)[1].split(")", 1)[0]
+            return _words(self.field_words * (group.count(", ") + 1), 3)
+        if "Phase 1 merge" in system:
+            return _words(self.merge_words, 4)
+        return _words(self.foundation_words, 1)
+
+
+class _BiblioHandler(_JSONHandler):
+    def do_GET(self):
+        self.owner.count()
+        time.sleep(self.owner.latency)
+        url = urlparse(self.path)
+        q = parse_qs(url.query)
+        if url.path.endswith("/search/"):
+            name = q.get("q", [""])[0]
+            result = [] if "scholar" in name.lower() else [{"orcid-identifier": {"path": f"0000-{abs(hash(name)) % 10**8:08d}"}}]
+            self.send_json({"num-found": len(result), "result": result})
+        elif url.path.endswith("/record"):
+            groups = [{"work-summary": [{"title": {"title": {"value": _words(8, i)}}}],
+                       "publication-date": {"year": {"value": str(2000 + i)}}} for i in range(20)]
+            self.send_json({"activities-summary": {"works": {"group": groups}}})
+        elif url.path.endswith("/paper/search"):
+            self.send_json({"data": [{"title": _words(8, i), "year": 2010 + i} for i in range(10)]})
+        else:
+            self.send_error(404)
+
+
+class BiblioStub(_StubBase):
+    """ORCID + Semantic Scholar routes with a fixed per-request latency."""
+    handler = _BiblioHandler
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        super().__init__()
@@ -0,0 +1,88 @@
+// SIS semantic-graph component. Talks the Streamlit component protocol directly (no build step):
+// the iframe and the vendored cytoscape.min.js stay loaded across reruns, each rerun only posts new args.
+(function () {
+    var cy = null;
+    var lastGraph = null;
+
+    var STYLE = [
+        {
+            selector: 'node',
+            style: {
+                'label': 'data(label)', 'text-valign': 'center', 'color': '#212529',
+                'background-color': 'data(color)', 'width': 'data(size)', 'height': 'data(size)',
+                'shape': 'data(shape)', 'font-size': '14px', 'font-weight': '700',
+                'text-outline-width': 2, 'text-outline-color': '#ffffff', 'cursor': 'pointer',
+                'z-index': 'data(z_index)', 'box-shadow': '0 4px 6px rgba(0,0,0,0.1)'
+            }
+        },
+        {
+            selector: 'edge',
+            style: {
+                'width': 5, 'line-color': '#adb5bd', 'label': 'data(rel_type)',
+                'font-size': '11px', 'font-weight': 'bold', 'color': '#2a9d8f',
+                'target-arrow-color': '#adb5bd', 'target-arrow-shape': 'triangle',
+                'curve-style': 'bezier', 'text-rotation': 'autorotate',
+                'text-background-opacity': 1, 'text-background-color': '#ffffff',
+                'text-background-padding': '4px', 'text-background-shape': 'roundrectangle'
+            }
+        },
+        { selector: 'node.highlighted', style: { 'border-width': 6, 'border-color': '#e76f51', 'transform': 'scale(1.45)', 'z-index': 10000 } },
+        { selector: '.dimmed', style: { 'opacity': 0.1, 'text-opacity': 0 } }
+    ];
+
+    function send(type, data) {
+        window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type: type }, data), '*');
+    }
+
+    function render(args) {
+        var graph = JSON.stringify([args.elements, args.layout]);
+        if (graph === lastGraph) return;  // widget reruns with an unchanged graph keep the current view
+        lastGraph = graph;
+        if (cy) cy.destroy();
+        cy = cytoscape({
+            container: document.getElementById('cy'),
+            elements: args.elements,
+            style: STYLE,
+            layout: args.layout
+        });
+
+        cy.on('mouseover', 'node', function (e) {
+            var sel = e.target;
+            cy.elements().addClass('dimmed');
+            sel.neighborhood().add(sel).removeClass('dimmed').addClass('highlighted');
+        });
+
+        cy.on('mouseout', 'node', function (e) {
+            cy.elements().removeClass('dimmed highlighted');
+        });
+
+        cy.on('tap', 'node', function (evt) {
+            var elementId = evt.target.id();
+            var target = window.parent.document.getElementById(elementId);
+            if (target) {
+                target.scrollIntoView({ behavior: "smooth", block: "center" });
+                target.style.backgroundColor = "#fff9db";
+                setTimeout(function () { target.style.backgroundColor = "transparent"; }, 3000);
+            }
+        });
+    }
+
+    document.getElementById('save_btn').addEventListener('click', function () {
+        if (!cy) return;
+        var png64 = cy.png({ full: true, bg: 'white', scale: 2.5 });
+        var link = document.createElement('a');
+        link.href = png64;
+        link.download = 'sis_synergy_graph.png';
+        document.body.appendChild(link);
+        link.click();
+        document.body.removeChild(link);
+    });
+
+    window.addEventListener('message', function (event) {
+        if (event.data && event.data.type === 'streamlit:render') {
+            render(event.data.args);
+            send('streamlit:setFrameHeight', { height: event.data.args.height });
+        }
+    });
+    send('streamlit:componentReady', { apiVersion: 1 });
+})();
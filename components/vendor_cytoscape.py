@@ -0,0 +1,75 @@
+"""
+Vendors the unmodified upstream Cytoscape.js build for the graph component.
+
+Downloads `dist/cytoscape.min.js` and the LICENSE of the pinned npm release into
+components/cytoscape/ and records the source URL and SHA-256 in `cytoscape.SOURCE`, so
+the vendored file can be checked against the published release and upgraded by
+changing VERSION.
+
+Run from the repository root:
+    python components/vendor_cytoscape.py            # fetch VERSION
+    python components/vendor_cytoscape.py --check    # verify the vendored file
+"""
+import argparse
+import hashlib
+import os
+import sys
+import urllib.request
+
+VERSION = "3.34.1"
+BASE_URL = "https://cdn.jsdelivr.net/npm/cytoscape@{version}"
+HERE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cytoscape")
+LIBRARY = os.path.join(HERE, "cytoscape.min.js")
+LICENSE = os.path.join(HERE, "cytoscape.LICENSE")
+SOURCE = os.path.join(HERE, "cytoscape.SOURCE")
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=60) as resp:
+        return resp.read()
+
+
+def read_source():
+    """{"version", "url", "sha256"} from cytoscape.SOURCE."""
+    with open(SOURCE, encoding="utf-8") as fh:
+        return dict(line.strip().split(": ", 1) for line in fh if ": " in line)
+
+
+def vendor(version):
+    base = BASE_URL.format(version=version)
+    url = f"{base}/dist/cytoscape.min.js"
+    data = fetch(url)
+    with open(LIBRARY, "wb") as fh:
+        fh.write(data)
+    with open(LICENSE, "wb") as fh:
+        fh.write(fetch(f"{base}/LICENSE"))
+    digest = hashlib.sha256(data).hexdigest()
+    with open(SOURCE, "w", encoding="utf-8") as fh:
+        fh.write(f"version: {version}\nurl: {url}\nsha256: {digest}\n")
+    print(f"vendored Cytoscape.js {version} ({len(data)} bytes, sha256 {digest})")
+
+
+def check():
+    source = read_source()
+    with open(LIBRARY, "rb") as fh:
+        digest = hashlib.sha256(fh.read()).hexdigest()
+    if digest != source["sha256"]:
+        print(f"cytoscape.min.js sha256 {digest} does not match {source['url']} ({source['sha256']})")
+        return 1
+    print(f"cytoscape.min.js matches {source['url']}")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--version", default=VERSION)
+    ap.add_argument("--check", action="store_true", help="verify the vendored file against cytoscape.SOURCE")
+    args = ap.parse_args()
+    if args.check:
+        return check()
+    vendor(args.version)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+SIS headless batch runner.
+
+Runs the Groq -> Cerebras pipeline over a JSONL file of inquiries without the
+Streamlit UI and streams one JSON result per line to an output JSONL file.
+
+Each input line is a JSON object with `user_query` and optionally `id`,
+`idea_query`, `authors`, `sciences`, `paradigms`, `models`, `goal`,
+`expertise`, `cerebras_model`, `hedge_after`, `ontology_top_k`, `use_cache`, `file_content` or `file`
+(path to a .txt context file). API keys come from GROQ_API_KEY and
+CEREBRAS_API_KEY.
+
+The run is resumable: inquiries that already have an `"status": "ok"` line in
+the output file are skipped, so after a crash simply re-run the same command.
+Every inquiry, failed or not, is also recorded in the run telemetry (see
+sis_telemetry) under the version label "batch".
+
+    python sis_batch.py inquiries.jsonl results.jsonl --concurrency 4
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import fields
+
+from sis_clients import get_client_registry
+from sis_pipeline import CEREBRAS_BASE_URL, GROQ_BASE_URL, PhaseFailure, PipelineRequest, PipelineResult, run_pipeline
+from sis_telemetry import record_run
+
+REQUEST_FIELDS = {f.name for f in fields(PipelineRequest)}
+TELEMETRY_VERSION = "batch"
+
+
+def inquiry_id(spec):
+    """Explicit `id`, else a stable hash of the inquiry's content."""
+    if spec.get("id") is not None:
+        return str(spec["id"])
+    canonical = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def load_inquiries(path):
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spec = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise SystemExit(f"{path}:{lineno}: invalid JSON ({e})")
+            if not spec.get("user_query"):
+                raise SystemExit(f"{path}:{lineno}: 'user_query' is required")
+            yield inquiry_id(spec), spec
+
+
+def completed_ids(path):
+    """IDs with a successful result already written (tolerates a torn last line)."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(record.get("id"))
+    return done
+
+
+def build_request(spec):
+    kwargs = {k: v for k, v in spec.items() if k in REQUEST_FIELDS}
+    if spec.get("file"):
+        with open(spec["file"], encoding="utf-8") as fh:
+            kwargs["file_content"] = fh.read()
+    kwargs["stream"] = False
+    return PipelineRequest(**kwargs)
+
+
+class ResultWriter:
+    """Appends JSON lines under a lock and fsyncs each one, so a crash loses at most the line in flight."""
+
+    def __init__(self, path):
+        self._fh = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._fh.write(line)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self):
+        self._fh.close()
+
+
+def run_one(item_id, spec, groq_client, cerebras_client):
+    t0 = time.perf_counter()
+    try:
+        result = run_pipeline(build_request(spec), groq_client, cerebras_client)
+        record = {"id": item_id, "status": "ok", **result.to_record()}
+        record_run(result, TELEMETRY_VERSION)
+    except PhaseFailure as e:
+        record = {"id": item_id, "status": "error", "error": str(e), "failed_phase": e.phase,
+                  **e.result.to_record()}
+        record_run(e.result, TELEMETRY_VERSION, status="phase_failure")
+    except Exception as e:
+        record = {"id": item_id, "status": "error", "error": f"{type(e).__name__}: {e}",
+                  "traceback": traceback.format_exc()}
+        record_run(PipelineResult(), TELEMETRY_VERSION, status="error")
+    record["wall_seconds"] = round(time.perf_counter() - t0, 3)
+    return record
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless batch runner for the SIS Groq -> Cerebras pipeline.")
+    ap.add_argument("input", help="JSONL file of inquiries")
+    ap.add_argument("output", help="JSONL file results are appended to (also the resume log)")
+    ap.add_argument("--concurrency", type=int, default=4, help="pipelines run in parallel (default 4)")
+    ap.add_argument("--no-cache", action="store_true", help="bypass the LLM response cache")
+    args = ap.parse_args(argv)
+
+    groq_key, cerebras_key = os.environ.get("GROQ_API_KEY"), os.environ.get("CEREBRAS_API_KEY")
+    if not groq_key or not cerebras_key:
+        raise SystemExit("GROQ_API_KEY and CEREBRAS_API_KEY must be set.")
+    groq_client = get_client_registry().get(os.environ.get("GROQ_BASE_URL", GROQ_BASE_URL), groq_key)
+    cerebras_client = get_client_registry().get(os.environ.get("CEREBRAS_BASE_URL", CEREBRAS_BASE_URL), cerebras_key)
+
+    done = completed_ids(args.output)
+    todo = []
+    for item_id, spec in load_inquiries(args.input):
+        if item_id in done:
+            continue
+        if args.no_cache:
+            spec = dict(spec, use_cache=False)
+        todo.append((item_id, spec))
+    print(f"{len(done)} already complete, {len(todo)} to run (concurrency {args.concurrency}).", file=sys.stderr)
+
+    writer = ResultWriter(args.output)
+    failures = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            futures = [pool.submit(run_one, item_id, spec, groq_client, cerebras_client) for item_id, spec in todo]
+            for n, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                writer.write(record)
+                failures += record["status"] != "ok"
+                print(f"[{n}/{len(todo)}] {record['id']}: {record['status']} ({record['wall_seconds']}s)", file=sys.stderr)
+    finally:
+        writer.close()
+    conns = get_client_registry().totals()
+    print(f"provider HTTP: {conns['requests']} requests over {conns['connections']} connections.", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""
+SIS bibliographic connectors.
+
+Pooled, concurrent author resolution against ORCID and Semantic Scholar, with
+raw responses kept in the shared on-disk TTL cache.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import requests
+import requests.adapters
+
+from sis_cache import DiskCache, DEFAULT_CACHE_DIR, normalize_key
+
+BIBLIO_MAX_WORKERS = 8
+BIBLIO_TIMEOUT = 6
+BIBLIO_CACHE_TTL = int(os.environ.get("SIS_BIBLIO_CACHE_TTL", 7 * 24 * 3600))
+BIBLIO_CACHE_MAX_MB = int(os.environ.get("SIS_BIBLIO_CACHE_MAX_MB", 64))
+ORCID_BASE_URL = os.environ.get("SIS_ORCID_BASE_URL", "https://pub.orcid.org/v3.0")
+S2_BASE_URL = os.environ.get("SIS_S2_BASE_URL", "https://api.semanticscholar.org/graph/v1")
+
+@lru_cache(maxsize=None)
+def get_http_session():
+    """Shared keep-alive session so every author lookup reuses pooled TCP/TLS connections."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=BIBLIO_MAX_WORKERS * 2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept": "application/json"})
+    return session
+
+@lru_cache(maxsize=None)
+def get_biblio_cache():
+    """Process-wide handle on the shared SQLite store for ORCID / Semantic Scholar responses."""
+    return DiskCache(os.path.join(DEFAULT_CACHE_DIR, "bibliography.sqlite3"),
+                     max_bytes=BIBLIO_CACHE_MAX_MB * 1024 * 1024, default_ttl=BIBLIO_CACHE_TTL)
+
+def cached_get_json(session, cache, endpoint, key, url, params=None):
+    """GETs a JSON document unless a fresh copy for (endpoint, key) is already on disk.
+
+    Error responses (4xx/5xx, e.g. a 429 rate-limit body) raise and are never cached.
+    """
+    hit = cache.get_json(endpoint, key)
+    if hit is not None: return hit
+    resp = session.get(url, params=params, timeout=BIBLIO_TIMEOUT)
+    resp.raise_for_status()
+    data = resp.json()
+    cache.set_json(endpoint, key, data)
+    return data
+
+def fetch_single_author(auth, session, cache):
+    """Resolves one author via ORCID (search + record) or Semantic Scholar fallback."""
+    t0 = time.perf_counter()
+    block, source = "", "none"
+    orcid_id = None
+    auth_key = normalize_key(auth)
+    try:
+        s_res = cached_get_json(session, cache, "orcid_search", auth_key, f"{ORCID_BASE_URL}/search/", {"q": auth})
+        if s_res.get('result'):
+            orcid_id = s_res['result'][0]['orcid-identifier']['path']
+    except: pass
+
+    if orcid_id:
+        source = "ORCID"
+        try:
+            r_res = cached_get_json(session, cache, "orcid_record", orcid_id, f"{ORCID_BASE_URL}/{orcid_id}/record")
+            works = r_res.get('activities-summary', {}).get('works', {}).get('group', [])
+            block += f"\n--- ORCID REPOSITORY: {auth.upper()} ({orcid_id}) ---\n"
+            if works:
+                for work in works[:15]:
+                    summary = work.get('work-summary', [{}])[0]
+                    title = summary.get('title', {}).get('title', {}).get('value', 'Unknown Title')
+                    year = work.get('publication-date', {}).get('year', {}).get('value', 'n.d.')
+                    block += f"• ({year}) {title}\n"
+            else: block += "- No metadata found in ORCID.\n"
+        except: pass
+    else:
+        source = "Semantic Scholar"
+        try:
+            ss_params = {"query": f'author:"{auth}"', "limit": 10, "fields": "title,year"}
+            ss_res = cached_get_json(session, cache, "s2_search", auth_key, f"{S2_BASE_URL}/paper/search", ss_params)
+            papers = ss_res.get("data", [])
+            if papers:
+                block += f"\n--- SCHOLAR DATA: {auth.upper()} ---\n"
+                for p in papers:
+                    block += f"• ({p.get('year','n.d.')}) {p['title']}\n"
+            else: block += f"- No record found for {auth}.\n"
+        except: pass
+    return block, {"author": auth, "source": source, "seconds": round(time.perf_counter() - t0, 3)}
+
+def fetch_author_bibliographies(author_input, timings=None):
+    """Retrieves high-fidelity bibliographic data from ORCID and Semantic Scholar with years.
+
+    All authors are resolved concurrently on a bounded pool sharing one keep-alive session;
+    blocks are joined in input order. Pass a list as `timings` to collect per-author durations.
+    Raw responses are served from the on-disk TTL cache, so repeat author sets stay offline.
+    """
+    if not author_input: return ""
+    author_list = [a.strip() for a in author_input.split(",") if a.strip()]
+    if not author_list: return ""
+    session, cache = get_http_session(), get_biblio_cache()
+
+    with ThreadPoolExecutor(max_workers=min(BIBLIO_MAX_WORKERS, len(author_list))) as pool:
+        results = list(pool.map(lambda a: fetch_single_author(a, session, cache), author_list))
+
+    if timings is not None:
+        timings.extend(t for _, t in results)
+    return "".join(block for block, _ in results)
@@ -0,0 +1,128 @@
+"""
+SIS persistent cache layer.
+
+A small SQLite-backed key/value store shared by every Streamlit session and
+process on the host. Entries are grouped by namespace, expire after a TTL and
+are evicted least-recently-used once the store grows past its byte budget.
+SQLite in WAL mode gives us cross-process safety without a cache server.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "SIS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sis_cache")
+)
+
+
+class DiskCache:
+    """Namespaced SQLite cache with per-read TTL and size-bounded LRU eviction."""
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, default_ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL,"
+            " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed)")
+
+    def _conn(self):
+        """One connection per thread; SQLite connections must not cross threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace, key, ttl=None):
+        """Returns the stored bytes, or None when missing or older than `ttl` seconds."""
+        ttl = self.default_ttl if ttl is None else ttl
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT value, created FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if ttl is not None and now - row[1] > ttl:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+            return None
+        conn.execute(
+            "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?", (now, namespace, key)
+        )
+        return row[0]
+
+    def set(self, namespace, key, value):
+        """Stores bytes under (namespace, key) and trims the store back under budget."""
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value, size, created, accessed)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (namespace, key, value, len(value), now, now),
+        )
+        self._evict()
+
+    def get_json(self, namespace, key, ttl=None):
+        raw = self.get(namespace, key, ttl=ttl)
+        return None if raw is None else json.loads(raw)
+
+    def set_json(self, namespace, key, obj):
+        self.set(namespace, key, json.dumps(obj, ensure_ascii=False))
+
+    def _evict(self):
+        """Drops least-recently-used rows until total size is back to 90% of budget."""
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            doomed = []
+            for namespace, key, size in conn.execute(
+                "SELECT namespace, key, size FROM entries ORDER BY accessed ASC"
+            ):
+                if total <= target:
+                    break
+                doomed.append((namespace, key))
+                total -= size
+            conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", doomed)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def invalidate(self, namespace=None, key=None):
+        """Deletes one entry, a whole namespace, or (no arguments) everything. Returns rows removed."""
+        conn = self._conn()
+        if namespace is None:
+            cur = conn.execute("DELETE FROM entries")
+        elif key is None:
+            cur = conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+        else:
+            cur = conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        return cur.rowcount
+
+    def stats(self):
+        """Returns {"entries": n, "bytes": total} for display in the UI."""
+        n, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": n, "bytes": size}
+
+
+def normalize_key(text):
+    """Case- and whitespace-insensitive cache key for free-text inputs such as author names."""
+    return " ".join(str(text).split()).casefold()
@@ -0,0 +1,145 @@
+"""
+SIS provider clients.
+
+One long-lived OpenAI client per (base_url, API-key fingerprint), each on its
+own pooled HTTP client with tuned keep-alive and connection limits, so reruns,
+sessions and pipeline stages share TCP/TLS connections instead of building a
+fresh pool (and repeating the handshakes) on every click. A transport trace
+counts requests, new connections and TLS handshakes per client, which gives the
+connection-reuse ratio; `warm` opens a connection in the background as soon as
+a key is known.
+"""
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+
+from openai import DEFAULT_CONNECTION_LIMITS, DefaultHttpxClient, OpenAI
+
+HTTP_MAX_CONNECTIONS = int(os.environ.get("SIS_HTTP_MAX_CONNECTIONS", 64))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("SIS_HTTP_MAX_KEEPALIVE", 32))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("SIS_HTTP_KEEPALIVE_S", 60))
+MAX_CLIENTS = 16
+# The SDK's Limits class, whichever httpx build it ships with
+_Limits = type(DEFAULT_CONNECTION_LIMITS)
+
+
+def key_fingerprint(api_key):
+    """Short, non-reversible ID for an API key (safe to log and to use in cache keys)."""
+    return hashlib.sha256(str(api_key or "").encode("utf-8")).hexdigest()[:12]
+
+
+class ConnectionStats:
+    """Per-client counters fed by the HTTP transport trace of every request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self.connect_seconds = 0.0
+        self.last_used = None
+        self.warming = False
+
+    def on_request(self, request):
+        """httpx request hook: attaches a trace that sees connection setup on this request."""
+        started = {}
+
+        def trace(event, info):
+            if event.endswith("send_request_headers.started"):
+                with self._lock:
+                    self.requests += 1
+                    self.last_used = time.time()
+            elif event in ("connection.connect_tcp.started", "connection.start_tls.started"):
+                started[event] = time.perf_counter()
+            elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                t0 = started.pop(event.replace(".complete", ".started"), None)
+                with self._lock:
+                    if event == "connection.connect_tcp.complete":
+                        self.connections += 1
+                    else:
+                        self.tls_handshakes += 1
+                    if t0 is not None:
+                        self.connect_seconds += time.perf_counter() - t0
+        request.extensions["trace"] = trace
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "tls_handshakes": self.tls_handshakes,
+                "connect_seconds": round(self.connect_seconds, 3),
+                "reuse_ratio": round(1 - self.connections / self.requests, 3) if self.requests else None,
+                "idle_seconds": round(time.time() - self.last_used, 1) if self.last_used else None,
+            }
+
+
+class ClientRegistry:
+    """Long-lived OpenAI clients keyed by (base_url, key fingerprint); the oldest is closed past `max_clients`."""
+
+    def __init__(self, max_connections=HTTP_MAX_CONNECTIONS, max_keepalive=HTTP_MAX_KEEPALIVE,
+                 keepalive_expiry=HTTP_KEEPALIVE_EXPIRY, max_clients=MAX_CLIENTS):
+        self.limits = _Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                              keepalive_expiry=keepalive_expiry)
+        self.keepalive_expiry = keepalive_expiry
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._clients = {}
+
+    def _entry(self, base_url, api_key):
+        key = (base_url, key_fingerprint(api_key))
+        with self._lock:
+            entry = self._clients.pop(key, None)
+            if entry is None:
+                stats = ConnectionStats()
+                http_client = DefaultHttpxClient(limits=self.limits, event_hooks={"request": [stats.on_request]})
+                # Retries are owned by the sis_ratelimit schedulers, not the SDK
+                entry = (OpenAI(api_key=api_key, base_url=base_url, max_retries=0, http_client=http_client), stats)
+            self._clients[key] = entry  # re-inserted last: dict order is least recently used first
+            while len(self._clients) > self.max_clients:
+                stale, _ = self._clients.pop(next(iter(self._clients)))
+                getattr(stale, "close", lambda: None)()
+        return entry
+
+    def get(self, base_url, api_key):
+        return self._entry(base_url, api_key)[0]
+
+    def warm(self, base_url, api_key, probe=None):
+        """Opens a pooled connection in a background thread via `probe(client)` (default: list models).
+
+        Skipped while a warm-up is running or the client was used within the keep-alive window.
+        Returns True if a warm-up was started.
+        """
+        client, stats = self._entry(base_url, api_key)
+        with stats._lock:
+            if stats.warming or (stats.last_used and time.time() - stats.last_used < self.keepalive_expiry):
+                return False
+            stats.warming = True
+
+        def run():
+            try:
+                (probe or (lambda c: c.models.list()))(client)
+            except Exception:
+                pass
+            finally:
+                stats.warming = False
+        threading.Thread(target=run, name="sis-client-warmup", daemon=True).start()
+        return True
+
+    def stats(self):
+        """[{"endpoint", "key", "requests", "connections", "tls_handshakes", "reuse_ratio", ...}] per client."""
+        with self._lock:
+            entries = list(self._clients.items())
+        return [{"endpoint": base_url, "key": fp, **stats.snapshot()} for (base_url, fp), (_, stats) in entries]
+
+    def totals(self):
+        rows = self.stats()
+        return {k: sum(r[k] for r in rows) for k in ("requests", "connections", "tls_handshakes")}
+
+
+@lru_cache(maxsize=None)
+def get_client_registry():
+    """Process-wide client registry shared by every Streamlit session and the batch runner."""
+    return ClientRegistry()
@@ -0,0 +1,143 @@
+"""
+SIS pipeline orchestrator.
+
+Runs a pipeline as a DAG of named stages on an asyncio event loop. Each stage
+declares the stages it depends on and starts as soon as they have finished, so
+independent work (bibliography lookups, large-file digest, ontology retrieval,
+endpoint warm-up) overlaps instead of running back to back. Stage bodies are the
+existing blocking provider/cache functions and run in worker threads; the loop
+only schedules them, records a start/end timeline and relays callbacks, so UI
+code is always called from the thread that started the run.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+
+class RunCancelled(RuntimeError):
+    """The run's cancel event was set; raised in place of starting the next stage."""
+
+
+@dataclass
+class Stage:
+    """One pipeline step: `fn()` runs once every stage named in `deps` has finished."""
+    name: str
+    fn: object
+    deps: tuple = ()
+    message: str = ""
+
+
+def _check_dag(stages):
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError(f"duplicate stage names: {names}")
+    deps = {s.name: set(s.deps) for s in stages}
+    for name, needed in deps.items():
+        missing = needed - deps.keys()
+        if missing:
+            raise ValueError(f"stage {name!r} depends on unknown stage(s) {sorted(missing)}")
+    done = set()
+    while len(done) < len(deps):
+        ready = [n for n, needed in deps.items() if n not in done and needed <= done]
+        if not ready:
+            raise ValueError(f"dependency cycle among {sorted(deps.keys() - done)}")
+        done.update(ready)
+
+
+def critical_path(timeline):
+    """Stage names on the critical path: from the last stage to finish back through its latest-finishing dependency."""
+    by_name = {e["stage"]: e for e in timeline if e.get("end") is not None}
+    if not by_name:
+        return []
+    path = [max(by_name.values(), key=lambda e: e["end"])["stage"]]
+    while True:
+        deps = [by_name[d] for d in by_name[path[-1]]["deps"] if d in by_name]
+        if not deps:
+            return path[::-1]
+        path.append(max(deps, key=lambda e: e["end"])["stage"])
+
+
+async def _run_dag(stages, on_stage, on_timeline, relays, cancel_event):
+    loop = asyncio.get_running_loop()
+    # Stage bodies block on I/O: one thread per stage, so wide fan-outs are not capped at cpu_count + 4
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=max(len(stages), 1), thread_name_prefix="sis-stage"))
+    t0 = time.perf_counter()
+    timeline, tasks, failed = [], {}, []
+
+    def snapshot():
+        on_timeline([dict(e) for e in timeline])
+
+    def relay(fn):
+        # Worker threads hand UI callbacks to the loop thread, coalesced to the latest arguments
+        # (stream callbacks carry the text so far); an error in the callback aborts the run.
+        lock, latest = threading.Lock(), []
+
+        def deliver():
+            with lock:
+                args = latest.pop()
+            try:
+                fn(*args)
+            except BaseException as exc:
+                failed.append(exc)
+                for task in tasks.values():
+                    task.cancel()
+
+        def send(*args):
+            with lock:
+                scheduled = bool(latest)
+                latest[:] = [args]
+            if not scheduled:
+                loop.call_soon_threadsafe(deliver)
+        return send
+
+    relays.update({key: relay(fn) for key, fn in relays.items() if fn is not None})
+
+    async def run_stage(stage):
+        await asyncio.gather(*(tasks[d] for d in stage.deps))
+        if cancel_event is not None and cancel_event.is_set():
+            failed.append(RunCancelled(f"cancelled before {stage.name}"))
+            raise failed[-1]
+        entry = {"stage": stage.name, "deps": list(stage.deps), "start": round(time.perf_counter() - t0, 3), "end": None}
+        timeline.append(entry)
+        if stage.message:
+            on_stage(stage.name, stage.message)
+        snapshot()
+        try:
+            await asyncio.to_thread(stage.fn)
+        except Exception as exc:
+            failed.append(exc)
+            raise
+        finally:
+            entry["end"] = round(time.perf_counter() - t0, 3)
+            snapshot()
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(run_stage(stage))
+    done, pending = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    if failed:
+        raise failed[0]
+    for task in done:
+        task.result()
+    return timeline
+
+
+def run_dag(stages, on_stage=None, on_timeline=None, relays=None, cancel_event=None):
+    """Runs `stages` (a list of Stage) concurrently in dependency order; returns the timeline.
+
+    The timeline is a list of {"stage", "deps", "start", "end"} (seconds since the run
+    started). `on_stage(name, message)` fires as a stage starts and `on_timeline(timeline)`
+    after every start/finish. `relays` ({key: callback}) is filled in place with wrappers
+    that stage bodies may call from their worker threads; the wrapped callbacks then run
+    on the caller's thread with the latest arguments (intermediate calls may be skipped).
+    The first stage error cancels the stages not yet started and is re-raised once the
+    running ones have finished; once `cancel_event` is set, no further stage starts and
+    RunCancelled is raised.
+    """
+    _check_dag(stages)
+    relays = {} if relays is None else relays
+    return asyncio.run(_run_dag(stages, on_stage or (lambda *a: None), on_timeline or (lambda t: None), relays, cancel_event))
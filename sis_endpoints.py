@@ -0,0 +1,139 @@
+"""
+SIS endpoint policy.
+
+Chooses which model ID serves a provider call. Valid model IDs are probed once
+via `/models` and cached per (base_url, key); IDs that 404 are remembered as
+invalid. Calls fall back along the candidate list on 404 or 5xx, and an
+optional hedging mode fires a second request at an alternate model when the
+first has not finished within a latency threshold, keeping whichever finishes
+first and cancelling the other.
+"""
+import hashlib
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from sis_llm import RequestCancelled
+from sis_ratelimit import ProviderOverloaded, http_status
+
+CEREBRAS_MODEL_CANDIDATES = ["llama-3.1-70b", "llama3.1-70b", "llama3.1-8b"]
+CATALOG_TTL = 3600
+
+
+def should_fall_back(exc):
+    status = http_status(exc)
+    return status == 404 or (status is not None and status >= 500)
+
+
+class EndpointPolicy:
+    def __init__(self, provider, candidates, catalog_ttl=CATALOG_TTL):
+        self.provider = provider
+        self.candidates = list(candidates)
+        self.catalog_ttl = catalog_ttl
+        self._catalog = {}
+        self._invalid = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _client_key(client):
+        key_fp = hashlib.sha256(str(getattr(client, "api_key", "")).encode("utf-8")).hexdigest()[:12]
+        return f"{getattr(client, 'base_url', '')}|{key_fp}"
+
+    def valid_models(self, client):
+        """Model IDs the endpoint advertises (cached), or None when the probe is unavailable."""
+        with self._lock:
+            hit = self._catalog.get(self._client_key(client))
+            if hit and time.time() - hit[0] < self.catalog_ttl:
+                return hit[1]
+        return self.refresh_catalog(client)
+
+    def refresh_catalog(self, client):
+        """Lists the endpoint's models (always one request) and caches them; a failed probe is not cached."""
+        try:
+            models = {m.id for m in client.models.list().data}
+        except Exception:
+            return None
+        with self._lock:
+            self._catalog[self._client_key(client)] = (time.time(), models)
+        return models
+
+    def mark_invalid(self, client, model):
+        with self._lock:
+            self._invalid[(self._client_key(client), model)] = time.time()
+
+    def _is_invalid(self, client, model):
+        with self._lock:
+            ts = self._invalid.get((self._client_key(client), model))
+        return ts is not None and time.time() - ts < self.catalog_ttl
+
+    def ordered_models(self, client, preferred):
+        """Preferred model first, then the other candidates; probed-invalid or 404'd IDs are dropped."""
+        order = [preferred] + [m for m in self.candidates if m != preferred]
+        valid = self.valid_models(client)
+        usable = [m for m in order if (valid is None or m in valid) and not self._is_invalid(client, m)]
+        return usable or order
+
+    def run(self, call, client, preferred, hedge_after=None):
+        """Runs `call(model, cancel_event, retry_5xx) -> (text, metrics)` under the fallback/hedging policy.
+
+        `retry_5xx` is False while another candidate remains, so a server error falls back
+        at once instead of being retried on the same model. Adds `endpoint`, `fallbacks`
+        and `hedged` to the returned metrics.
+        """
+        models = self.ordered_models(client, preferred)
+        fallbacks = []
+        last_error = None
+        while models:
+            try:
+                if hedge_after is not None and len(models) > 1:
+                    (text, metrics), used = self._hedged(call, models[0], models[1], hedge_after, len(models) == 2)
+                else:
+                    text, metrics = call(models[0], None, len(models) == 1)
+                    used = models[0]
+                    metrics["hedged"] = False
+                metrics["endpoint"] = used
+                metrics["fallbacks"] = fallbacks
+                return text, metrics
+            except (ProviderOverloaded, RequestCancelled):
+                raise
+            except Exception as e:
+                if not should_fall_back(e):
+                    raise
+                last_error = e
+                failed = getattr(e, "failed_models", [models[0]])
+                for m in failed:
+                    if http_status(e) == 404:
+                        self.mark_invalid(client, m)
+                    fallbacks.append(f"{m}: HTTP {http_status(e)}")
+                models = [m for m in models if m not in failed]
+        raise last_error
+
+    def _hedged(self, call, primary, alternate, hedge_after, alternate_last):
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"hedge-{self.provider}")
+        cancels = {primary: threading.Event(), alternate: threading.Event()}
+        futures = {pool.submit(call, primary, cancels[primary], False): primary}
+        try:
+            done, _ = wait(futures, timeout=hedge_after)
+            if not done:
+                futures[pool.submit(call, alternate, cancels[alternate], alternate_last)] = alternate
+            errors = []
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    if f.exception() is None:
+                        for other in cancels:
+                            if other != futures[f]:
+                                cancels[other].set()
+                        text, metrics = f.result()
+                        metrics["hedged"] = len(futures) > 1
+                        return (text, metrics), futures[f]
+                    errors.append((futures[f], f.exception()))
+            error = errors[-1][1]
+            error.failed_models = [m for m, e in errors if should_fall_back(e)] or [errors[-1][0]]
+            raise error
+        finally:
+            pool.shutdown(wait=False)
+
+
+cerebras_policy = EndpointPolicy("cerebras", CEREBRAS_MODEL_CANDIDATES)
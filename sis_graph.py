@@ -0,0 +1,280 @@
+"""
+SIS semantic graph utilities.
+
+Post-processing of the Phase 2 semantic graph: extracting (and repairing) the
+`### SEMANTIC_GRAPH_JSON` block once into a typed graph, and linking graph node
+labels into the synthesis markdown in a single pass over the text.
+"""
+import json
+import re
+import urllib.parse
+from dataclasses import dataclass, field
+
+GRAPH_MARKER = "### SEMANTIC_GRAPH_JSON"
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+@dataclass
+class GraphNode:
+    id: str
+    label: str
+    type: str = "Branch"
+    color: str = "#2a9d8f"
+    shape: str = "rectangle"
+
+
+@dataclass
+class GraphEdge:
+    source: str
+    target: str
+    rel_type: str = "AS"
+
+
+@dataclass
+class SemanticGraph:
+    nodes: list = field(default_factory=list)
+    edges: list = field(default_factory=list)
+    repairs: list = field(default_factory=list)
+
+    def edge_pairs(self):
+        return [(e.source, e.target) for e in self.edges]
+
+    @classmethod
+    def from_dict(cls, d):
+        """Inverse of dataclasses.asdict (used when reopening stored runs)."""
+        return cls(nodes=[GraphNode(**n) for n in d.get("nodes", [])],
+                   edges=[GraphEdge(**e) for e in d.get("edges", [])],
+                   repairs=list(d.get("repairs", [])))
+
+    def subgraph(self, keep):
+        """Nodes whose id is in `keep` and the edges between them."""
+        return SemanticGraph(nodes=[n for n in self.nodes if n.id in keep],
+                             edges=[e for e in self.edges if e.source in keep and e.target in keep],
+                             repairs=list(self.repairs))
+
+    def to_elements(self, positions=None, sizes=None, colors=None):
+        """Cytoscape.js element list (Root nodes drawn larger than branches).
+
+        `positions` ({node_id: (x, y)}) adds precomputed coordinates for a `preset` layout;
+        `sizes` / `colors` ({node_id: value}) override the type-based size and ontology colour.
+        """
+        sizes, colors = sizes or {}, colors or {}
+        elements = []
+        for n in self.nodes:
+            element = {"data": {
+                "id": n.id, "label": n.label, "color": colors.get(n.id, n.color),
+                "size": sizes.get(n.id, 110 if n.type == "Root" else 90), "shape": n.shape, "z_index": 1
+            }}
+            if positions and n.id in positions:
+                x, y = positions[n.id]
+                element["position"] = {"x": x, "y": y}
+            elements.append(element)
+        elements += [{"data": {"source": e.source, "target": e.target, "rel_type": e.rel_type}}
+                     for e in self.edges]
+        return elements
+
+
+def _scan_json_object(text, start):
+    """Scans from the `{` at `start`; returns (end_index or None, cut, stack_at_cut).
+
+    `end_index` is set when the object closes. Otherwise the text was truncated and
+    `cut`/`stack_at_cut` describe the last point right after a complete element,
+    from which the document can be closed off.
+    """
+    stack, in_str, esc = [], False, False
+    cut, cut_stack = None, None
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+        elif ch in "}]":
+            if not stack:
+                return None, cut, cut_stack
+            stack.pop()
+            if not stack:
+                return i + 1, None, None
+            cut, cut_stack = i + 1, list(stack)
+    return None, cut, cut_stack
+
+
+def _strip_trailing_commas(text):
+    return re.sub(r",(\s*[}\]])", r"\1", text)
+
+
+def _load_graph_json(block, repairs):
+    """First `{` in `block` that parses (or repairs) into a JSON object; stray braces in prose are skipped."""
+    start = block.find("{")
+    while start >= 0:
+        attempt = []
+        data = _load_json_at(block, start, attempt)
+        if isinstance(data, dict):
+            repairs += attempt
+            return data
+        start = block.find("{", start + 1)
+    return None
+
+
+def _load_json_at(block, start, repairs):
+    end, cut, cut_stack = _scan_json_object(block, start)
+    if end is not None:
+        candidate = block[start:end]
+    elif cut is not None:
+        candidate = block[start:cut] + "".join(_CLOSERS[c] for c in reversed(cut_stack))
+        repairs.append("closed truncated JSON after last complete element")
+    else:
+        return None
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        pass
+    cleaned = _strip_trailing_commas(candidate)
+    try:
+        data = json.loads(cleaned)
+        repairs.append("removed trailing commas")
+        return data
+    except json.JSONDecodeError:
+        return None
+
+
+def _json_list(data, key, repairs):
+    value = data.get(key)
+    if value is None or isinstance(value, list):
+        return value or []
+    repairs.append(f"ignored non-list {key!r}")
+    return []
+
+
+def extract_semantic_graph(text):
+    """Parses the graph JSON following GRAPH_MARKER (or the text itself) once.
+
+    Repairs truncated output, trailing commas, duplicate/missing node IDs and edges
+    pointing at unknown nodes, recording each fix in `graph.repairs`. Returns None
+    when no usable graph can be recovered.
+    """
+    if GRAPH_MARKER in text:
+        text = text.split(GRAPH_MARKER, 1)[1]
+    repairs = []
+    data = _load_graph_json(text, repairs)
+    if not isinstance(data, dict):
+        return None
+
+    graph = SemanticGraph(repairs=repairs)
+    raw_nodes, raw_edges = _json_list(data, "nodes", repairs), _json_list(data, "edges", repairs)
+    seen = set()
+    for raw in raw_nodes:
+        if not isinstance(raw, dict) or (raw.get("id") is None and not raw.get("label")):
+            repairs.append("dropped malformed node")
+            continue
+        nid = str(raw.get("id") if raw.get("id") is not None else raw["label"])
+        if nid in seen:
+            repairs.append(f"dropped duplicate node id {nid}")
+            continue
+        seen.add(nid)
+        graph.nodes.append(GraphNode(
+            id=nid, label=str(raw.get("label") or nid), type=raw.get("type") or "Branch",
+            color=raw.get("color") or "#2a9d8f", shape=raw.get("shape") or "rectangle"
+        ))
+    dangling = 0
+    for raw in raw_edges:
+        if not isinstance(raw, dict):
+            dangling += 1
+            continue
+        src, dst = str(raw.get("source")), str(raw.get("target"))
+        if src not in seen or dst not in seen:
+            dangling += 1
+            continue
+        graph.edges.append(GraphEdge(source=src, target=dst, rel_type=raw.get("rel_type") or "AS"))
+    if dangling:
+        repairs.append(f"dropped {dangling} dangling/malformed edge(s)")
+    return graph if graph.nodes else None
+
+
+def _trie_regex(words):
+    """Builds a prefix-factored alternation; greedy optionals make it prefer the longest label."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def to_regex(node):
+        branches = [re.escape(ch) + to_regex(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return to_regex(trie)
+
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def node_link_html(node):
+    """Anchor + Google search link markup inserted for a linked node."""
+    lbl, nid = node.label, node.id
+    g_url = urllib.parse.quote(lbl)
+    return (f'<span id="{nid}"><a href="https://www.google.com/search?q={g_url}" target="_blank" '
+            f'class="semantic-node-highlight">{lbl}<i class="google-icon">↗</i></a></span>')
+
+
+def link_semantic_nodes(markdown, nodes, render=node_link_html):
+    """Links the first occurrence of every node label in one left-to-right scan.
+
+    All labels are compiled into one case-insensitive trie regex, so the text is scanned
+    once regardless of node count. Labels only match as whole words; at each position the
+    longest label that still has an unlinked node wins (so a used-up "AI Ethics" falls back
+    to "AI" there). Existing HTML tags and `<a>...</a>` regions are matched first and passed
+    through untouched, so labels are never linked inside markup inserted for another node.
+    A bare "<" (comparisons, "->" arrows) is plain text.
+
+    >>> nodes = [GraphNode(id=str(i), label=l) for i, l in enumerate(["Entropy", "Signal", "Decision"])]
+    >>> link_semantic_nodes("p < 0.05 for Entropy; Signal -> Decision", nodes, render=lambda n: f"[{n.label}]")
+    'p < 0.05 for [Entropy]; [Signal] -> [Decision]'
+    """
+    by_label = {}
+    for n in nodes:
+        if n.label:
+            by_label.setdefault(n.label.lower(), []).append(n)
+    if not by_label:
+        return markdown
+
+    pattern = re.compile(
+        r"(?P<skip><a\b[^>]*>.*?</a>|</?[A-Za-z][^<>]*>)|(?<!\w)(?P<label>" + _trie_regex(by_label) + r")(?!\w)",
+        re.IGNORECASE | re.DOTALL,
+    )
+    out, pos, remaining = [], 0, sum(len(v) for v in by_label.values())
+    while remaining:
+        match = pattern.search(markdown, pos)
+        if match is None:
+            break
+        out.append(markdown[pos:match.start()])
+        if match.group("skip") is not None:
+            out.append(match.group(0))
+            pos = match.end()
+            continue
+        # Shorter labels matching here are prefixes of the longest one; take the longest still pending
+        text = match.group("label")
+        for k in range(len(text), 0, -1):
+            pending = by_label.get(text[:k].lower())
+            if pending and (k == len(text) or not _WORD_CHAR.match(text, k)):
+                out.append(render(pending.pop(0)))
+                remaining -= 1
+                pos = match.start() + k
+                break
+        else:
+            out.append(markdown[match.start()])
+            pos = match.start() + 1
+    out.append(markdown[pos:])
+    return "".join(out)
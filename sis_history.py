@@ -0,0 +1,128 @@
+"""
+SIS run history.
+
+Every completed pipeline run (inputs, both phase outputs, parsed graph,
+precomputed layout, metrics and timings) is stored as one zlib-compressed JSON
+object addressed by its SHA-256, plus a small index row per run. Identical
+results share one object. Reopening a run reads and inflates one row, so past
+syntheses come back instantly without calling any provider. Retention keeps the
+newest `max_runs` runs no older than `max_age_days`; unreferenced objects are
+dropped with them.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict
+from functools import lru_cache
+
+from sis_cache import DEFAULT_CACHE_DIR
+
+HISTORY_MAX_RUNS = int(os.environ.get("SIS_HISTORY_MAX_RUNS", 200))
+HISTORY_MAX_DAYS = float(os.environ.get("SIS_HISTORY_MAX_DAYS", 30))
+
+
+class RunHistory:
+    """Content-addressed, compressed store of pipeline runs with a retention policy."""
+
+    def __init__(self, path, max_runs=HISTORY_MAX_RUNS, max_age_days=HISTORY_MAX_DAYS):
+        self.path = path
+        self.max_runs = max_runs
+        self.max_age_days = max_age_days
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS objects (digest TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " run_id TEXT PRIMARY KEY, created REAL NOT NULL, label TEXT NOT NULL,"
+            " version TEXT, digest TEXT NOT NULL, raw_size INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created)")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, request, result, version=None):
+        """Stores one run and applies retention. Returns its run_id."""
+        payload = json.dumps({"request": asdict(request), "result": result.to_record(), "version": version},
+                             ensure_ascii=False, sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        created = time.time()
+        run_id = f"{int(created * 1000):x}-{digest[:8]}"
+        label = " ".join(request.user_query.split())[:80]
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone() is None:
+                data = zlib.compress(payload, 6)
+                conn.execute("INSERT INTO objects (digest, data, size) VALUES (?, ?, ?)", (digest, data, len(data)))
+            conn.execute("INSERT INTO runs (run_id, created, label, version, digest, raw_size) VALUES (?, ?, ?, ?, ?, ?)",
+                         (run_id, created, label, version, digest, len(payload)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.prune()
+        return run_id
+
+    def load(self, run_id):
+        """Returns {"request": dict, "result": record, "version": str, "created": ts} or None."""
+        row = self._conn().execute(
+            "SELECT o.data, r.created FROM runs r JOIN objects o ON o.digest = r.digest WHERE r.run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        run = json.loads(zlib.decompress(row[0]))
+        run["created"] = row[1]
+        return run
+
+    def list_runs(self, limit=20):
+        rows = self._conn().execute(
+            "SELECT run_id, created, label, version FROM runs ORDER BY created DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [{"run_id": r[0], "created": r[1], "label": r[2], "version": r[3]} for r in rows]
+
+    def delete(self, run_id):
+        self._conn().execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+        self._drop_orphans()
+
+    def prune(self, max_runs=None, max_age_days=None):
+        """Applies retention (arguments override the configured limits). Returns runs removed."""
+        max_runs = self.max_runs if max_runs is None else max_runs
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        conn = self._conn()
+        removed = 0
+        if max_age_days:
+            removed += conn.execute("DELETE FROM runs WHERE created < ?", (time.time() - max_age_days * 86400,)).rowcount
+        if max_runs is not None:
+            removed += conn.execute(
+                "DELETE FROM runs WHERE run_id NOT IN (SELECT run_id FROM runs ORDER BY created DESC LIMIT ?)", (max_runs,)
+            ).rowcount
+        if removed:
+            self._drop_orphans()
+        return removed
+
+    def _drop_orphans(self):
+        self._conn().execute("DELETE FROM objects WHERE digest NOT IN (SELECT digest FROM runs)")
+
+    def stats(self):
+        conn = self._conn()
+        runs, raw = conn.execute("SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM runs").fetchone()
+        objects, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        return {"runs": runs, "objects": objects, "raw_bytes": raw, "stored_bytes": stored}
+
+
+@lru_cache(maxsize=None)
+def get_run_history():
+    """Process-wide run history under the shared cache directory."""
+    return RunHistory(os.path.join(DEFAULT_CACHE_DIR, "run_history.sqlite3"))
@@ -0,0 +1,196 @@
+"""
+SIS ontology search index.
+
+One flat list of ontology entries (user profiles, MA and IMA nodes, paradigms,
+science fields and structural models) with an inverted index over their names,
+`desc` texts and science-field `methods`, `tools` and `facets`. The index is
+built once per process; a search is a few set intersections, so the Knowledge
+Explorer can filter on every keystroke without re-rendering the ontologies.
+
+BM25 retrievers over the IMA and MA node descriptions and the science-field
+methods/tools/facets let each pipeline phase put only the top-k entries
+relevant to the inquiry into its system prompt instead of the full ontology.
+"""
+import bisect
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from sis_ontology import HUMAN_THINKING_METAMODEL, KNOWLEDGE_BASE, MENTAL_APPROACHES_ONTOLOGY
+from sis_prompt import compact_ontology
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+NAME_WEIGHT = 3
+
+
+_SUFFIXES = ("ations", "ation", "ities", "ity", "ings", "ing", "ness", "ical", "ics", "ic", "ies", "es", "ed", "al", "s")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def stem(term):
+    """Crude suffix stripping so "dialectic" / "dialectics" or "network" / "networks" meet in BM25."""
+    for suffix in _SUFFIXES:
+        if term.endswith(suffix) and len(term) - len(suffix) >= 4:
+            term = term[:-len(suffix)]
+            break
+    return term[:-1] if term.endswith("e") and len(term) >= 5 else term
+
+
+def _terms(text):
+    return [stem(t) for t in tokenize(text)]
+
+
+@dataclass
+class OntologyEntry:
+    section: str
+    name: str
+    fields: dict = field(default_factory=dict)
+
+    def text(self):
+        return " ".join([self.name] + [" ".join(v) if isinstance(v, list) else str(v) for v in self.fields.values()])
+
+    def markdown(self):
+        detail = "; ".join(f"{k}: {', '.join(v)}" if isinstance(v, list) else str(v)
+                           for k, v in self.fields.items() if v)
+        return f"• **{self.name}** · _{self.section}_" + (f" — {detail}" if detail else "")
+
+
+def ontology_entries():
+    """Every explorer entry, keyed to the same section titles as EXPLORER_MARKDOWN."""
+    entries = [OntologyEntry("👤 User Profile Ontologies", p, {"desc": d["description"]})
+               for p, d in KNOWLEDGE_BASE["User profiles"].items()]
+    entries += [OntologyEntry("🧠 Mental Approach (MA) Map", m, {"desc": d["desc"]})
+                for m, d in MENTAL_APPROACHES_ONTOLOGY["nodes"].items()]
+    entries += [OntologyEntry("🏛️ Metamodel (IMA) Structures", n, {"desc": d["desc"]})
+                for n, d in HUMAN_THINKING_METAMODEL["nodes"].items()]
+    entries += [OntologyEntry("🌍 Scientific Paradigms", p, {"desc": d})
+                for p, d in KNOWLEDGE_BASE["Scientific paradigms"].items()]
+    entries += [OntologyEntry("🔬 Science Taxonomy", s, {k: d.get(k, []) for k in ("methods", "tools", "facets")})
+                for s, d in sorted(KNOWLEDGE_BASE["Science fields"].items())]
+    entries += [OntologyEntry("🏗️ Structural Model Context", m, {"desc": d})
+                for m, d in KNOWLEDGE_BASE["Structural models"].items()]
+    return entries
+
+
+class OntologyIndex:
+    """Inverted index term -> {entry position: weight}; query terms match by prefix."""
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.postings = {}
+        for i, entry in enumerate(self.entries):
+            for term in tokenize(entry.name):
+                self.postings.setdefault(term, {})[i] = NAME_WEIGHT
+            for term in tokenize(entry.text()):
+                self.postings.setdefault(term, {}).setdefault(i, 1)
+        self.vocab = sorted(self.postings)
+
+    def _prefix_hits(self, prefix):
+        hits = {}
+        for term in self.vocab[bisect.bisect_left(self.vocab, prefix):]:
+            if not term.startswith(prefix):
+                break
+            for i, w in self.postings[term].items():
+                hits[i] = max(hits.get(i, 0), w)
+        return hits
+
+    def search(self, query, limit=50):
+        """Entries matching every query term (as a word prefix), best matches first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores = None
+        for term in terms:
+            hits = self._prefix_hits(term)
+            scores = hits if scores is None else {i: s + hits[i] for i, s in scores.items() if i in hits}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda i: (-scores[i], i))
+        return [self.entries[i] for i in ranked[:limit]]
+
+
+@lru_cache(maxsize=None)
+def get_ontology_index():
+    return OntologyIndex(ontology_entries())
+
+
+class BM25Index:
+    """Okapi BM25 over short documents given as {key: text}."""
+
+    def __init__(self, docs, k1=1.5, b=0.75):
+        self.keys = list(docs)
+        self.k1, self.b = k1, b
+        self.tf = []
+        self.lengths = []
+        df = {}
+        for key in self.keys:
+            counts = {}
+            for term in _terms(docs[key]):
+                counts[term] = counts.get(term, 0) + 1
+            self.tf.append(counts)
+            self.lengths.append(sum(counts.values()))
+            for term in counts:
+                df[term] = df.get(term, 0) + 1
+        n = len(self.keys)
+        self.avg_len = (sum(self.lengths) / n) if n else 0.0
+        self.idf = {t: math.log(1 + (n - c + 0.5) / (c + 0.5)) for t, c in df.items()}
+
+    def scores(self, query):
+        terms = [t for t in set(_terms(query)) if t in self.idf]
+        out = {}
+        for i, counts in enumerate(self.tf):
+            norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / (self.avg_len or 1))
+            score = sum(self.idf[t] * counts[t] * (self.k1 + 1) / (counts[t] + norm) for t in terms if t in counts)
+            if score > 0:
+                out[self.keys[i]] = score
+        return out
+
+    def top_k(self, query, k, allowed=None):
+        """[(key, score)] of the k best-scoring documents (optionally only keys in `allowed`)."""
+        scores = self.scores(query)
+        ranked = sorted(((key, sc) for key, sc in scores.items() if allowed is None or key in allowed),
+                        key=lambda kv: (-kv[1], self.keys.index(kv[0])))
+        return ranked[:k]
+
+
+def _field_line(name, d):
+    return (f"{name} ({d.get('cat', '')}): methods {', '.join(d.get('methods', []))}; "
+            f"tools {', '.join(d.get('tools', []))}; facets {', '.join(d.get('facets', []))}")
+
+
+@lru_cache(maxsize=None)
+def get_retrievers():
+    """Per-process BM25 indexes: "ima" and "ma" over node name + desc, "fields" over science-field details."""
+    return {
+        "ima": BM25Index({n: f"{n} {d['desc']}" for n, d in HUMAN_THINKING_METAMODEL["nodes"].items()}),
+        "ma": BM25Index({n: f"{n} {d['desc']}" for n, d in MENTAL_APPROACHES_ONTOLOGY["nodes"].items()}),
+        "fields": BM25Index({n: _field_line(n, d) for n, d in KNOWLEDGE_BASE["Science fields"].items()}),
+    }
+
+
+def retrieve_ontology(ontology, retriever, query, k, with_style=False, pinned=()):
+    """Compact encoding of the k nodes most relevant to `query` plus `pinned` ones (and relations among them).
+
+    Returns (encoding, kept_node_names); falls back to the full ontology when nothing matches.
+    """
+    hits = [name for name, _ in retriever.top_k(query, k)]
+    if not hits:
+        return compact_ontology(ontology, with_style=with_style), list(ontology["nodes"])
+    hits += [name for name in pinned if name not in hits]
+    kept = set(hits)
+    subset = {
+        "nodes": {n: d for n, d in ontology["nodes"].items() if n in kept},
+        "relations": [r for r in ontology.get("relations", []) if r[0] in kept and r[1] in kept],
+    }
+    return compact_ontology(subset, with_style=with_style), hits
+
+
+def retrieve_science_fields(query, k, sciences=None):
+    """Method/tool/facet lines for the k science fields most relevant to `query`, within `sciences` if given."""
+    hits = get_retrievers()["fields"].top_k(query, k, allowed=set(sciences) if sciences else None)
+    fields = KNOWLEDGE_BASE["Science fields"]
+    return "\n".join(_field_line(name, fields[name]) for name, _ in hits), [name for name, _ in hits]
@@ -0,0 +1,136 @@
+"""
+SIS large-file ingestion.
+
+Map-reduce digestion of uploaded context files that are too large to paste into
+the Phase 1 / Phase 2 prompts. The upload is streamed in fixed-size chunks, each
+chunk is condensed by a small, fast model with a bounded number of requests in
+flight, and the ordered chunk digests are then condensed again in groups, round
+after round, until the joined digest fits the prompt's file-context budget, so
+no part of the file is cut away by prompt truncation. Digests are cached by
+content hash, so re-uploading a file is instant.
+"""
+import codecs
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from sis_llm import scheduled_chat_completion
+from sis_prompt import DEFAULT_BUDGETS, estimate_tokens
+
+CHUNK_BYTES = 32 * 1024
+MAX_IN_FLIGHT = 4
+LARGE_FILE_BYTES = 64 * 1024
+DIGEST_NAMESPACE = "chunk_digest"
+DIGEST_PROMPT_VERSION = "v1"
+# Digests condensed together per reduce call
+REDUCE_GROUP = 8
+
+MAP_SYSTEM_PROMPT = (
+    "You condense excerpts of research documents. Extract the key facts, findings, entities, "
+    "numbers, definitions and claims from the excerpt as terse bullet points (max ~150 words). "
+    "Do not add commentary or information that is not in the excerpt."
+)
+
+
+def iter_chunks(fileobj, chunk_bytes=CHUNK_BYTES):
+    """Yields decoded UTF-8 text chunks without reading the whole upload into memory."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        raw = fileobj.read(chunk_bytes)
+        if not raw:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        text = decoder.decode(raw)
+        if text:
+            yield text
+
+
+def make_llm_summarizer(client, model, temperature=0.0, scheduler=None):
+    """Map function condensing one chunk with an OpenAI-compatible client."""
+    def summarize(chunk):
+        text, _ = scheduled_chat_completion(
+            scheduler, client, model,
+            [{"role": "system", "content": MAP_SYSTEM_PROMPT}, {"role": "user", "content": chunk}],
+            temperature=temperature,
+        )
+        return text.strip()
+    summarize.cache_tag = f"{model}:{temperature}:{DIGEST_PROMPT_VERSION}"
+    return summarize
+
+
+def _chunk_key(chunk, summarize):
+    tag = getattr(summarize, "cache_tag", DIGEST_PROMPT_VERSION)
+    return hashlib.sha256(f"{tag}\0{chunk}".encode("utf-8")).hexdigest()
+
+
+def _map_texts(texts, summarize, cache, max_in_flight):
+    """Ordered digests of `texts` (consumed lazily) with at most `max_in_flight` summaries running.
+
+    Returns (digests, cache_hits).
+    """
+    digests, window, hits = [], deque(), 0
+
+    def map_one(text, key):
+        digest = summarize(text)
+        if cache is not None:
+            cache.set(DIGEST_NAMESPACE, key, digest)
+        return digest
+
+    with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as pool:
+        for text in texts:
+            key = _chunk_key(text, summarize)
+            hit = cache.get(DIGEST_NAMESPACE, key) if cache is not None else None
+            if hit is not None:
+                digests.append(hit.decode("utf-8"))
+                hits += 1
+                continue
+            window.append((len(digests), pool.submit(map_one, text, key)))
+            digests.append(None)
+            while len(window) >= max_in_flight:
+                i, future = window.popleft()
+                digests[i] = future.result()
+        for i, future in window:
+            digests[i] = future.result()
+    return digests, hits
+
+
+def _join(parts, total):
+    """Joins (first, last, digest) parts under "[Part i/N]" / "[Parts i-j/N]" headers."""
+    return "\n\n".join(f"[Part {a}/{total}]\n{d}" if a == b else f"[Parts {a}-{b}/{total}]\n{d}" for a, b, d in parts)
+
+
+def digest_large_file(fileobj, summarize, cache=None, chunk_bytes=CHUNK_BYTES, max_in_flight=MAX_IN_FLIGHT,
+                      budget=DEFAULT_BUDGETS["file_context"], group=REDUCE_GROUP):
+    """Streams `fileobj`, maps every chunk through `summarize` and reduces to one digest within `budget` tokens.
+
+    Reduce rounds condense `group` consecutive digests per call until the joined digest fits.
+    Returns (digest_text, stats) where stats holds chunk, chunk cache-hit, reduce-round and byte counts.
+    """
+    raw_chars = [0]
+
+    def chunks():
+        for chunk in iter_chunks(fileobj, chunk_bytes):
+            raw_chars[0] += len(chunk)
+            yield chunk
+
+    digests, hits = _map_texts(chunks(), summarize, cache, max_in_flight)
+    total = len(digests)
+    parts = [(i + 1, i + 1, d) for i, d in enumerate(digests)]
+    rounds = 0
+    while len(parts) > 1 and estimate_tokens(_join(parts, total)) > budget:
+        groups = [parts[i:i + group] for i in range(0, len(parts), group)]
+        reduced, _ = _map_texts((_join(g, total) for g in groups), summarize, cache, max_in_flight)
+        parts = [(g[0][0], g[-1][1], d) for g, d in zip(groups, reduced)]
+        rounds += 1
+
+    reduced = _join(parts, total)
+    stats = {
+        "chunks": total,
+        "cache_hits": hits,
+        "reduce_rounds": rounds,
+        "raw_chars": raw_chars[0],
+        "digest_chars": len(reduced),
+    }
+    return reduced, stats
@@ -0,0 +1,188 @@
+"""
+SIS background jobs.
+
+Pipeline runs are submitted as jobs to one bounded, process-wide worker pool
+instead of running inside the Streamlit script thread. A job records its
+current stage, the stage timeline and the latest streamed text of each phase,
+so any rerun (or a reloaded page that still knows the job ID) can poll it and
+reattach while the page stays interactive; widget changes no longer abort the
+provider calls in flight. Jobs can be cancelled, and admission control rejects
+new jobs once too many are waiting. Concurrent Groq / Cerebras calls across all
+jobs are capped by the provider schedulers (see sis_ratelimit).
+
+Pipeline jobs are single-flight: a submission whose normalized inputs match a
+job that is still queued or running subscribes to that job instead of starting
+another one, so every subscriber polls the same stage timeline and streamed
+text and gets the same result. A shared job is only cancelled once all of its
+subscribers have cancelled.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from sis_clients import get_client_registry
+from sis_history import get_run_history
+from sis_pipeline import PhaseFailure, run_fingerprint, run_pipeline
+from sis_telemetry import record_run
+
+JOB_WORKERS = int(os.environ.get("SIS_JOB_WORKERS", 4))
+JOB_MAX_PENDING = int(os.environ.get("SIS_JOB_MAX_PENDING", 16))
+JOB_RETENTION = 3600
+
+
+class JobRejected(RuntimeError):
+    """Raised instead of queueing when the worker pool already has too many jobs waiting."""
+
+
+@dataclass
+class Job:
+    job_id: str
+    label: str = ""
+    status: str = "queued"  # queued | running | done | failed | cancelled
+    stage: str = ""
+    message: str = ""
+    timeline: list = field(default_factory=list)
+    live: dict = field(default_factory=dict)
+    result: object = None
+    error: object = None
+    created: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    key: str = None  # single-flight key; identical submissions while active join this job
+    subscribers: set = field(default_factory=set)
+    meta: dict = field(default_factory=dict)  # caller context (e.g. the request and UI options)
+    run_id: str = None  # run history ID of a completed pipeline job
+
+    def active(self):
+        return self.status in ("queued", "running")
+
+
+class JobManager:
+    """Bounded worker pool plus a registry of recent jobs, shared by every session."""
+
+    def __init__(self, workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING, retention=JOB_RETENTION):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sis-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._inflight = {}  # single-flight key -> active job
+        self.coalesced = 0
+
+    def submit(self, fn, label="", meta=None, key=None, subscriber=None):
+        """Queues `fn(job)`; its return value becomes `job.result`. Raises JobRejected when saturated.
+
+        With `key`, an active (not cancelled) job submitted under the same key is returned
+        instead, with `subscriber` (default: a fresh ID) added to its subscribers.
+        """
+        subscriber = subscriber or uuid.uuid4().hex[:8]
+        with self._lock:
+            self._prune()
+            job = self._inflight.get(key) if key else None
+            if job is not None and job.active() and not job.cancel_event.is_set():
+                job.subscribers.add(subscriber)
+                self.coalesced += 1
+                return job
+            waiting = sum(j.status == "queued" for j in self._jobs.values())
+            if waiting >= self.max_pending:
+                raise JobRejected(f"{waiting} runs already waiting for a worker; try again shortly.")
+            job = Job(job_id=uuid.uuid4().hex[:12], label=label, key=key, subscribers={subscriber}, meta=dict(meta or {}))
+            self._jobs[job.job_id] = job
+            if key:
+                self._inflight[key] = job
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def submit_pipeline(self, request, groq_client, cerebras_client, label="", meta=None, subscriber=None, version=None,
+                        **kwargs):
+        """Queues `run_pipeline` single-flight on `run_fingerprint`; stage, timeline and streamed text are mirrored onto the job.
+
+        On completion the job itself stores the run in the run history (`job.run_id`) and records
+        its telemetry (`job.meta["telemetry"]`), whether or not any page is still polling it; a
+        Phase 2 failure is recorded as "phase_failure" unless the job was cancelled.
+        """
+        def fn(job):
+            def on_stage(stage, message):
+                job.stage, job.message = stage, message
+            def on_timeline(timeline):
+                job.timeline = timeline
+            try:
+                result = run_pipeline(request, groq_client, cerebras_client, on_stage=on_stage, on_timeline=on_timeline,
+                                      on_groq_text=lambda text: job.live.__setitem__("groq", text),
+                                      on_cerebras_text=lambda text: job.live.__setitem__("cerebras", text),
+                                      cancel_event=job.cancel_event, **kwargs)
+            except PhaseFailure as e:
+                if not job.cancel_event.is_set():
+                    record_run(e.result, version, status="phase_failure")
+                raise
+            job.meta["conn_after"] = get_client_registry().totals()
+            job.run_id = get_run_history().save(request, result, version)
+            job.meta["telemetry"] = record_run(result, version)
+            return result
+        key = run_fingerprint(request, kwargs.get("phase1_text"), kwargs.get("file_stream"))
+        return self.submit(fn, label=label or request.user_query[:80], meta=dict(meta or {}, request=request),
+                           key=key, subscriber=subscriber)
+
+    def _run(self, job, fn):
+        if job.cancel_event.is_set():
+            job.status, job.finished = "cancelled", time.time()
+            return
+        job.started = time.time()
+        job.status = "running"  # after `started`: pollers read it as soon as the status changes
+        try:
+            job.result = fn(job)
+            job.status = "done"
+        except Exception as exc:
+            job.error = exc
+            job.status = "cancelled" if job.cancel_event.is_set() else "failed"
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id, subscriber=None):
+        """Unsubscribes `subscriber` (all subscribers if None); returns True if that stopped the job.
+
+        A job with no subscribers left is asked to stop: queued jobs never start, running
+        ones stop at the next stage or stream chunk.
+        """
+        job = self.get(job_id)
+        if job is None or not job.active():
+            return False
+        with self._lock:
+            if subscriber is None:
+                job.subscribers.clear()
+            else:
+                job.subscribers.discard(subscriber)
+            if job.subscribers:
+                return False
+            job.cancel_event.set()
+        return True
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [j.job_id for j in self._jobs.values() if j.finished and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {"workers": self.workers, "queued": sum(j.status == "queued" for j in jobs),
+                "running": sum(j.status == "running" for j in jobs), "coalesced": self.coalesced}
+
+
+@lru_cache(maxsize=None)
+def get_job_manager():
+    """Process-wide job manager shared by every Streamlit session."""
+    return JobManager()
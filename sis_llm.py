@@ -0,0 +1,201 @@
+"""
+SIS LLM call layer.
+
+Thin wrapper around OpenAI-compatible `chat.completions.create` used by both
+pipeline phases (Groq and Cerebras). It hides the difference between blocking
+and streaming calls and always reports the same latency metrics.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+COMPLETION_TOKEN_ESTIMATE = 2048
+# Metrics kept with a cached response (hits report their own timing, no queue wait or retries)
+CACHED_METRICS = ("model", "stream", "prompt_tokens", "completion_tokens")
+
+
+def _usage_tokens(usage, field):
+    return getattr(usage, field, None) if usage is not None else None
+
+
+class RequestCancelled(RuntimeError):
+    """The caller abandoned this request (e.g. it lost a hedged race)."""
+
+
+class AnyEvent:
+    """Read-only view that is set when any of several threading.Events is (e.g. hedge loser or cancelled job)."""
+
+    def __init__(self, *events):
+        self.events = [e for e in events if e is not None]
+
+    def is_set(self):
+        return any(e.is_set() for e in self.events)
+
+
+def run_chat_completion(client, model, messages, temperature, stream=False, on_text=None, cancel_event=None):
+    """Runs one chat completion and returns (text, metrics).
+
+    With `stream=True` tokens are consumed as they arrive and `on_text(text_so_far)`
+    is called after every delta, so callers can render incrementally. Metrics always
+    contain `ttft` (time to first token, seconds), `seconds` (total wall time),
+    `prompt_tokens`, `completion_tokens` and `tokens_per_sec`. Setting `cancel_event`
+    closes a stream at the next chunk (or discards a blocking result) with RequestCancelled.
+    """
+    t0 = time.perf_counter()
+    ttft = None
+    usage = None
+
+    if not stream:
+        response = client.chat.completions.create(model=model, messages=messages, temperature=temperature)
+        text = response.choices[0].message.content or ""
+        usage = response.usage
+        elapsed = time.perf_counter() - t0
+        ttft = elapsed
+        if cancel_event is not None and cancel_event.is_set():
+            raise RequestCancelled(model)
+        if on_text: on_text(text)
+    else:
+        text, chunk_count = "", 0
+        response = client.chat.completions.create(
+            model=model, messages=messages, temperature=temperature,
+            stream=True, stream_options={"include_usage": True}
+        )
+        for chunk in response:
+            if cancel_event is not None and cancel_event.is_set():
+                getattr(response, "close", lambda: None)()
+                raise RequestCancelled(model)
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - t0
+            text += delta
+            chunk_count += 1
+            if on_text: on_text(text)
+        elapsed = time.perf_counter() - t0
+
+    completion_tokens = _usage_tokens(usage, "completion_tokens")
+    if completion_tokens is None and stream:
+        completion_tokens = chunk_count
+    gen_time = elapsed - (ttft or 0) if stream else elapsed
+    metrics = {
+        "model": model,
+        "stream": stream,
+        "ttft": round(ttft, 3) if ttft is not None else None,
+        "seconds": round(elapsed, 3),
+        "prompt_tokens": _usage_tokens(usage, "prompt_tokens"),
+        "completion_tokens": completion_tokens,
+        "tokens_per_sec": round(completion_tokens / gen_time, 1) if completion_tokens and gen_time > 0 else None,
+    }
+    return text, metrics
+
+
+class ResponseCache:
+    """Content-addressed completion cache: in-process LRU in front of a shared DiskCache."""
+
+    NAMESPACE = "llm_response"
+
+    def __init__(self, disk=None, max_items=256, max_bytes=32 * 1024 * 1024):
+        self.disk = disk
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(provider, model, temperature, messages):
+        """sha256 over (provider, model, temperature, system prompt, user prompt)."""
+        payload = json.dumps([provider, model, temperature, messages], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if self.disk is not None:
+            entry = self.disk.get_json(self.NAMESPACE, key)
+            if entry is not None:
+                self._remember(key, entry)
+                return entry
+        return None
+
+    def put(self, key, entry):
+        self._remember(key, entry)
+        if self.disk is not None:
+            self.disk.set_json(self.NAMESPACE, key, entry)
+
+    def _remember(self, key, entry):
+        size = len(entry["text"].encode("utf-8"))
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old["text"].encode("utf-8"))
+            self._memory[key] = entry
+            self._bytes += size
+            while self._memory and (len(self._memory) > self.max_items or self._bytes > self.max_bytes):
+                _, evicted = self._memory.popitem(last=False)
+                self._bytes -= len(evicted["text"].encode("utf-8"))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._bytes = 0
+        if self.disk is not None:
+            self.disk.invalidate(self.NAMESPACE)
+
+
+def scheduled_chat_completion(scheduler, client, model, messages, temperature, stream=False, on_text=None,
+                              cancel_event=None, completion_estimate=COMPLETION_TOKEN_ESTIMATE, retry_5xx=True):
+    """`run_chat_completion` admitted through a rate-limit scheduler (see sis_ratelimit), if given.
+
+    The scheduler is charged the prompt size plus `completion_estimate` tokens; its queue
+    wait and retry count are added to the returned metrics. `retry_5xx=False` raises
+    server errors without same-model retries (the caller has another model to try).
+    """
+    call = lambda: run_chat_completion(client, model, messages, temperature, stream=stream, on_text=on_text,
+                                       cancel_event=cancel_event)
+    if scheduler is None:
+        return call()
+    cost = sum(len(m["content"]) for m in messages) // 4 + completion_estimate
+    info = {}
+    text, metrics = scheduler.call(call, cost=cost, info=info, retry_5xx=retry_5xx)
+    metrics.update(info)
+    return text, metrics
+
+
+def cached_chat_completion(cache, provider, client, model, messages, temperature,
+                           stream=False, on_text=None, use_cache=True, scheduler=None, cancel_event=None,
+                           completion_estimate=COMPLETION_TOKEN_ESTIMATE, retry_5xx=True):
+    """`scheduled_chat_completion` behind a ResponseCache; metrics["cache"] is "hit", "miss" or "off"."""
+    if cache is None or not use_cache:
+        text, metrics = scheduled_chat_completion(scheduler, client, model, messages, temperature, stream=stream,
+                                                  on_text=on_text, cancel_event=cancel_event,
+                                                  completion_estimate=completion_estimate, retry_5xx=retry_5xx)
+        metrics["cache"] = "off"
+        return text, metrics
+
+    key = ResponseCache.make_key(provider, model, temperature, messages)
+    t0 = time.perf_counter()
+    entry = cache.get(key)
+    if entry is not None:
+        if on_text: on_text(entry["text"])
+        metrics = dict(entry["metrics"], cache="hit", seconds=round(time.perf_counter() - t0, 3), ttft=None,
+                       tokens_per_sec=None, queue_wait=0.0, retries=0)
+        return entry["text"], metrics
+
+    text, metrics = scheduled_chat_completion(scheduler, client, model, messages, temperature, stream=stream,
+                                              on_text=on_text, cancel_event=cancel_event,
+                                              completion_estimate=completion_estimate, retry_5xx=retry_5xx)
+    # Only what describes the text itself; timings and scheduler waits belong to this call
+    cache.put(key, {"text": text, "metrics": {k: metrics.get(k) for k in CACHED_METRICS}})
+    metrics["cache"] = "miss"
+    return text, metrics
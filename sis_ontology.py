@@ -0,0 +1,381 @@
+"""
+SIS ontologies and knowledge base.
+
+The Integrated Metamodel Architecture (IMA), the Mental Approaches (MA) ontology
+and the 18D science-field knowledge base, plus their compact prompt encodings.
+Kept free of Streamlit so the UI, the batch runner and benchmarks share them.
+"""
+from sis_prompt import compact_ontology
+
+# =============================================================================
+# ARCHITECTURAL ONTOLOGIES (IMA & MA) - EXHAUSTIVE EXPANSION
+# =============================================================================
+
+HUMAN_THINKING_METAMODEL = {
+    "nodes": {
+        "Human mental concentration": {
+            "color": "#ADB5BD", "shape": "rectangle", 
+            "desc": "The foundational state of cognitive focus required for interdisciplinary synthesis and logical rigor."
+        },
+        "Identity": {
+            "color": "#C6EFCE", "shape": "rectangle", 
+            "desc": "The subjective core of the researcher or agent, containing professional ethical parameters and specialized lenses."
+        },
+        "Autobiographical memory": {
+            "color": "#C6EFCE", "shape": "rectangle", 
+            "desc": "The historical database of past cycles influencing current logic."
+        },
+        "Mission": {
+            "color": "#92D050", "shape": "rectangle", 
+            "desc": "The high-level existential imperative driving the direction of inquiry and synthesis."
+        },
+        "Vision": {
+            "color": "#FFFF00", "shape": "rectangle", 
+            "desc": "Mental simulation of a desired future outcome acting as a magnetic pull for goal-setting."
+        },
+        "Goal": {
+            "color": "#00B0F0", "shape": "rectangle", 
+            "desc": "Quantifiable milestones materialize the mission within reality."
+        },
+        "Problem": {
+            "color": "#F2DCDB", "shape": "rectangle", 
+            "desc": "Obstruction preventing goal realization; gap between current and target state."
+        },
+        "Ethics/moral": {
+            "color": "#FFC000", "shape": "rectangle", 
+            "desc": "Value system filtering solution validity."
+        },
+        "Hierarchy of interests": {
+            "color": "#F8CBAD", "shape": "rectangle", 
+            "desc": "Ordering of needs dictating resource allocation."
+        },
+        "Rule": {
+            "color": "#F2F2F2", "shape": "rectangle", 
+            "desc": "Structural, logical, and legal constraints governing node interactions."
+        },
+        "Decision-making": {
+            "color": "#FFFF99", "shape": "rectangle", 
+            "desc": "Choosing efficient selection pathways toward goal achievement."
+        },
+        "Problem solving": {
+            "color": "#D9D9D9", "shape": "rectangle", 
+            "desc": "Algorithmic process removing obstructions."
+        },
+        "Conflict situation": {
+            "color": "#00FF00", "shape": "rectangle", 
+            "desc": "State where multiple goals or rules clash."
+        },
+        "Knowledge": {
+            "color": "#DDEBF7", "shape": "rectangle", 
+            "desc": "Internalized facts and theoretical models."
+        },
+        "Tool": {
+            "color": "#00B050", "shape": "rectangle", 
+            "desc": "External instruments leveraged to interact with the domain."
+        },
+        "Experience": {
+            "color": "#00B050", "shape": "rectangle", 
+            "desc": " Wisdom gained through direct application of knowledge."
+        },
+        "Classification": {
+            "color": "#CCC0DA", "shape": "rectangle", 
+            "desc": "Taxonomic act reducing cognitive load."
+        },
+        "Psychological aspect": {
+            "color": "#F8CBAD", "shape": "rectangle", 
+            "desc": "Internal outcomes on individual mental states."
+        },
+        "Sociological aspect": {
+            "color": "#00FFFF", "shape": "rectangle", 
+            "desc": "External collective impact and social changes."
+        }
+    },
+    "relations": [
+        ("Human mental concentration", "Identity", "has"), ("Identity", "Autobiographical memory", "possesses"),
+        ("Mission", "Vision", "defines"), ("Vision", "Goal", "leads to"), ("Problem", "Identity", "challenges"),
+        ("Rule", "Decision-making", "constrains"), ("Knowledge", "Classification", "organizes"),
+        ("Experience", "Psychological aspect", "forms"), ("Conflict situation", "Sociological aspect", "triggers")
+    ]
+}
+
+MENTAL_APPROACHES_ONTOLOGY = {
+    "nodes": {
+        "Perspective shifting": {
+            "color": "#00FF00", "shape": "diamond", 
+            "desc": "Rotating problem space through disparate stakeholders."
+        },
+        "Similarity and difference": {
+            "color": "#FFFF00", "shape": "diamond", 
+            "desc": "Pattern recognition act identifying anomalies."
+        },
+        "Core": {
+            "color": "#FFC000", "shape": "diamond", 
+            "desc": "Distillation of a problem into fundamental essence."
+        },
+        "Attraction": {
+            "color": "#F2A6A2", "shape": "diamond", 
+            "desc": "Force drawing disparate concepts into synthesis."
+        },
+        "Repulsion": {
+            "color": "#D9D9D9", "shape": "diamond", 
+            "desc": "Isolation of incompatible solutions or noise."
+        },
+        "Condensation": {
+            "color": "#CCC0DA", "shape": "diamond", 
+            "desc": "Reduction of vast complexity into strategic insight."
+        },
+        "Framework and foundation": {
+            "color": "#F8CBAD", "shape": "diamond", 
+            "desc": "Establishing boundaries for innovation logic."
+        },
+        "Bipolarity and dialectics": {
+            "color": "#DDEBF7", "shape": "diamond", 
+            "desc": "Synthesis through opposing tension tension."
+        },
+        "Constant": {
+            "color": "#E1C1D1", "shape": "diamond", 
+            "desc": "Identifying stable system invariants."
+        },
+        "Associativity": {
+            "color": "#E1C1D1", "shape": "diamond", 
+            "desc": "Non-linear, lateral knowledge linking."
+        },
+        "Induction": {
+            "color": "#B4C6E7", "shape": "diamond", 
+            "desc": "Building broad theory from field observations."
+        },
+        "Whole and part": {
+            "color": "#00FF00", "shape": "diamond", 
+            "desc": "Holistic vs Granular logic navigation."
+        },
+        "Mini-max": {
+            "color": "#00FF00", "shape": "diamond", 
+            "desc": "Maximum utility with minimum friction search."
+        },
+        "Addition and composition": {
+            "color": "#FF00FF", "shape": "diamond", 
+            "desc": "Building complexity through layering building blocks."
+        },
+        "Hierarchy": {
+            "color": "#C6EFCE", "shape": "diamond", 
+            "desc": "Vertical taxonomic ranking by systemic priority."
+        },
+        "Balance": {
+            "color": "#00B0F0", "shape": "diamond", 
+            "desc": "Search for dynamic equilibrium between variables."
+        },
+        "Deduction": {
+            "color": "#92D050", "shape": "diamond", 
+            "desc": "Applying broad laws to solve specifics."
+        },
+        "Abstraction and elimination": {
+            "color": "#00B0F0", "shape": "diamond", 
+            "desc": "Removing noise to reach a generic model."
+        },
+        "Pleasure and displeasure": {
+            "color": "#00FF00", "shape": "diamond", 
+            "desc": "Evaluative feedback on solution elegance."
+        },
+        "Openness and closedness": {
+            "color": "#FFC000", "shape": "diamond", 
+            "desc": "Systemic boundary state governing external data nodes."
+        }
+    }
+}
+
+# Compact prompt encodings (one line per node / relation instead of pretty JSON dictionaries)
+IMA_PROMPT_ENCODING = compact_ontology(HUMAN_THINKING_METAMODEL)
+MA_PROMPT_ENCODING = compact_ontology(MENTAL_APPROACHES_ONTOLOGY, with_style=True)
+
+# =============================================================================
+# KNOWLEDGE BASE (EXHAUSTIVE 18D SCIENCE FIELDS & ONTOLOGIES)
+# =============================================================================
+
+KNOWLEDGE_BASE = {
+    "User profiles": {
+        "Adventurers": {"description": "Explorers of hidden interdisciplinary patterns and high-risk hypotheses."},
+        "Applicators": {"description": "Focused on practical efficiency, rapid deployment, and tangible execution."},
+        "Know-it-alls": {"description": "Seekers of systemic absolute clarity, comprehensive taxonomy, and complete data."},
+        "Observers": {"description": "Passive monitors of systemic dynamics and trend watchers without intervention."}
+    },
+    "Scientific paradigms": {
+        "Empiricism": "Focus on sensory experience, experimental evidence, and observation-driven data.",
+        "Rationalism": "Reliance on deductive logic, a priori reasoning, and mathematical certainty.",
+        "Constructivism": "Knowledge as a social and cognitive build, dependent on perception.",
+        "Positivism": "Strict adherence to verifiable facts and rejection of speculation.",
+        "Pragmatism": "Evaluation based on utility and real-world application."
+    },
+    "Structural models": {
+        "Causal Connections": "Chains of cause and effect mapping systemic causality.",
+        "Principles & Relations": "Fundamental laws and the inter-relations between entities.",
+        "Episodes & Sequences": "Temporal flow, historical timelines, and event ordering.",
+        "Facts & Characteristics": "Raw data properties, attributes, and static descriptions.",
+        "Generalizations": "Broad frameworks and high-level theoretical models.",
+        "Glossary": "Precise definitions and terminological clarity.",
+        "Concepts": "Abstract constructs and conceptual building blocks."
+    },
+    "Science fields": {
+        "Mathematics": {
+            "cat": "Formal", 
+            "methods": ["Axiomatization", "Formal Proof", "Stochastic Modeling", "Topology"], 
+            "tools": ["MATLAB", "LaTeX", "WolframAlpha"], 
+            "facets": ["Algebra", "Analysis", "Number Theory", "Calculus"]
+        },
+        "Physics": {
+            "cat": "Natural", 
+            "methods": ["Quantum Modeling", "Particle Tracking", "Interferometry", "Simulation"], 
+            "tools": ["Accelerator", "Spectrometer", "Oscilloscopes", "Cryostats"], 
+            "facets": ["Relativity", "Quantum Mechanics", "Thermodynamics", "Optics"]
+        },
+        "Chemistry": {
+            "cat": "Natural", 
+            "methods": ["Organic Synthesis", "Chromatography", "NMR Spectroscopy", "Titration"], 
+            "tools": ["NMR", "Mass Spec", "Incubators", "Burettes"], 
+            "facets": ["Biochemistry", "Physical Chemistry", "Analytical", "Inorganic"]
+        },
+        "Biology": {
+            "cat": "Natural", 
+            "methods": ["Gene Sequencing", "CRISPR", "Cell Culture", "In-vivo observation"], 
+            "tools": ["Electron Microscope", "PCR Machine", "Centrifuge", "Incubators"], 
+            "facets": ["Genetics", "Microbiology", "Ecology", "Cell Biology"]
+        },
+        "Neuroscience": {
+            "cat": "Natural", 
+            "methods": ["Neuroimaging", "Optogenetics", "Behavioral Mapping", "Electrophysiology"], 
+            "tools": ["fMRI", "EEG", "Electrodes", "Patch Clamp"], 
+            "facets": ["Cognitive Neuroscience", "Neural Plasticity", "Synaptic Physiology"]
+        },
+        "Psychology": {
+            "cat": "Social", 
+            "methods": ["Double-Blind Trials", "Psychometrics", "Longitudinal Studies", "CBT"], 
+            "tools": ["Standardized Tests", "Surveys", "Biofeedback", "Eye-tracking"], 
+            "facets": ["Behavioral", "Clinical", "Developmental", "Cognitive Psychology"]
+        },
+        "Sociology": {
+            "cat": "Social", 
+            "methods": ["Ethnography", "Network Analysis", "Survey Design", "Grounded Theory"], 
+            "tools": ["NVivo", "SPSS", "Census Data", "Social Graphs"], 
+            "facets": ["Demography", "Stratification", "Dynamics", "Urban Sociology"]
+        },
+        "Computer Science": {
+            "cat": "Formal", 
+            "methods": ["Algorithm Design", "Verification", "Complexity Analysis", "Parallelism"], 
+            "tools": ["GPU Clusters", "Docker", "Compilers", "IDEs", "Kubernetes"], 
+            "facets": ["AI", "Cybersecurity", "Blockchain", "Cloud Computing"]
+        },
+        "Medicine": {
+            "cat": "Applied", 
+            "methods": ["Clinical Trials", "Epidemiology", "Radiology", "Pathology"], 
+            "tools": ["MRI", "CT Scanner", "Biomarker Assays", "Ultrasound"], 
+            "facets": ["Genomics", "Immunology", "Oncology", "Internal Medicine"]
+        },
+        "Psychiatry": {
+            "cat": "Applied/Medical", 
+            "methods": ["Clinical Trials", "Diagnostic Interviewing", "Case Formulation", "Psychopharmacological Modeling", "Neuroimaging Analysis"], 
+            "tools": ["DSM-5-TR", "ICD-11", "EEG", "fMRI", "Standardized Rating Scales (PHQ-9, HAM-D)"], 
+            "facets": ["Clinical Psychiatry", "Neuropsychiatry", "Forensic Psychiatry", "Child & Adolescent Psychiatry", "Geriatric Psychiatry"]
+        },
+        "Engineering": {
+            "cat": "Applied", 
+            "methods": ["FEA Analysis", "Prototyping", "Stress Testing", "Systems Integration"], 
+            "tools": ["CAD", "3D Printers", "CNC Machines", "Simulation SW"], 
+            "facets": ["Robotics", "Nanotechnology", "Civil Eng", "Electrical Eng"]
+        },
+        "Economics": {
+            "cat": "Social", 
+            "methods": ["Econometrics", "Game Theory", "Macro Equilibrium Modeling", "Forecasting"], 
+            "tools": ["Bloomberg", "Stata", "R", "Python Pandas"], 
+            "facets": ["Finance", "Behavioral Econ", "Macroeconomics", "Microeconomics"]
+        },
+        "Philosophy": {
+            "cat": "Humanities", 
+            "methods": ["Socratic Method", "Dialectics", "Phenomenology", "Conceptual Analysis"], 
+            "tools": ["Logic Mapping", "Primary Texts", "Semantic Analysis"], 
+            "facets": ["Epistemology", "Ethics", "Metaphysics", "Aesthetics"]
+        },
+        "Linguistics": {
+            "cat": "Humanities", 
+            "methods": ["Corpus Analysis", "Syntactic Parsing", "Historical Phonetics", "Transcription"], 
+            "tools": ["Praat", "NLTK", "WordNet", "ELAN"], 
+            "facets": ["Semantics", "Phonology", "Sociolinguistics", "CompLing"]
+        },
+        "Ecology": {
+            "cat": "Natural", 
+            "methods": ["Remote Sensing", "Trophic Modeling", "Field Sampling", "Biogeochemistry"], 
+            "tools": ["GIS", "Biosensors", "Drones", "Satellite Imagery"], 
+            "facets": ["Biodiversity", "Conservation Biology", "Restoration Ecology"]
+        },
+        "History": {
+            "cat": "Humanities", 
+            "methods": ["Archival Research", "Historiography", "Oral History", "Prosopography"], 
+            "tools": ["Radiocarbon Dating", "Microfilm", "Digital Archives"], 
+            "facets": ["Military History", "Diplomacy", "Ancient Civilizations", "Social History"]
+        },
+        "Architecture": {
+            "cat": "Applied", 
+            "methods": ["Parametric Design", "Environmental Analysis", "BIM", "Urbanism"], 
+            "tools": ["Revit", "Rhino 3D", "AutoCAD", "Photogrammetry"], 
+            "facets": ["Urban Design", "Sustainability", "Landscape Arch", "Heritage"]
+        },
+        "Geology": {
+            "cat": "Natural", 
+            "methods": ["Stratigraphy", "Mineralogy", "Seismology", "Petrology"], 
+            "tools": ["Seismograph", "GIS", "Magnetometers", "Thin-sectioning"], 
+            "facets": ["Tectonics", "Petrology", "Paleontology", "Geophysics"]
+        },
+        "Geography": {
+            "cat": "Natural/Social", 
+            "methods": ["Spatial Analysis", "Geospatial Modeling", "Remote Sensing", "Field Observation", "Regional Synthesis"], 
+            "tools": ["ArcGIS/QGIS", "GPS Systems", "Satellite Imagery", "Lidar Scan", "Cartographic Software"], 
+            "facets": ["Physical Geography", "Human Geography", "Geomorphology", "Urban Geography", "Biogeography"]
+        },
+        "Climatology": {
+            "cat": "Natural", 
+            "methods": ["Climate Modeling", "Paleoclimatic Reconstruction", "Statistical Time-Series Analysis", "Numerical Simulation", "Isotope Analysis"], 
+            "tools": ["Supercomputers (HPC)", "Weather Station Arrays", "Satellite Radiometers", "Ice Core Analysis", "Radiosondes"], 
+            "facets": ["Meteorology", "Paleoclimatology", "Dynamic Climatology", "Synoptic Climatology", "Applied Climatology"]
+        },
+        "Library Science": {
+            "cat": "Applied", 
+            "methods": ["Taxonomy", "Archival Appraisal", "Retrieval Logic", "Metadata"], 
+            "tools": ["OPAC", "Metadata Systems", "Thesauri", "Digital Archives"], 
+            "facets": ["Knowledge Organization", "Information Retrieval", "Digital Curation"]
+        },
+        "Criminology": {
+            "cat": "Social", 
+            "methods": ["Profiling", "Longitudinal Studies", "Victimology Analysis", "Ethnography"], 
+            "tools": ["Crime Mapping", "AFIS", "CODIS", "SPSS"], 
+            "facets": ["Penology", "Forensic Psychology", "Police Science", "Criminal Justice"]
+        },
+        "Forensic sciences": {
+            "cat": "Applied/Natural", 
+            "methods": ["DNA Profiling", "Ballistics", "Toxicology", "Trace Analysis", "Bloodstain Pattern Analysis", "Fingerprint Identification"], 
+            "tools": ["Mass Spectrometer", "Luminol", "Comparison Microscope", "AFIS (Automated Fingerprint Identification System)", "Gas Chromatography"], 
+            "facets": ["Forensic Biology", "Forensic Chemistry", "Forensic Pathology", "Digital Forensics", "Forensic Odontology"]
+        },
+        "Legal science": {
+            "cat": "Social", 
+            "methods": ["Legal Hermeneutics", "Comparative Law", "Dogmatic Method", "Empirical Legal Research"], 
+            "tools": ["Legislative Databases", "Case Law Archives", "Constitutional Records", "Westlaw", "LexisNexis"], 
+            "facets": ["Jurisprudence", "Constitutional Law", "Criminal Law", "Civil Law", "International Law"]
+        }
+    }
+}
+
+# =============================================================================
+# DERIVED VIEWS (computed once per process, reused by every Streamlit rerun)
+# =============================================================================
+
+SCIENCE_FIELD_OPTIONS = sorted(KNOWLEDGE_BASE["Science fields"])
+PARADIGM_OPTIONS = list(KNOWLEDGE_BASE["Scientific paradigms"])
+STRUCTURAL_MODEL_OPTIONS = list(KNOWLEDGE_BASE["Structural models"])
+
+# Knowledge Explorer sections as one pre-rendered markdown block each (instead of one element per entry)
+EXPLORER_MARKDOWN = {
+    "👤 User Profile Ontologies": "\n\n".join(f"**{p}**: {d['description']}" for p, d in KNOWLEDGE_BASE["User profiles"].items()),
+    "🧠 Mental Approach (MA) Map": "\n\n".join(f"• **{m}**: {d['desc']}" for m, d in MENTAL_APPROACHES_ONTOLOGY["nodes"].items()),
+    "🏛️ Metamodel (IMA) Structures": "\n\n".join(f"• **{n}**: {d['desc']}" for n, d in HUMAN_THINKING_METAMODEL["nodes"].items()),
+    "🌍 Scientific Paradigms": "\n\n".join(f"**{p}**: {d}" for p, d in KNOWLEDGE_BASE["Scientific paradigms"].items()),
+    "🔬 Science Taxonomy": "\n\n".join(f"• **{s}**" for s in SCIENCE_FIELD_OPTIONS),
+    "🏗️ Structural Model Context": "\n\n".join(f"**{m}**: {d}" for m, d in KNOWLEDGE_BASE["Structural models"].items()),
+}
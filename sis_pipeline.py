@@ -0,0 +1,526 @@
+"""
+SIS synergy execution engine (Groq -> Cerebras pipeline).
+
+Importable, UI-free version of the two-phase pipeline: bibliography fetch,
+optional large-file digest, Phase 1 research foundation (Groq, optionally fanned
+out per science field and merged), Phase 2 innovation + semantic graph
+(Cerebras), graph parsing, node linking and layout, scheduled as a stage DAG so
+independent steps overlap. The Streamlit
+app and the headless batch runner both call `run_pipeline`; UI concerns are
+injected through callbacks.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+
+from sis_analytics import analyze_graph
+from sis_bibliography import fetch_author_bibliographies
+from sis_cache import DiskCache, DEFAULT_CACHE_DIR
+from sis_dag import Stage, run_dag
+from sis_endpoints import cerebras_policy
+from sis_graph import GRAPH_MARKER, SemanticGraph, extract_semantic_graph, link_semantic_nodes
+from sis_index import get_retrievers, retrieve_ontology, retrieve_science_fields
+from sis_ingest import digest_large_file, make_llm_summarizer
+from sis_layout import compute_layout
+from sis_llm import AnyEvent, ResponseCache, cached_chat_completion
+from sis_ontology import (HUMAN_THINKING_METAMODEL, IMA_PROMPT_ENCODING, KNOWLEDGE_BASE, MA_PROMPT_ENCODING,
+                          MENTAL_APPROACHES_ONTOLOGY)
+from sis_prompt import DEFAULT_BUDGETS, PromptBuilder, estimate_tokens
+from sis_ratelimit import get_scheduler
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+CEREBRAS_BASE_URL = "https://api.cerebras.ai/v1"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+DIGEST_MODEL = "llama-3.1-8b-instant"
+SCIENCE_FIELDS_TOP_K = 3
+# MA nodes the Phase 2 prompt names explicitly; always kept when retrieving top-k
+PHASE2_PINNED_MA = ("Bipolarity and dialectics", "Perspective shifting", "Core")
+# Phase 1 fan-out: one Groq request per group of selected science fields, then a short integration call
+FANOUT_MIN_FIELDS = 2
+FANOUT_FIELD_WORDS = 400
+FANOUT_MERGE_WORDS = 300
+# Context sections whose budgets are split across the fan-out calls, and the smallest share
+FANOUT_SPLIT_SECTIONS = ("ontology", "bibliography", "file_context")
+FANOUT_MIN_SECTION_TOKENS = 300
+
+
+@dataclass
+class PipelineRequest:
+    """Everything that determines one pipeline run (API keys excluded)."""
+    user_query: str
+    idea_query: str = ""
+    authors: str = ""
+    sciences: list = field(default_factory=lambda: ["Physics", "Psychology", "Sociology"])
+    paradigms: list = field(default_factory=lambda: ["Rationalism"])
+    models: list = field(default_factory=lambda: ["Concepts"])
+    goal: str = "Scientific Research"
+    expertise: str = "Expert"
+    file_content: str = ""
+    cerebras_model: str = "llama-3.1-70b"
+    hedge_after: float = None
+    ontology_top_k: int = None
+    use_cache: bool = True
+    stream: bool = False
+    phase1_fanout: bool = False
+
+
+@dataclass
+class PipelineResult:
+    groq_synthesis: str = ""
+    cerebras_innovation: str = ""
+    main_markdown: str = ""
+    graph: object = None
+    positions: dict = None
+    analytics: dict = None
+    timeline: list = field(default_factory=list)
+    graph_block_present: bool = False
+    biblio: str = ""
+    biblio_timings: list = field(default_factory=list)
+    digest_stats: dict = None
+    phase_metrics: dict = field(default_factory=dict)
+    prompt_reports: dict = field(default_factory=dict)
+    ontology_context: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+
+    def to_record(self):
+        """JSON-serializable summary for batch output."""
+        return {
+            "markdown": self.main_markdown,
+            "groq_synthesis": self.groq_synthesis,
+            "cerebras_innovation": self.cerebras_innovation,
+            "graph": asdict(self.graph) if self.graph else None,
+            "graph_block_present": self.graph_block_present,
+            "positions": self.positions,
+            "analytics": self.analytics,
+            "timeline": self.timeline,
+            "phase_metrics": self.phase_metrics,
+            "prompt_reports": self.prompt_reports,
+            "ontology_context": self.ontology_context,
+            "timings": self.timings,
+            "digest_stats": self.digest_stats,
+            "biblio": self.biblio,
+            "biblio_timings": self.biblio_timings,
+        }
+
+    @classmethod
+    def from_record(cls, record):
+        """Rebuilds a result from `to_record()` output (positions come back as [x, y] lists)."""
+        return cls(
+            groq_synthesis=record.get("groq_synthesis", ""),
+            cerebras_innovation=record.get("cerebras_innovation", ""),
+            main_markdown=record.get("markdown", ""),
+            graph=SemanticGraph.from_dict(record["graph"]) if record.get("graph") else None,
+            positions=record.get("positions"),
+            analytics=record.get("analytics"),
+            timeline=record.get("timeline") or [],
+            graph_block_present=record.get("graph_block_present", bool(record.get("graph"))),
+            biblio=record.get("biblio", ""),
+            biblio_timings=record.get("biblio_timings") or [],
+            digest_stats=record.get("digest_stats"),
+            phase_metrics=record.get("phase_metrics") or {},
+            prompt_reports=record.get("prompt_reports") or {},
+            ontology_context=record.get("ontology_context") or {},
+            timings=record.get("timings") or {},
+        )
+
+
+class PhaseFailure(RuntimeError):
+    """A pipeline phase failed; `result` keeps everything completed before it (e.g. Phase 1)."""
+
+    def __init__(self, phase, result, cause):
+        super().__init__(f"{phase} failed: {cause}")
+        self.phase = phase
+        self.result = result
+        self.cause = cause
+
+
+def phase1_fingerprint(request):
+    """Identifies the inputs Phase 1 depends on, so its output can be reused across Phase 2 retries."""
+    payload = [request.user_query, request.authors, request.sciences, request.paradigms,
+               request.models, request.file_content, request.ontology_top_k]
+    if request.phase1_fanout:
+        payload.append("fanout")
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def run_fingerprint(request, phase1_text=None, file_stream=None):
+    """Identifies everything a whole run depends on, so identical concurrent runs can share one execution.
+
+    Free text is whitespace-normalized and multi-selections are order-insensitive; an attached
+    file stream is hashed by content (and rewound).
+    """
+    fields = asdict(request)
+    for name in ("user_query", "idea_query", "authors", "goal", "file_content"):
+        fields[name] = " ".join(fields[name].split())
+    for name in ("sciences", "paradigms", "models"):
+        fields[name] = sorted(fields[name])
+    digest = hashlib.sha256(json.dumps([fields, phase1_text], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    if file_stream is not None:
+        while chunk := file_stream.read(1 << 20):
+            digest.update(chunk if isinstance(chunk, bytes) else chunk.encode("utf-8"))
+        file_stream.seek(0)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache():
+    """Process-wide two-tier cache for Groq / Cerebras completions keyed by prompt content."""
+    disk = DiskCache(os.path.join(DEFAULT_CACHE_DIR, "llm_responses.sqlite3"),
+                     max_bytes=int(os.environ.get("SIS_LLM_CACHE_MAX_MB", 256)) * 1024 * 1024)
+    return ResponseCache(disk=disk)
+
+
+def phase_ontologies(request):
+    """Ontology text for each phase: the full encodings, or the top-k entries relevant to the inquiry.
+
+    Returns {phase: {"text", "mode", "entries", "tokens", "full_tokens"}}.
+    """
+    if not request.ontology_top_k:
+        return {
+            "Phase 1 (Groq)": {"text": IMA_PROMPT_ENCODING, "mode": "full", "entries": list(HUMAN_THINKING_METAMODEL["nodes"])},
+            "Phase 2 (Cerebras)": {"text": MA_PROMPT_ENCODING, "mode": "full", "entries": list(MENTAL_APPROACHES_ONTOLOGY["nodes"])},
+        }
+    retrievers, k = get_retrievers(), request.ontology_top_k
+    ima_text, ima_hits = retrieve_ontology(HUMAN_THINKING_METAMODEL, retrievers["ima"], request.user_query, k)
+    # Selected science names are part of the query so their fields always qualify; the inquiry ranks them
+    fields_text, field_hits = retrieve_science_fields(" ".join([request.user_query] + list(request.sciences)),
+                                                      SCIENCE_FIELDS_TOP_K, request.sciences)
+    ma_text, ma_hits = retrieve_ontology(MENTAL_APPROACHES_ONTOLOGY, retrievers["ma"],
+                                         f"{request.idea_query} {request.user_query}", k, with_style=True,
+                                         pinned=PHASE2_PINNED_MA)
+    return {
+        "Phase 1 (Groq)": {"text": ima_text + (f"\nFIELD TOOLKIT:\n{fields_text}" if fields_text else ""),
+                           "mode": f"top-{k}", "entries": ima_hits + field_hits},
+        "Phase 2 (Cerebras)": {"text": ma_text, "mode": f"top-{k}", "entries": ma_hits},
+    }
+
+
+def build_groq_system_prompt(request, biblio, file_content, builder, system_date, ontology=IMA_PROMPT_ENCODING):
+    return builder.finalize(f"""
+    You are the SIS Research Synthesizer (Phase 1).
+    STRICT IMA ARCHITECTURE FOCUS:
+    {builder.add("ontology", ontology)}
+
+    CONTEXT:
+    Date: {system_date}
+    Sciences: {request.sciences}. Paradigms: {request.paradigms}. Models: {request.models}.
+    Authors: {builder.add("bibliography", biblio)}. Data Context: {builder.add("file_context", file_content)}
+
+    Task: Provide a factual, structural interdisciplinary foundation (approx 1500 words).
+    Do not generate innovations or graphs yet. Only the research base.
+    """)
+
+
+def fanout_groups(request, max_calls):
+    """Selected science fields split into at most `max_calls` (>= 2) contiguous groups, one Phase 1 request each.
+
+    Returns [] when fan-out is off or fewer than FANOUT_MIN_FIELDS known fields are selected.
+    """
+    known = [s for s in request.sciences if s in KNOWLEDGE_BASE["Science fields"]]
+    if not request.phase1_fanout or len(known) < FANOUT_MIN_FIELDS:
+        return []
+    size = -(-len(known) // max(2, min(len(known), max_calls)))
+    return [known[i:i + size] for i in range(0, len(known), size)]
+
+
+def fanout_budgets(calls):
+    """Per-call budgets that split the single-request context budget across `calls` fan-out requests."""
+    return {name: max(FANOUT_MIN_SECTION_TOKENS, DEFAULT_BUDGETS[name] // calls) for name in FANOUT_SPLIT_SECTIONS}
+
+
+def build_groq_field_system_prompt(request, group, biblio, file_content, builder, system_date, ontology=IMA_PROMPT_ENCODING):
+    science_fields = KNOWLEDGE_BASE["Science fields"]
+    field_lines = "\n    ".join(
+        f"- {s} ({science_fields[s].get('cat', '')}). Methods: {science_fields[s].get('methods', [])}. "
+        f"Tools: {science_fields[s].get('tools', [])}. Facets: {science_fields[s].get('facets', [])}."
+        for s in group
+    )
+    return builder.finalize(f"""
+    You are the SIS Research Synthesizer (Phase 1, fields: {", ".join(group)}).
+    STRICT IMA ARCHITECTURE FOCUS:
+    {builder.add("ontology", ontology)}
+
+    CONTEXT:
+    Date: {system_date}
+    Fields:
+    {field_lines}
+    Other fields in this inquiry: {[s for s in request.sciences if s not in group]}. Paradigms: {request.paradigms}. Models: {request.models}.
+    Authors: {builder.add("bibliography", biblio)}. Data Context: {builder.add("file_context", file_content)}
+
+    Task: Provide a factual, structural foundation from the perspective of these fields only
+    (approx {FANOUT_FIELD_WORDS * len(group)} words, one subsection per field), grounded in their methods,
+    tools and facets. Other fields are covered separately.
+    Do not generate innovations or graphs yet. Only the research base.
+    """)
+
+
+def build_groq_merge_system_prompt(request, builder, system_date):
+    return builder.finalize(f"""
+    You are the SIS Research Synthesizer (Phase 1 merge).
+
+    CONTEXT:
+    Date: {system_date}
+    Sciences: {request.sciences}. Paradigms: {request.paradigms}. Models: {request.models}.
+
+    Task: You receive research foundations written per group of science fields. Write a short interdisciplinary
+    integration (approx {FANOUT_MERGE_WORDS} words): the shared structures, tensions and bridges between
+    the fields with respect to the inquiry. Do not repeat the field foundations.
+    Do not generate innovations or graphs yet.
+    """)
+
+
+def _fanout_metrics(field_metrics, merge_metrics, seconds):
+    """One Phase 1 metrics dict for a fan-out: summed tokens, first TTFT and per-call detail."""
+    calls = list(field_metrics.values()) + [merge_metrics]
+    caches = {m["cache"] for m in calls}
+    completion = sum(m.get("completion_tokens") or 0 for m in calls)
+    return {
+        "model": GROQ_MODEL,
+        "cache": caches.pop() if len(caches) == 1 else "miss",
+        "ttft": min((m["ttft"] for m in field_metrics.values() if m.get("ttft") is not None), default=None),
+        "seconds": seconds,
+        "prompt_tokens": sum(m.get("prompt_tokens") or 0 for m in calls),
+        "completion_tokens": completion,
+        "tokens_per_sec": round(completion / seconds, 1) if completion and seconds > 0 else None,
+        "queue_wait": max((m.get("queue_wait") or 0 for m in calls), default=0),
+        "retries": sum(m.get("retries") or 0 for m in calls),
+        "fanout": {field: {k: m.get(k) for k in ("cache", "ttft", "seconds", "completion_tokens")}
+                   for field, m in field_metrics.items()},
+        "merge": {k: merge_metrics.get(k) for k in ("cache", "ttft", "seconds", "completion_tokens")},
+    }
+
+
+def build_cerebras_system_prompt(builder, ontology=MA_PROMPT_ENCODING):
+    return builder.finalize(f"""
+    You are the SIS Innovation Engine (Phase 2).
+    STRICT MENTAL APPROACHES (MA) FOCUS (Name [color shape]: description):
+    {builder.add("ontology", ontology)}
+
+    TASK:
+    1. Review the RESEARCH FOUNDATION generated by your partner (Groq).
+    2. Apply MA logic (Dialectics, Perspective Shifting, Core) to generate radical 'Useful Innovative Ideas'.
+    3. End your response with '{GRAPH_MARKER}' followed by a valid JSON network (45-65 nodes).
+
+    Visual Rules:
+    - IMA nodes (rectangles) for structural/factual concepts.
+    - MA nodes (diamonds) for cognitive filters and generative steps.
+    - Use colors provided in the ontology dictionaries.
+
+    JSON schema: {{"nodes": [{{"id": "n1", "label": "Text", "type": "Root|Branch", "color": "#hex", "shape": "rectangle|diamond"}}], "edges": [{{"source": "n1", "target": "n2", "rel_type": "AS|BT|outcome_of"}}]}}
+    """)
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+def run_pipeline(request, groq_client, cerebras_client, llm_cache=None, file_stream=None,
+                 on_stage=_noop, on_groq_text=None, on_cerebras_text=None, phase1_text=None, on_timeline=None,
+                 cancel_event=None):
+    """Runs the full Groq -> Cerebras pipeline for one request and returns a PipelineResult.
+
+    Stages run as a dependency DAG (see sis_dag): bibliography, large-file digest, ontology
+    retrieval and the Cerebras endpoint warm-up overlap; Phase 1 waits for the first three,
+    Phase 2 for Phase 1 and the warm-up. The parsed graph gets degree / PageRank / community
+    analytics and a precomputed layout. `file_stream` (a binary file object) switches on
+    large-file digest mode instead of `request.file_content`. `on_stage(stage, message)` is
+    called as each stage starts and `on_timeline(timeline)` on every stage start/finish;
+    `on_groq_text` / `on_cerebras_text` receive streamed text when `request.stream` is set.
+    All callbacks run on the calling thread. Setting `cancel_event` stops the run before its
+    next stage and closes in-flight streams. Provider calls go through the process-wide
+    rate-limit schedulers. With `request.phase1_fanout` and two or more selected science
+    fields, Phase 1 runs smaller requests per group of fields concurrently (as many groups as
+    the Groq request burst allows, sharing one request's context budget), then a short merge
+    call that adds an interdisciplinary integration section. If Phase 2 fails a PhaseFailure carrying the completed Phase 1 is
+    raised; pass that text back as `phase1_text` to retry Phase 2 without re-running Phase 1.
+    """
+    llm_cache = get_llm_cache() if llm_cache is None else llm_cache
+    result = PipelineResult()
+    system_date = datetime.now().strftime("%B %d, %Y")
+    relays = {"groq": on_groq_text, "cerebras": on_cerebras_text}
+    state = {"file_content": request.file_content}
+
+    def timed(stage, fn):
+        t0 = time.perf_counter()
+        value = fn()
+        result.timings[stage] = round(time.perf_counter() - t0, 3)
+        return value
+
+    # Fetch Metadata
+    def bibliography():
+        result.biblio = timed("bibliography", lambda: fetch_author_bibliographies(request.authors, timings=result.biblio_timings))
+
+    # --- LARGE-FILE DIGEST (MAP-REDUCE) ---
+    def digest():
+        state["file_content"], result.digest_stats = timed("digest", lambda: digest_large_file(
+            file_stream, make_llm_summarizer(groq_client, DIGEST_MODEL, scheduler=get_scheduler("groq")), cache=llm_cache.disk
+        ))
+
+    # --- ONTOLOGY CONTEXT (full dump or query-relevant top-k) ---
+    def retrieval():
+        state["ontologies"] = ontologies = timed("retrieval", lambda: phase_ontologies(request))
+        full_tokens = {"Phase 1 (Groq)": estimate_tokens(IMA_PROMPT_ENCODING), "Phase 2 (Cerebras)": estimate_tokens(MA_PROMPT_ENCODING)}
+        result.ontology_context = {phase: {"mode": o["mode"], "entries": o["entries"], "tokens": estimate_tokens(o["text"]),
+                                           "full_tokens": full_tokens[phase]} for phase, o in ontologies.items()}
+
+    # --- ENDPOINT WARM-UP (model catalog probe; opens the pooled Cerebras connection) ---
+    def warmup():
+        timed("warmup", lambda: cerebras_policy.valid_models(cerebras_client))
+
+    # --- PHASE 1: GROQ ---
+    def phase1():
+        state["groq_builder"] = groq_builder = PromptBuilder()
+        groq_sys_prompt = build_groq_system_prompt(request, result.biblio, state["file_content"], groq_builder, system_date,
+                                                   ontology=state["ontologies"]["Phase 1 (Groq)"]["text"])
+        if phase1_text is not None:
+            result.groq_synthesis = phase1_text
+            result.phase_metrics["Phase 1 (Groq)"] = {"model": GROQ_MODEL, "cache": "checkpoint", "ttft": None,
+                                                      "seconds": 0.0, "tokens_per_sec": None}
+            if relays["groq"]: relays["groq"](phase1_text)
+        else:
+            result.groq_synthesis, result.phase_metrics["Phase 1 (Groq)"] = timed("phase1", lambda: cached_chat_completion(
+                llm_cache, "groq", groq_client, GROQ_MODEL,
+                [{"role": "system", "content": groq_sys_prompt}, {"role": "user", "content": request.user_query}],
+                temperature=0.4, stream=request.stream, on_text=relays["groq"], use_cache=request.use_cache,
+                scheduler=get_scheduler("groq"), cancel_event=cancel_event
+            ))
+
+    # --- PHASE 1 FAN-OUT: one Groq request per group of science fields, then a short merge ---
+    # Field calls fit in the Groq scheduler's request burst, leaving one request for the merge,
+    # and share the context budget of a single Phase 1 request between them.
+    groups = fanout_groups(request, get_scheduler("groq").burst - 1) if phase1_text is None else []
+    fields = [" + ".join(group) for group in groups]
+    field_texts, field_metrics, field_builders, field_lock = {}, {}, {}, threading.Lock()
+
+    def fanout_text(merge_text=None):
+        sections = [f"### {f}\n{field_texts[f]}" for f in fields if f in field_texts]
+        if merge_text is not None:
+            sections.append(f"### Interdisciplinary Integration\n{merge_text}")
+        return "\n\n".join(sections)
+
+    def phase1_field(group):
+        name = " + ".join(group)
+
+        def on_text(text):
+            with field_lock:
+                field_texts[name] = text
+                combined = fanout_text()
+            relays["groq"](combined)
+
+        def run():
+            builder = field_builders[name] = PromptBuilder(fanout_budgets(len(groups)))
+            sys_prompt = build_groq_field_system_prompt(request, group, result.biblio, state["file_content"], builder, system_date,
+                                                        ontology=state["ontologies"]["Phase 1 (Groq)"]["text"])
+            state.setdefault("phase1_start", time.perf_counter())
+            text, field_metrics[name] = cached_chat_completion(
+                llm_cache, "groq", groq_client, GROQ_MODEL,
+                [{"role": "system", "content": sys_prompt}, {"role": "user", "content": request.user_query}],
+                temperature=0.4, stream=request.stream, on_text=on_text if relays["groq"] else None,
+                use_cache=request.use_cache, scheduler=get_scheduler("groq"), cancel_event=cancel_event,
+                completion_estimate=2 * FANOUT_FIELD_WORDS * len(group)
+            )
+            with field_lock:
+                field_texts[name] = text
+        return run
+
+    def phase1_merge():
+        result.timings["phase1_fields"] = round(time.perf_counter() - state["phase1_start"], 3)
+        merge_builder = PromptBuilder()
+        merge_sys_prompt = build_groq_merge_system_prompt(request, merge_builder, system_date)
+        merge_prompt = f"INQUIRY:\n{request.user_query}\n\nFIELD FOUNDATIONS:\n{fanout_text()}"
+        merge_text, merge_metrics = timed("phase1_merge", lambda: cached_chat_completion(
+            llm_cache, "groq", groq_client, GROQ_MODEL,
+            [{"role": "system", "content": merge_sys_prompt}, {"role": "user", "content": merge_prompt}],
+            temperature=0.4, stream=request.stream,
+            on_text=(lambda text: relays["groq"](fanout_text(text))) if relays["groq"] else None,
+            use_cache=request.use_cache, scheduler=get_scheduler("groq"), cancel_event=cancel_event,
+            completion_estimate=2 * FANOUT_MERGE_WORDS
+        ))
+        result.groq_synthesis = fanout_text(merge_text)
+        result.timings["phase1"] = round(time.perf_counter() - state["phase1_start"], 3)
+        result.phase_metrics["Phase 1 (Groq)"] = _fanout_metrics(field_metrics, merge_metrics, result.timings["phase1"])
+        # One prompt report for the whole fan-out, sections prefixed by the call they belong to
+        state["groq_builder"] = combined = PromptBuilder()
+        for name, builder in list(field_builders.items()) + [("merge", merge_builder)]:
+            combined.sections += [dict(section, section=f"{name}: {section['section']}") for section in builder.sections]
+            combined.total_tokens += builder.total_tokens
+
+    # --- PHASE 2: CEREBRAS ---
+    def phase2():
+        cerebras_builder = PromptBuilder()
+        cerebras_sys_prompt = build_cerebras_system_prompt(cerebras_builder, ontology=state["ontologies"]["Phase 2 (Cerebras)"]["text"])
+        cerebras_prompt = f"GROQ RESEARCH FOUNDATION (FOUNDATION):\n{result.groq_synthesis}\n\nUSER INNOVATION REQUEST (GOAL):\n{request.idea_query}"
+        # Hedged requests race two models, so neither streams into the UI; the winner is rendered once.
+        hedging = request.hedge_after is not None
+        def cerebras_call(model, hedge_event, retry_5xx):
+            return cached_chat_completion(
+                llm_cache, "cerebras", cerebras_client, model,
+                [{"role": "system", "content": cerebras_sys_prompt}, {"role": "user", "content": cerebras_prompt}],
+                temperature=0.85, stream=request.stream or hedging, on_text=None if hedging else relays["cerebras"],
+                use_cache=request.use_cache, scheduler=get_scheduler("cerebras"), cancel_event=AnyEvent(hedge_event, cancel_event),
+                retry_5xx=retry_5xx
+            )
+        try:
+            result.cerebras_innovation, result.phase_metrics["Phase 2 (Cerebras)"] = timed("phase2", lambda: cerebras_policy.run(
+                cerebras_call, cerebras_client, request.cerebras_model, hedge_after=request.hedge_after
+            ))
+            if hedging and relays["cerebras"]: relays["cerebras"](result.cerebras_innovation)
+        except Exception as e:
+            raise PhaseFailure("Phase 2 (Cerebras)", result, e) from e
+        result.prompt_reports = {"Phase 1 (Groq)": state["groq_builder"].report(), "Phase 2 (Cerebras)": cerebras_builder.report()}
+
+    # --- COMBINING, PARSING AND LINKING ---
+    def graph_parse():
+        combined_content = f"## 📚 Phase 1: Research Foundation (Groq)\n{result.groq_synthesis}\n\n---\n## 💡 Phase 2: Useful Innovative Ideas (Cerebras)\n{result.cerebras_innovation}"
+        parts = combined_content.split(GRAPH_MARKER)
+        result.main_markdown = parts[0]
+        result.graph_block_present = len(parts) > 1
+        result.graph = timed("graph_parse", lambda: extract_semantic_graph(parts[1]) if len(parts) > 1 else None)
+        if result.graph:
+            state["node_ids"], state["edge_pairs"] = [n.id for n in result.graph.nodes], result.graph.edge_pairs()
+
+    def analytics():
+        if result.graph:
+            result.analytics = timed("analytics", lambda: analyze_graph(state["node_ids"], state["edge_pairs"]))
+
+    def linking():
+        if result.graph:
+            result.main_markdown = timed("linking", lambda: link_semantic_nodes(result.main_markdown, result.graph.nodes))
+
+    def layout():
+        if result.graph:
+            result.positions = timed("layout", lambda: compute_layout(state["node_ids"], state["edge_pairs"]))
+
+    prep = []
+    if request.authors:
+        prep.append(Stage("bibliography", bibliography, message="Resolving author bibliographies (ORCID / Semantic Scholar)..."))
+    if file_stream is not None:
+        prep.append(Stage("digest", digest, message="Digesting attached file in parallel chunks..."))
+    phase1_deps = tuple(s.name for s in prep) + ("retrieval",)
+    if groups:
+        phase1_stages = [Stage(f"phase1:{name}", phase1_field(group), deps=phase1_deps,
+                               message=f"PHASE 1: Groq researching {len(request.sciences)} science fields in {len(groups)} parallel requests (IMA Logic)..." if not i else "")
+                         for i, (name, group) in enumerate(zip(fields, groups))]
+        phase1_stages.append(Stage("phase1", phase1_merge, deps=tuple(s.name for s in phase1_stages),
+                                   message="PHASE 1: Groq merging the field foundations..."))
+    else:
+        phase1_stages = [Stage("phase1", phase1, deps=phase1_deps,
+                               message="PHASE 1: Groq synthesizing structural foundation (IMA Logic)...")]
+    stages = prep + [
+        Stage("retrieval", retrieval),
+        Stage("warmup", warmup),
+        *phase1_stages,
+        Stage("phase2", phase2, deps=("phase1", "warmup"),
+              message="PHASE 2: Cerebras producing innovative ideas and semantic mapping (MA Logic)..."),
+        Stage("graph_parse", graph_parse, deps=("phase2",), message="Parsing semantic graph and linking nodes..."),
+        Stage("analytics", analytics, deps=("graph_parse",)),
+        Stage("linking", linking, deps=("graph_parse",)),
+        Stage("layout", layout, deps=("graph_parse",)),
+    ]
+    result.timeline = run_dag(stages, on_stage=on_stage, on_timeline=on_timeline, relays=relays, cancel_event=cancel_event)
+    return result
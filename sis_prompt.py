@@ -0,0 +1,136 @@
+"""
+SIS prompt builder.
+
+Assembles the Phase 1 (Groq) and Phase 2 (Cerebras) system prompts from named
+sections, measures the token cost of each and fits every section into its own
+budget. Over-budget sections are shortened deterministically (same input, same
+output), which keeps prompts cacheable and inside the providers' context limits.
+"""
+import math
+
+try:
+    import tiktoken
+    _ENCODER = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional dependency; fall back to the ~4 chars/token heuristic
+    _ENCODER = None
+
+# Per-section token budgets. None means "never trimmed".
+DEFAULT_BUDGETS = {
+    "ontology": 1500,
+    "bibliography": 1500,
+    "file_context": 4000,
+}
+
+
+def estimate_tokens(text):
+    """Token count via tiktoken when installed, otherwise ceil(chars / 4)."""
+    if not text:
+        return 0
+    if _ENCODER is not None:
+        return len(_ENCODER.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def compact_ontology(ontology, with_style=False):
+    """One line per node ("Name: desc", optionally "[#hex shape]") plus "A -rel-> B" relations."""
+    lines = []
+    for name, d in ontology.get("nodes", {}).items():
+        style = f" [{d.get('color', '')} {d.get('shape', '')}]" if with_style else ""
+        lines.append(f"{name}{style}: {d.get('desc', '')}")
+    for rel in ontology.get("relations", []):
+        src, dst, verb = rel
+        lines.append(f"{src} -{verb}-> {dst}")
+    return "\n".join(lines)
+
+
+def truncate_head_tail(text, budget):
+    """Keeps the first ~70% and last ~30% of the budget, marking the cut."""
+    if estimate_tokens(text) <= budget:
+        return text
+    chars = max(budget, 1) * 4
+    head, tail = int(chars * 0.7), int(chars * 0.3)
+    omitted = estimate_tokens(text[head:len(text) - tail])
+    return f"{text[:head]}\n[... ~{omitted} tokens omitted ...]\n{text[len(text) - tail:]}"
+
+
+def truncate_lines(text, budget):
+    """Keeps whole lines from the top until the budget is spent."""
+    if estimate_tokens(text) <= budget:
+        return text
+    kept, used = [], 0
+    lines = text.splitlines()
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        kept.append(line)
+        used += cost
+    kept.append(f"[... {len(lines) - len(kept)} lines omitted ...]")
+    return "\n".join(kept)
+
+
+def fit_bibliography(biblio, budget):
+    """Trims every author's block to the same number of entries so all authors stay represented."""
+    if estimate_tokens(biblio) <= budget:
+        return biblio
+    blocks, current = [], []
+    for line in biblio.splitlines():
+        if line.startswith("---") and current:
+            blocks.append(current)
+            current = []
+        current.append(line)
+    if current:
+        blocks.append(current)
+
+    per_author = max(len(b) for b in blocks)
+    while per_author > 1:
+        per_author -= 1
+        trimmed = "\n".join(line for b in blocks for line in b[:per_author + 1])
+        trimmed += f"\n[... bibliography trimmed to {per_author} entries per author ...]"
+        if estimate_tokens(trimmed) <= budget:
+            return trimmed
+    return truncate_lines(biblio, budget)
+
+
+def fit_section(name, text, budget):
+    """Applies the section-appropriate deterministic reduction."""
+    if budget is None or estimate_tokens(text) <= budget:
+        return text
+    if name == "bibliography":
+        return fit_bibliography(text, budget)
+    if name == "ontology":
+        return truncate_lines(text, budget)
+    return truncate_head_tail(text, budget)
+
+
+class PromptBuilder:
+    """Fits named sections to their budgets and keeps a per-section token report.
+
+    `add(name, text)` returns the fitted text for interpolation into the prompt;
+    `finalize(prompt)` records the total token count of the assembled prompt.
+    """
+
+    def __init__(self, budgets=None):
+        self.budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+        self.sections = []
+        self.total_tokens = 0
+
+    def add(self, name, text):
+        text = text or ""
+        budget = self.budgets.get(name)
+        fitted = fit_section(name, text, budget)
+        self.sections.append({
+            "section": name,
+            "raw_tokens": estimate_tokens(text),
+            "final_tokens": estimate_tokens(fitted),
+            "budget": budget,
+        })
+        return fitted
+
+    def finalize(self, prompt):
+        self.total_tokens = estimate_tokens(prompt)
+        return prompt
+
+    def report(self):
+        return self.sections + [{"section": "TOTAL PROMPT", "raw_tokens": None,
+                                 "final_tokens": self.total_tokens, "budget": None}]
@@ -0,0 +1,201 @@
+"""
+SIS provider rate limiting.
+
+One process-wide scheduler per LLM provider (Groq, Cerebras) shared by every
+Streamlit session and batch worker. Each scheduler admits callers in FIFO
+order through two token buckets (requests/min and tokens/min) and a cap on
+concurrent in-flight calls, retries 429 / 5xx gateway responses, timeouts and
+connection errors with jittered exponential backoff that honours `Retry-After`,
+pauses the whole queue while the provider asks us to back off, and sheds load
+with ProviderOverloaded once its queue is full.
+"""
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from openai import APIConnectionError
+
+# The SDK's own retries are disabled (see sis_clients), so everything it used to retry is retried here
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# APITimeoutError is a subclass of APIConnectionError
+RETRYABLE_ERRORS = (APIConnectionError,)
+
+
+class ProviderOverloaded(RuntimeError):
+    """Raised instead of queueing when a provider's scheduler is saturated."""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec, capacity):
+        self.rate = float(rate_per_sec)
+        self.capacity = float(capacity)
+        self.level = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` is available (amount is capped at capacity)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= min(amount, self.capacity)
+
+
+def retry_after_seconds(exc):
+    """Parses Retry-After / retry-after-ms from an HTTP error's response headers, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    ms = headers.get("retry-after-ms")
+    if ms:
+        try:
+            return float(ms) / 1000.0
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def http_status(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(exc, retry_5xx=True):
+    """Transport errors and RETRYABLE_STATUS; 5xx only with `retry_5xx` (off when the caller can fall back)."""
+    status = http_status(exc)
+    if status is not None and status >= 500 and not retry_5xx:
+        return False
+    return isinstance(exc, RETRYABLE_ERRORS) or status in RETRYABLE_STATUS
+
+
+class ProviderScheduler:
+    """Fair (FIFO) admission + retry policy for one provider."""
+
+    def __init__(self, name, rpm, tpm, max_queue=32, queue_timeout=120.0,
+                 max_retries=5, base_delay=1.0, max_delay=60.0, max_concurrency=None):
+        self.name = name
+        self.requests = TokenBucket(rpm / 60.0, max(1.0, rpm / 6.0))
+        self.tokens = TokenBucket(tpm / 60.0, tpm)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._paused_until = 0.0
+        self.stats = {"admitted": 0, "retries": 0, "shed": 0, "peak_in_flight": 0}
+
+    @property
+    def burst(self):
+        """Requests admitted back to back before the requests/min bucket starts pacing them."""
+        return int(self.requests.capacity)
+
+    def _acquire(self, cost):
+        deadline = time.monotonic() + self.queue_timeout
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self.stats["shed"] += 1
+                raise ProviderOverloaded(f"{self.name}: {len(self._queue)} requests already queued; try again shortly.")
+            ticket = object()
+            self._queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = 1.0
+                    # The head of the queue waits for a free slot (woken by _release), then for the buckets
+                    if self._queue[0] is ticket and (self.max_concurrency is None or self.in_flight < self.max_concurrency):
+                        wait = max(self._paused_until - now,
+                                   self.requests.wait_time(1, now), self.tokens.wait_time(cost, now))
+                        if wait <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(cost)
+                            self.in_flight += 1
+                            self.stats["admitted"] += 1
+                            self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.in_flight)
+                            return
+                    if now + min(wait, 1.0) > deadline:
+                        self.stats["shed"] += 1
+                        raise ProviderOverloaded(f"{self.name}: waited {self.queue_timeout:.0f}s in queue; try again shortly.")
+                    self._cond.wait(timeout=min(wait, 1.0))
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def _release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def call(self, fn, cost=1, info=None, retry_5xx=True):
+        """Runs `fn()` once admitted, retrying retryable HTTP / transport errors; fills `info` with waits/retries.
+
+        With `retry_5xx=False` server errors are raised at once, for callers that fall back to another model.
+        """
+        info = {} if info is None else info
+        info.setdefault("queue_wait", 0.0)
+        info.setdefault("retries", 0)
+        for attempt in range(self.max_retries + 1):
+            t0 = time.perf_counter()
+            self._acquire(cost)
+            info["queue_wait"] = round(info["queue_wait"] + time.perf_counter() - t0, 3)
+            try:
+                return fn()
+            except Exception as e:
+                if not is_retryable(e, retry_5xx) or attempt == self.max_retries:
+                    raise
+                retry_after = retry_after_seconds(e)
+            finally:
+                self._release()
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.0)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+                with self._cond:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self.stats["retries"] += 1
+            info["retries"] += 1
+            time.sleep(delay)
+
+
+_SCHEDULERS = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+DEFAULT_LIMITS = {
+    "groq": {"rpm": 30, "tpm": 60000, "concurrency": 8},
+    "cerebras": {"rpm": 30, "tpm": 60000, "concurrency": 8},
+}
+
+
+def get_scheduler(provider):
+    """Process-wide scheduler; limits come from SIS_<PROVIDER>_RPM / _TPM / _MAX_CONCURRENCY."""
+    with _SCHEDULERS_LOCK:
+        if provider not in _SCHEDULERS:
+            defaults = DEFAULT_LIMITS.get(provider, {"rpm": 30, "tpm": 60000, "concurrency": 8})
+            prefix = f"SIS_{provider.upper()}"
+            _SCHEDULERS[provider] = ProviderScheduler(
+                provider,
+                rpm=float(os.environ.get(f"{prefix}_RPM", defaults["rpm"])),
+                tpm=float(os.environ.get(f"{prefix}_TPM", defaults["tpm"])),
+                max_queue=int(os.environ.get(f"{prefix}_MAX_QUEUE", 32)),
+                max_concurrency=int(os.environ.get(f"{prefix}_MAX_CONCURRENCY", defaults["concurrency"])),
+            )
+        return _SCHEDULERS[provider]
@@ -0,0 +1,195 @@
+"""
+SIS pipeline telemetry.
+
+Turns a finished (or failed) pipeline run into one flat telemetry record:
+wall time per stage, prompt/completion tokens and tokens/sec per provider.
+Records are appended to a JSONL log and aggregated in a process-wide registry
+that renders the Prometheus text exposition format, labelled by the app's
+VERSION_CODE so latency regressions can be compared across releases. Setting
+SIS_METRICS_PORT also serves that text on http://0.0.0.0:<port>/metrics.
+"""
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sis_cache import DEFAULT_CACHE_DIR
+from sis_clients import get_client_registry
+from sis_dag import critical_path
+
+TELEMETRY_PATH = os.environ.get("SIS_TELEMETRY_PATH", os.path.join(DEFAULT_CACHE_DIR, "telemetry.jsonl"))
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0)
+PROVIDERS = {"Phase 1 (Groq)": "groq", "Phase 2 (Cerebras)": "cerebras"}
+
+
+def run_record(result, version, status="ok", extra_timings=None):
+    """Flat, JSON-serializable telemetry record for one PipelineResult."""
+    timings = dict(result.timings)
+    timings.update(extra_timings or {})
+    providers = {}
+    for phase, m in result.phase_metrics.items():
+        providers[PROVIDERS.get(phase, phase)] = {
+            "model": m.get("endpoint") or m.get("model"),
+            "cache": m.get("cache"),
+            "ttft": m.get("ttft"),
+            "seconds": m.get("seconds"),
+            "prompt_tokens": m.get("prompt_tokens"),
+            "completion_tokens": m.get("completion_tokens"),
+            "tokens_per_sec": m.get("tokens_per_sec"),
+            "queue_wait": m.get("queue_wait"),
+            "retries": m.get("retries"),
+        }
+    return {
+        "ts": round(time.time(), 3),
+        "version": version,
+        "status": status,
+        "stages": timings,
+        # Stages overlap, so the wall time is the pipeline's end-to-end span plus any extra (UI) timings
+        "total_seconds": round(max((e["end"] or 0 for e in result.timeline), default=sum(result.timings.values()))
+                               + sum((extra_timings or {}).values()), 3),
+        "critical_path": critical_path(result.timeline),
+        "providers": providers,
+    }
+
+
+_JSONL_LOCK = threading.Lock()
+
+
+def append_jsonl(record, path=TELEMETRY_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _JSONL_LOCK, open(path, "a", encoding="utf-8") as fh:
+        fh.write(line)
+
+
+def _labels(**labels):
+    def esc(v):
+        return str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _num(v):
+    return repr(float(v)) if v != float("inf") else "+Inf"
+
+
+class MetricsRegistry:
+    """Cumulative counters/histograms across runs, rendered as Prometheus text."""
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._runs = {}
+        self._stages = {}
+        self._tokens = {}
+        self._throughput = {}
+
+    def observe(self, record):
+        version = record["version"]
+        with self._lock:
+            key = (version, record["status"])
+            self._runs[key] = self._runs.get(key, 0) + 1
+            for stage, seconds in record["stages"].items():
+                self._observe_stage(version, stage, seconds)
+            for provider, p in record["providers"].items():
+                if p.get("cache") in ("hit", "checkpoint"):
+                    continue
+                for kind in ("prompt", "completion"):
+                    if p.get(f"{kind}_tokens"):
+                        key = (version, provider, kind)
+                        self._tokens[key] = self._tokens.get(key, 0) + p[f"{kind}_tokens"]
+                if p.get("tokens_per_sec"):
+                    self._throughput[(version, provider)] = p["tokens_per_sec"]
+
+    def observe_stage(self, version, stage, seconds):
+        """One extra stage timing outside a run record (e.g. UI rendering after the job finished)."""
+        with self._lock:
+            self._observe_stage(version, stage, seconds)
+
+    def _observe_stage(self, version, stage, seconds):
+        hist = self._stages.setdefault((version, stage), [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                hist[0][i] += 1
+        hist[1] += seconds
+        hist[2] += 1
+
+    def render(self):
+        with self._lock:
+            out = ["# HELP sis_runs_total Pipeline runs by outcome.", "# TYPE sis_runs_total counter"]
+            for (version, status), n in sorted(self._runs.items()):
+                out.append(f"sis_runs_total{_labels(version=version, status=status)} {n}")
+            out += ["# HELP sis_stage_seconds Wall time per pipeline stage.", "# TYPE sis_stage_seconds histogram"]
+            for (version, stage), (counts, total, n) in sorted(self._stages.items()):
+                for bound, c in zip(self.buckets + (float("inf"),), counts + [n]):
+                    out.append(f"sis_stage_seconds_bucket{_labels(version=version, stage=stage, le=_num(bound))} {c}")
+                out.append(f"sis_stage_seconds_sum{_labels(version=version, stage=stage)} {total:.6f}")
+                out.append(f"sis_stage_seconds_count{_labels(version=version, stage=stage)} {n}")
+            out += ["# HELP sis_tokens_total Provider tokens consumed (cache hits excluded).", "# TYPE sis_tokens_total counter"]
+            for (version, provider, kind), n in sorted(self._tokens.items()):
+                out.append(f"sis_tokens_total{_labels(version=version, provider=provider, kind=kind)} {n}")
+            out += ["# HELP sis_tokens_per_second Completion throughput of the latest uncached call.",
+                    "# TYPE sis_tokens_per_second gauge"]
+            for (version, provider), v in sorted(self._throughput.items()):
+                out.append(f"sis_tokens_per_second{_labels(version=version, provider=provider)} {v}")
+        # Connection reuse of the pooled provider clients (process lifetime, not per version)
+        clients = get_client_registry().stats()
+        for name, field, help_text in (("sis_http_requests_total", "requests", "HTTP requests sent by provider clients."),
+                                       ("sis_http_connections_total", "connections", "New TCP connections opened by provider clients."),
+                                       ("sis_http_tls_handshakes_total", "tls_handshakes", "TLS handshakes performed by provider clients.")):
+            out += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            out += [f"{name}{_labels(endpoint=c['endpoint'], key=c['key'])} {c[field]}" for c in clients]
+        return "\n".join(out) + "\n"
+
+
+@lru_cache(maxsize=None)
+def get_metrics_registry():
+    registry = MetricsRegistry()
+    port = os.environ.get("SIS_METRICS_PORT")
+    if port:
+        serve_metrics(registry, int(port))
+    return registry
+
+
+def serve_metrics(registry, port):
+    """Serves `registry.render()` on /metrics from a daemon thread."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="sis-metrics", daemon=True).start()
+    return server
+
+
+def observe_stage(stage, seconds, version, run_id=None, path=TELEMETRY_PATH):
+    """Logs a stage timed after the run record was written (JSONL line + Prometheus histogram)."""
+    try:
+        append_jsonl({"ts": round(time.time(), 3), "version": version, "run_id": run_id,
+                      "stage": stage, "seconds": seconds}, path)
+    except OSError:
+        pass
+    get_metrics_registry().observe_stage(version, stage, seconds)
+
+
+def record_run(result, version, status="ok", extra_timings=None, path=TELEMETRY_PATH):
+    """Builds the record, logs it to JSONL and feeds the Prometheus registry."""
+    record = run_record(result, version, status=status, extra_timings=extra_timings)
+    try:
+        append_jsonl(record, path)
+    except OSError:
+        pass
+    get_metrics_registry().observe(record)
+    return record